@@ -13,9 +13,13 @@ STEPS TO CREATE YOUR AGENT:
 EXAMPLE DOMAINS: Weather, Recipe, Stock, Music, Health, Education, etc.
 """
 
-from typing import Dict, Any, List
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 import logging
 from core.base_agent import BaseAgent, GraphState
+from core.keyword_matcher import compile_category_pattern, match_category
+
+if TYPE_CHECKING:
+    from core.memory import MemoryManager
 
 logger = logging.getLogger(__name__)
 
@@ -27,58 +31,111 @@ class YOUR_AGENT_NAMEAgent(BaseAgent):
     This agent specializes in YOUR_DOMAIN_HERE
     """
     
-    def __init__(self, memory_manager=None, name: str = "YOUR_AGENT_NAME"):
+    # Keywords that trigger this agent - users will search with these terms
+    # Add 7+ words related to your domain. Kept at class level so the list is
+    # built once and shared, not rebuilt every time the router asks for it
+    KEYWORDS: List[str] = [
+        "YOUR_KEYWORD_1",        # e.g., "weather"
+        "YOUR_KEYWORD_2",        # e.g., "temperature"
+        "YOUR_KEYWORD_3",        # e.g., "recipe"
+        "YOUR_KEYWORD_4",        # e.g., "cooking"
+        "YOUR_KEYWORD_5",        # e.g., "stock"
+        "YOUR_KEYWORD_6",        # e.g., "investment"
+        "YOUR_KEYWORD_7"         # e.g., "music"
+    ]
+    
+    # Your agent's personality and expertise for the AI model; a constant
+    # string keeps the prompt prefix identical across requests
+    SYSTEM_PROMPT = """You are YOUR_AGENT_NAME, an expert in YOUR_DOMAIN_AREA.
+
+Your expertise includes:
+- YOUR_EXPERTISE_1 (e.g., Weather forecasting and analysis)
+- YOUR_EXPERTISE_2 (e.g., Recipe recommendations)
+- YOUR_EXPERTISE_3 (e.g., Market trend analysis)
+- YOUR_EXPERTISE_4 (e.g., Music discovery and curation)
+- YOUR_EXPERTISE_5 (e.g., Health and wellness advice)
+
+Provide accurate, helpful information about YOUR_DOMAIN_AREA.
+Always be practical and give actionable advice.
+Adapt your language to the user's knowledge level."""
+    
+    # Define 3 main categories for your domain, in priority order
+    _CATEGORY_RE = compile_category_pattern({
+        "YOUR_CATEGORY_1": ("CATEGORY_1_TERM_1", "CATEGORY_1_TERM_2"),  # e.g., "short_term" for weather
+        "YOUR_CATEGORY_2": ("CATEGORY_2_TERM_1", "CATEGORY_2_TERM_2"),  # e.g., "long_term" for weather
+        "YOUR_CATEGORY_3": ("CATEGORY_3_TERM_1", "CATEGORY_3_TERM_2")   # e.g., "emergency" for weather
+    })
+    
+    # Define focus areas for your domain, in priority order
+    _FOCUS_RE = compile_category_pattern({
+        "YOUR_FOCUS_AREA_1": ("FOCUS_1_TERM_1", "FOCUS_1_TERM_2"),  # e.g., "planning"
+        "YOUR_FOCUS_AREA_2": ("FOCUS_2_TERM_1", "FOCUS_2_TERM_2"),  # e.g., "analysis"
+        "YOUR_FOCUS_AREA_3": ("FOCUS_3_TERM_1", "FOCUS_3_TERM_2")   # e.g., "recommendations"
+    })
+    
+    # Phrase buckets scored by can_handle in one pass: {bucket: (confidence boost, terms)}
+    confidence_terms = {
+        # High confidence terms - strong indicators of your domain
+        "high_confidence": (0.4, (
+            "YOUR_HIGH_CONFIDENCE_TERM_1",    # e.g., "weather forecast"
+            "YOUR_HIGH_CONFIDENCE_TERM_2",    # e.g., "recipe ingredients"
+            "YOUR_HIGH_CONFIDENCE_TERM_3"     # e.g., "stock analysis"
+        )),
+        # Medium confidence terms - related to your domain
+        "medium_confidence": (0.3, (
+            "YOUR_MEDIUM_TERM_1",    # e.g., "sunny"
+            "YOUR_MEDIUM_TERM_2",    # e.g., "cooking"
+            "YOUR_MEDIUM_TERM_3"     # e.g., "market"
+        )),
+        # Activity-related terms - things people do with your domain
+        "activity": (0.2, (
+            "YOUR_ACTIVITY_TERM_1",    # e.g., "outdoor planning"
+            "YOUR_ACTIVITY_TERM_2",    # e.g., "meal planning"
+            "YOUR_ACTIVITY_TERM_3"     # e.g., "investment planning"
+        ))
+    }
+    
+    # Brief description of what your agent does
+    DESCRIPTION = "YOUR_AGENT_DESCRIPTION_HERE"
+    
+    # Define 5 capabilities that your agent provides; a class-level tuple is shared
+    # by every instance, and get_capabilities hands callers a list copy of it
+    CAPABILITIES: Tuple[str, ...] = (
+        "YOUR_CAPABILITY_1",     # e.g., "weather_forecasting"
+        "YOUR_CAPABILITY_2",     # e.g., "recipe_search" 
+        "YOUR_CAPABILITY_3",     # e.g., "market_analysis"
+        "YOUR_CAPABILITY_4",     # e.g., "recommendation_engine"
+        "YOUR_CAPABILITY_5"      # e.g., "data_analysis"
+    )
+    
+    # The registry shares one instance across all users (BaseAgent.get_instance), so keep
+    # per-user data in the state passed to process, never on self
+    def __init__(self, memory_manager: Optional["MemoryManager"] = None, name: str = "YOUR_AGENT_NAME") -> None:
         super().__init__(memory_manager, name)
-        
-        # Brief description of what your agent does
-        self._description = "YOUR_AGENT_DESCRIPTION_HERE"
-        
-        # Define 5 capabilities that your agent provides
-        self._capabilities = [
-            "YOUR_CAPABILITY_1",     # e.g., "weather_forecasting"
-            "YOUR_CAPABILITY_2",     # e.g., "recipe_search" 
-            "YOUR_CAPABILITY_3",     # e.g., "market_analysis"
-            "YOUR_CAPABILITY_4",     # e.g., "recommendation_engine"
-            "YOUR_CAPABILITY_5"      # e.g., "data_analysis"
-        ]
     
     @property
     def keywords(self) -> List[str]:
         """
         Keywords that trigger this agent - users will search with these terms
-        Add 7+ words related to your domain
+        Edit KEYWORDS above rather than building a new list here
         """
-        return [
-            "YOUR_KEYWORD_1",        # e.g., "weather"
-            "YOUR_KEYWORD_2",        # e.g., "temperature"
-            "YOUR_KEYWORD_3",        # e.g., "recipe"
-            "YOUR_KEYWORD_4",        # e.g., "cooking"
-            "YOUR_KEYWORD_5",        # e.g., "stock"
-            "YOUR_KEYWORD_6",        # e.g., "investment"
-            "YOUR_KEYWORD_7"         # e.g., "music"
-        ]
+        return self.KEYWORDS
     
     @property
     def system_prompt(self) -> str:
         """
         This defines your agent's personality and expertise for the AI model
+        Edit SYSTEM_PROMPT above rather than building a new string here
         """
-        return """You are YOUR_AGENT_NAME, an expert in YOUR_DOMAIN_AREA.
-
-Your expertise includes:
-- YOUR_EXPERTISE_1 (e.g., Weather forecasting and analysis)
-- YOUR_EXPERTISE_2 (e.g., Recipe recommendations)
-- YOUR_EXPERTISE_3 (e.g., Market trend analysis)
-- YOUR_EXPERTISE_4 (e.g., Music discovery and curation)
-- YOUR_EXPERTISE_5 (e.g., Health and wellness advice)
-
-Provide accurate, helpful information about YOUR_DOMAIN_AREA.
-Always be practical and give actionable advice.
-Adapt your language to the user's knowledge level."""
+        return self.SYSTEM_PROMPT
 
     def get_capabilities(self) -> List[str]:
-        """Return the list of capabilities this agent provides"""
-        return self._capabilities
+        """Return the capabilities this agent provides (edit CAPABILITIES above)"""
+        return list(self.CAPABILITIES)
+    
+    def get_description(self) -> str:
+        """Return what this agent does (edit DESCRIPTION above)"""
+        return self.DESCRIPTION
     
     def process(self, state: GraphState) -> GraphState:
         """
@@ -95,11 +152,13 @@ Adapt your language to the user's knowledge level."""
             # Log that we're processing this query
             self.log_processing(query, user_id)
             
-            # Search for similar past queries from this user
-            search_results = self.search_similar_content(query, user_id, limit=3)
-            
-            # Get user's recent history for context
-            historical_context = self.get_historical_context(user_id, days=7)
+            # Search for similar past queries from this user and get their
+            # recent history for context (both lookups run concurrently);
+            # near-repeats of a recent query reuse its results. Only as many
+            # matches and characters as the context below uses are fetched
+            search_results, historical_context = self.fetch_context_cached(
+                query, user_id, limit=2, days=7, content_preview=100
+            )
             
             # Build context for the AI model
             context_parts = []
@@ -118,13 +177,16 @@ Adapt your language to the user's knowledge level."""
                     if isinstance(item, dict) and "value" in item:
                         context_parts.append(f"- {item['value'][:100]}...")
             
+            # Lowercase once and reuse for every detection pass
+            query_lower = query.lower()
+            
             # Detect what category this query falls into
-            category = self._detect_category(query)
+            category = self._detect_category(query_lower)
             if category != "general":
                 context_parts.append(f"Query category: {category}")
             
             # Detect the focus of this query
-            focus = self._detect_focus(query)
+            focus = self._detect_focus(query_lower)
             if focus != "general":
                 context_parts.append(f"Focus area: {focus}")
             
@@ -138,24 +200,20 @@ Adapt your language to the user's knowledge level."""
                 temperature=0.7  # Adjust for creativity vs accuracy
             )
             
-            # Store this interaction for future reference
-            self.store_interaction(
+            # Store this interaction and its vector embedding for future reference;
+            # both go out in one background write, off the response path
+            self.store_interaction_with_embedding(
                 user_id=user_id,
                 query=query,
                 response=response,
+                content=f"{self.name} Query: {query}\nResponse: {response}",
                 interaction_type=f"{self.name.lower()}_query",
                 metadata={
                     "category": category,
                     "focus": focus,
                     "had_context": bool(context_parts)
-                }
-            )
-            
-            # Store vector embedding for similarity search
-            self.store_vector_embedding(
-                user_id=user_id,
-                content=f"{self.name} Query: {query}\nResponse: {response}",
-                metadata={
+                },
+                embedding_metadata={
                     "agent": self.name,
                     "domain": "YOUR_DOMAIN_KEY",  # e.g., "weather", "recipes", "stocks"
                     "category": category,
@@ -186,70 +244,23 @@ Adapt your language to the user's knowledge level."""
         Determine how confident this agent is about handling the query
         Returns score from 0.0 (can't handle) to 1.0 (perfect match)
         """
-        # Start with basic confidence from parent class
-        confidence = super().can_handle(query)
+        # Start with basic keyword confidence, then add the boosts for
+        # every confidence_terms bucket found in the query
         query_lower = query.lower()
-        
-        # High confidence terms - strong indicators of your domain
-        high_confidence_terms = [
-            "YOUR_HIGH_CONFIDENCE_TERM_1",    # e.g., "weather forecast"
-            "YOUR_HIGH_CONFIDENCE_TERM_2",    # e.g., "recipe ingredients"  
-            "YOUR_HIGH_CONFIDENCE_TERM_3"     # e.g., "stock analysis"
-        ]
-        if any(term in query_lower for term in high_confidence_terms):
-            confidence = min(confidence + 0.4, 1.0)
-        
-        # Medium confidence terms - related to your domain
-        medium_confidence_terms = [
-            "YOUR_MEDIUM_TERM_1",    # e.g., "sunny"
-            "YOUR_MEDIUM_TERM_2",    # e.g., "cooking"
-            "YOUR_MEDIUM_TERM_3"     # e.g., "market"
-        ]
-        if any(term in query_lower for term in medium_confidence_terms):
-            confidence = min(confidence + 0.3, 1.0)
-        
-        # Activity-related terms - things people do with your domain
-        activity_terms = [
-            "YOUR_ACTIVITY_TERM_1",    # e.g., "outdoor planning"
-            "YOUR_ACTIVITY_TERM_2",    # e.g., "meal planning"
-            "YOUR_ACTIVITY_TERM_3"     # e.g., "investment planning"
-        ]
-        if any(term in query_lower for term in activity_terms):
-            confidence = min(confidence + 0.2, 1.0)
-        
-        return confidence
+        confidence = self._keyword_confidence(query_lower)
+        return self.score_confidence_terms(query_lower, confidence)
     
-    def _detect_category(self, query: str) -> str:
+    def _detect_category(self, query_lower: str) -> str:
         """
-        Detect what category this query belongs to within your domain
+        Detect what category this (lowercased) query belongs to within your domain
         """
-        query_lower = query.lower()
-        
-        # Define 3 main categories for your domain
-        if any(term in query_lower for term in ["CATEGORY_1_TERM_1", "CATEGORY_1_TERM_2"]):
-            return "YOUR_CATEGORY_1"  # e.g., "short_term" for weather
-        elif any(term in query_lower for term in ["CATEGORY_2_TERM_1", "CATEGORY_2_TERM_2"]):
-            return "YOUR_CATEGORY_2"  # e.g., "long_term" for weather
-        elif any(term in query_lower for term in ["CATEGORY_3_TERM_1", "CATEGORY_3_TERM_2"]):
-            return "YOUR_CATEGORY_3"  # e.g., "emergency" for weather
-        else:
-            return "general"
+        return match_category(self._CATEGORY_RE, query_lower, "general")
     
-    def _detect_focus(self, query: str) -> str:
+    def _detect_focus(self, query_lower: str) -> str:
         """
-        Detect the focus area of this query
+        Detect the focus area of this (lowercased) query
         """
-        query_lower = query.lower()
-        
-        # Define focus areas for your domain
-        if any(term in query_lower for term in ["FOCUS_1_TERM_1", "FOCUS_1_TERM_2"]):
-            return "YOUR_FOCUS_AREA_1"  # e.g., "planning"
-        elif any(term in query_lower for term in ["FOCUS_2_TERM_1", "FOCUS_2_TERM_2"]):
-            return "YOUR_FOCUS_AREA_2"  # e.g., "analysis"
-        elif any(term in query_lower for term in ["FOCUS_3_TERM_1", "FOCUS_3_TERM_2"]):
-            return "YOUR_FOCUS_AREA_3"  # e.g., "recommendations"
-        else:
-            return "general"
+        return match_category(self._FOCUS_RE, query_lower, "general")
     
     # ADD YOUR CUSTOM METHODS HERE
     def your_custom_method_1(self, parameter1, parameter2):
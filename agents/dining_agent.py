@@ -4,47 +4,81 @@ Specialized agent for restaurant recommendations, cuisine analysis, and dining e
 Part of the LangGraph Multiagent System
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import logging
+from dataclasses import dataclass
 from datetime import datetime
+from config import Config
 from core.base_agent import BaseAgent, GraphState
+from core.memory import MemoryManager
+from core.keyword_matcher import compile_category_pattern, match_category
+from core.semantic_cache import SemanticCache
+
+# Optional imports with fallbacks
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass(slots=True)
+class DiningInteractionMetadata:
+    """Metadata stored with each dining interaction; converted to a dict by the memory writer"""
+    dining_type: str
+    context_data: Dict[str, str]
+    timestamp: str
+
+
+# Checked in order; the first keyword present anywhere in the query wins
+_LOCATION_KEYWORDS = ("in ", "at ", "near ", "around ", "downtown ", "city center ")
+
+
+# Filled per request with str.format_map; static text is built once at import
+_DINING_PROMPT_TEMPLATE = """Dining Query Type: {dining_type}
+Query: {enhanced_query}
+
+Please provide comprehensive dining recommendations including:
+
+1. **Restaurant Suggestions**: Specific restaurant names or types
+2. **Cuisine Analysis**: Style, flavors, and cultural context
+3. **Location Considerations**: Accessibility and area recommendations  
+4. **Ambiance & Experience**: Dining atmosphere and setting
+5. **Menu Highlights**: Signature dishes or must-try items
+6. **Price Range**: Budget considerations and value
+7. **Special Considerations**: 
+   - Weather impact (if outdoor dining mentioned)
+   - Dietary accommodations (if mentioned)
+   - Time of day appropriateness
+8. **Local Insights**: Hidden gems or local favorites
+
+Be specific, enticing, and practical in your recommendations."""
+
+
+# Shared across DiningAgent instances and users, so it only holds answers built from the
+# question itself: keys carry the dining type and location hint (see _response_cache_key)
+_response_cache = SemanticCache(
+    max_entries=Config.SEMANTIC_CACHE_MAX_ENTRIES,
+    threshold=Config.SEMANTIC_CACHE_THRESHOLD,
+    lsh_candidates=Config.SEMANTIC_CACHE_LSH_CANDIDATES,
+    quantization=Config.SEMANTIC_CACHE_QUANTIZATION
+)
+
 class DiningAgent(BaseAgent):
     """Agent specialized in dining, restaurants, and culinary experiences"""
     
-    def __init__(self, memory_manager=None, name: str = "DiningAgent"):
-        super().__init__(memory_manager, name)
-        self._description = "Restaurant recommendations, cuisine analysis, and dining experience specialist"
-        self._capabilities = [
-            "restaurant_recommendations",
-            "cuisine_analysis",
-            "dining_planning",
-            "food_culture",
-            "menu_analysis",
-            "dining_experiences",
-            "local_specialties",
-            "dietary_recommendations",
-            "chef_recommendations",
-            "wine_pairing",
-            "food_events"
-        ]
-    
-    @property
-    def keywords(self) -> List[str]:
-        """Keywords that trigger this agent"""
-        return [
-            "restaurant", "food", "cuisine", "dining", "eat", "meal", "chef", 
-            "menu", "cooking", "recipe", "taste", "flavor", "dish", "kitchen",
-            "cafe", "bistro", "eatery", "dine", "lunch", "dinner", "breakfast",
-            "culinary", "gastronomy", "delicious", "tasty"
-        ]
+    # Shared list so routing never rebuilds it per query
+    KEYWORDS: List[str] = [
+        "restaurant", "food", "cuisine", "dining", "eat", "meal", "chef", 
+        "menu", "cooking", "recipe", "taste", "flavor", "dish", "kitchen",
+        "cafe", "bistro", "eatery", "dine", "lunch", "dinner", "breakfast",
+        "culinary", "gastronomy", "delicious", "tasty"
+    ]
     
-    @property
-    def system_prompt(self) -> str:
-        """System prompt for dining agent"""
-        return """You are DiningAgent, a culinary and restaurant specialist with expertise in dining experiences worldwide.
+    # Static so every request sends a byte-identical system prefix, which lets
+    # Ollama reuse the prompt's KV cache while the model stays loaded
+    SYSTEM_PROMPT = """You are DiningAgent, a culinary and restaurant specialist with expertise in dining experiences worldwide.
 
 Your capabilities include:
 - Restaurant recommendations and reviews
@@ -68,6 +102,62 @@ Provide detailed, enticing dining recommendations that consider:
 - Local cultural context
 
 Be descriptive and help users discover amazing dining experiences."""
+    
+    # Dining query types in priority order; the first type with any term present wins
+    _DINING_TYPE_RE = compile_category_pattern({
+        "restaurant_recommendation": ("recommend", "suggestion", "where to eat"),
+        "cuisine_analysis": ("cuisine", "food type", "cooking style"),
+        "menu_analysis": ("menu", "dish", "order", "specialty"),
+        "fine_dining": ("fine dining", "romantic", "special occasion"),
+        "casual_dining": ("quick", "fast", "casual", "grab"),
+        "local_specialties": ("local", "authentic", "traditional"),
+        "dietary_accommodation": ("vegetarian", "vegan", "gluten", "dietary")
+    })
+    
+    confidence_terms = {
+        # High confidence dining terms
+        "high_confidence": (0.6, (
+            "restaurant recommendation", "where to eat", "best food",
+            "dining options", "good restaurant", "food recommendation"
+        )),
+        # Cuisine-specific terms
+        "cuisine": (0.5, (
+            "italian food", "chinese restaurant", "indian cuisine", "mexican food",
+            "french restaurant", "japanese dining", "local cuisine", "street food"
+        )),
+        # Dining experience terms
+        "experience": (0.4, (
+            "fine dining", "casual dining", "romantic dinner", "family restaurant",
+            "business lunch", "quick bite", "food truck", "cafe"
+        ))
+    }
+    
+    def __init__(self, memory_manager: Optional[MemoryManager] = None, name: str = "DiningAgent") -> None:
+        super().__init__(memory_manager, name)
+        self._description = "Restaurant recommendations, cuisine analysis, and dining experience specialist"
+        self._capabilities = [
+            "restaurant_recommendations",
+            "cuisine_analysis",
+            "dining_planning",
+            "food_culture",
+            "menu_analysis",
+            "dining_experiences",
+            "local_specialties",
+            "dietary_recommendations",
+            "chef_recommendations",
+            "wine_pairing",
+            "food_events"
+        ]
+    
+    @property
+    def keywords(self) -> List[str]:
+        """Keywords that trigger this agent"""
+        return self.KEYWORDS
+    
+    @property
+    def system_prompt(self) -> str:
+        """System prompt for dining agent"""
+        return self.SYSTEM_PROMPT
 
     def process(self, state: GraphState) -> GraphState:
         """Process dining-related queries"""
@@ -80,14 +170,18 @@ Be descriptive and help users discover amazing dining experiences."""
         try:
             self.log_processing(query, user_id)
             
+            # Lowercase once for every detection pass below
+            query_lower = query.lower()
+            
             # Extract context from other agents
-            context_data = self._extract_multi_agent_context(state)
+            context_data = self._extract_multi_agent_context(state, query, query_lower)
             
             # Analyze dining query type
-            dining_type = self._analyze_dining_query(query)
+            dining_type = self._analyze_dining_query(query_lower)
             
             # Generate dining response with context
             dining_response = self._generate_dining_response(query, context_data, dining_type)
+            timestamp = datetime.now().isoformat()
             
             # Store the dining interaction
             self.store_interaction(
@@ -95,11 +189,7 @@ Be descriptive and help users discover amazing dining experiences."""
                 query=query,
                 response=dining_response,
                 interaction_type="dining_analysis",
-                metadata={
-                    "dining_type": dining_type,
-                    "context_data": context_data,
-                    "timestamp": datetime.now().isoformat()
-                }
+                metadata=DiningInteractionMetadata(dining_type, context_data, timestamp)
             )
             
             return self.format_state_response(
@@ -111,7 +201,7 @@ Be descriptive and help users discover amazing dining experiences."""
                         "context_integrated": bool(context_data),
                         "location_considered": context_data.get("location", "") != "",
                         "weather_considered": context_data.get("weather", "") != "",
-                        "timestamp": datetime.now().isoformat()
+                        "timestamp": timestamp
                     }
                 }
             )
@@ -121,37 +211,11 @@ Be descriptive and help users discover amazing dining experiences."""
     
     def can_handle(self, query: str) -> float:
         """Determine if this agent can handle the dining query"""
-        base_confidence = super().can_handle(query)
-        
         query_lower = query.lower()
-        
-        # High confidence dining terms
-        high_confidence_terms = [
-            "restaurant recommendation", "where to eat", "best food", 
-            "dining options", "good restaurant", "food recommendation"
-        ]
-        if any(term in query_lower for term in high_confidence_terms):
-            base_confidence = min(base_confidence + 0.6, 1.0)
-        
-        # Cuisine-specific terms
-        cuisine_terms = [
-            "italian food", "chinese restaurant", "indian cuisine", "mexican food",
-            "french restaurant", "japanese dining", "local cuisine", "street food"
-        ]
-        if any(term in query_lower for term in cuisine_terms):
-            base_confidence = min(base_confidence + 0.5, 1.0)
-        
-        # Dining experience terms
-        experience_terms = [
-            "fine dining", "casual dining", "romantic dinner", "family restaurant",
-            "business lunch", "quick bite", "food truck", "cafe"
-        ]
-        if any(term in query_lower for term in experience_terms):
-            base_confidence = min(base_confidence + 0.4, 1.0)
-        
-        return base_confidence
+        base_confidence = self._keyword_confidence(query_lower)
+        return self.score_confidence_terms(query_lower, base_confidence)
     
-    def _extract_multi_agent_context(self, state: GraphState) -> Dict[str, str]:
+    def _extract_multi_agent_context(self, state: GraphState, query: str, query_lower: str) -> Dict[str, str]:
         """Extract context from other agents in the system"""
         context_data = {}
         
@@ -171,52 +235,60 @@ Be descriptive and help users discover amazing dining experiences."""
             context_data["nature"] = forest_data.get("analysis", "")[:200]
         
         # Extract from query for location hints
-        query = state.get("question", "").lower()
-        location_hints = self._extract_location_hints(query)
+        location_hints = self._extract_location_hints(query, query_lower)
         if location_hints:
             context_data["location_hints"] = location_hints
         
         return context_data
     
-    def _extract_location_hints(self, query: str) -> str:
-        """Extract location hints from query"""
-        location_keywords = ["in ", "at ", "near ", "around ", "downtown ", "city center "]
-        for keyword in location_keywords:
-            if keyword in query:
-                parts = query.split(keyword)
-                if len(parts) > 1:
-                    potential_location = parts[1].split()[0:3]
-                    return " ".join(potential_location)
+    def _extract_location_hints(self, query: str, query_lower: str) -> str:
+        """Extract location hints from the query, keeping the user's casing"""
+        # Keywords are found in the lowercased copy and sliced from the original; the rare
+        # characters whose lowercase form changes length fall back to the lowercased text
+        source = query if len(query) == len(query_lower) else query_lower
+        for keyword in _LOCATION_KEYWORDS:
+            start = query_lower.find(keyword)
+            if start < 0:
+                continue
+            # Up to three words after the first occurrence, stopping at the next one
+            start += len(keyword)
+            end = query_lower.find(keyword, start)
+            segment = source[start:end] if end >= 0 else source[start:]
+            return " ".join(segment.split(None, 3)[:3])
         return ""
     
-    def _analyze_dining_query(self, query: str) -> str:
-        """Analyze the type of dining query"""
-        query_lower = query.lower()
+    def _analyze_dining_query(self, query_lower: str) -> str:
+        """Analyze the type of dining query from the lowercased query"""
+        return match_category(self._DINING_TYPE_RE, query_lower, "general_dining")
+    
+    def _embed_query(self, text: str) -> Optional["np.ndarray"]:
+        """Embed text with the memory manager's cached embedder, or None when unavailable"""
+        if np is None or not hasattr(self.memory, "embed"):
+            return None
         
-        if any(term in query_lower for term in ["recommend", "suggestion", "where to eat"]):
-            return "restaurant_recommendation"
-        elif any(term in query_lower for term in ["cuisine", "food type", "cooking style"]):
-            return "cuisine_analysis"
-        elif any(term in query_lower for term in ["menu", "dish", "order", "specialty"]):
-            return "menu_analysis"
-        elif any(term in query_lower for term in ["fine dining", "romantic", "special occasion"]):
-            return "fine_dining"
-        elif any(term in query_lower for term in ["quick", "fast", "casual", "grab"]):
-            return "casual_dining"
-        elif any(term in query_lower for term in ["local", "authentic", "traditional"]):
-            return "local_specialties"
-        elif any(term in query_lower for term in ["vegetarian", "vegan", "gluten", "dietary"]):
-            return "dietary_accommodation"
-        else:
-            return "general_dining"
+        try:
+            return self.memory.embed(text)
+        except Exception as e:
+            logger.warning(f"Failed to embed dining query for cache lookup: {e}")
+            return None
+    
+    @staticmethod
+    def _response_cache_key(dining_type: str, context_data: Dict[str, str]) -> Optional[str]:
+        """
+        Key for the shared response cache, or None when the answer must not be cached.
+        Answers built on other agents' per-user context are never shared; the location hint
+        is part of the key so similar questions about different places never collide.
+        """
+        if any(context_data.get(key) for key in ("location", "weather", "nature")):
+            return None
+        return f"{dining_type}:{' '.join(context_data.get('location_hints', '').lower().split())}"
     
     def _generate_dining_response(self, query: str, context_data: Dict[str, str], dining_type: str) -> str:
         """Generate comprehensive dining response with context"""
         try:
-            from core.ollama_client import ollama_client
+            from core.ollama_client import ollama_client, is_error_response
             
             # Build context-enhanced prompt
-            enhanced_query = f"{query}"
             context_additions = []
             
             if context_data.get("location"):
@@ -227,32 +299,32 @@ Be descriptive and help users discover amazing dining experiences."""
                 context_additions.append(f"Location: {context_data['location_hints']}")
             
             if context_additions:
-                enhanced_query += f"\n\nAdditional context: {'; '.join(context_additions)}"
+                enhanced_query = query + "\n\nAdditional context: " + "; ".join(context_additions)
+            else:
+                enhanced_query = query
             
-            dining_prompt = f"""Dining Query Type: {dining_type}
-Query: {enhanced_query}
-
-Please provide comprehensive dining recommendations including:
-
-1. **Restaurant Suggestions**: Specific restaurant names or types
-2. **Cuisine Analysis**: Style, flavors, and cultural context
-3. **Location Considerations**: Accessibility and area recommendations  
-4. **Ambiance & Experience**: Dining atmosphere and setting
-5. **Menu Highlights**: Signature dishes or must-try items
-6. **Price Range**: Budget considerations and value
-7. **Special Considerations**: 
-   - Weather impact (if outdoor dining mentioned)
-   - Dietary accommodations (if mentioned)
-   - Time of day appropriateness
-8. **Local Insights**: Hidden gems or local favorites
-
-Be specific, enticing, and practical in your recommendations."""
+            # Near-identical questions of the same type and place reuse the previous answer
+            cache_key = self._response_cache_key(dining_type, context_data)
+            query_embedding = self._embed_query(enhanced_query) if cache_key is not None else None
+            if query_embedding is not None:
+                cached_response = _response_cache.lookup(cache_key, query_embedding)
+                if cached_response is not None:
+                    logger.debug("Semantic cache hit for %s dining query", dining_type)
+                    return cached_response
+            
+            dining_prompt = _DINING_PROMPT_TEMPLATE.format_map({
+                "dining_type": dining_type,
+                "enhanced_query": enhanced_query
+            })
 
             response = ollama_client.generate_response(
                 prompt=dining_prompt,
                 system_prompt=self.system_prompt
             )
             
+            if query_embedding is not None and not is_error_response(response):
+                _response_cache.insert(cache_key, query_embedding, response)
+            
             return response
             
         except Exception as e:
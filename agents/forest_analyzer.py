@@ -5,15 +5,79 @@ and providing scientific insights with practical recommendations.
 """
 
 from typing import Dict, Any, List
+from functools import lru_cache
 import logging
+from config import Config
 from core.base_agent import BaseAgent, GraphState
+from core.keyword_matcher import compile_category_pattern, match_category
+
+# Optional imports with fallbacks
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 logger = logging.getLogger(__name__)
 
 
+# Base conservation recommendations by forest type
+_FOREST_TYPE_RECOMMENDATIONS = {
+    "tropical": (
+        "Establish protected corridors between forest fragments",
+        "Implement community-based forest management",
+        "Monitor illegal logging activities"
+    ),
+    "temperate": (
+        "Maintain diverse age structure in forest stands",
+        "Control invasive species populations",
+        "Implement sustainable harvesting practices"
+    )
+}
+
+# (threat marker, recommendation); checked in order, the first marker found in a threat wins
+_THREAT_RECOMMENDATIONS = (
+    ("logging", "Strengthen law enforcement against illegal logging"),
+    ("fire", "Develop fire management and prevention strategies"),
+    ("invasive", "Implement invasive species control programs")
+)
+
+
 class ForestAnalyzerAgent(BaseAgent):
     """Agent specialized in forest ecosystem analysis and recommendations"""
     
+    # Only BaseAgent's attributes are set per instance
+    __slots__ = ()
+    
+    KEYWORDS = [
+        "forest", "tree", "woodland", "ecosystem", "biodiversity",
+        "conservation", "wildlife", "nature", "jungle", "rainforest",
+        "deforestation", "species", "habitat", "flora", "fauna"
+    ]
+    
+    # Analysis types in priority order; the first type with any term present wins
+    _ANALYSIS_TYPE_RE = compile_category_pattern({
+        "biodiversity_analysis": ("biodiversity", "species", "flora", "fauna"),
+        "conservation_assessment": ("conservation", "protection", "threat"),
+        "ecosystem_analysis": ("ecosystem", "ecological", "environment"),
+        "forest_management": ("management", "sustainable", "forestry")
+    })
+    
+    # Characters of each past discussion carried into the prompt context
+    CONTEXT_PREVIEW_CHARS = 150
+    
+    # Per-plot metrics read by analyze_forest_health_batch; other keys (region, forest_type, ...)
+    # describe the batch as a whole and do not set the number of plots
+    HEALTH_METRICS = ("tree_cover",)
+    
+    confidence_terms = {
+        # High-confidence forest terms
+        "high_confidence": (0.4, ("forest ecosystem", "biodiversity", "conservation", "deforestation")),
+        # Species and wildlife terms
+        "species": (0.3, ("species", "wildlife", "habitat", "flora", "fauna")),
+        # Scientific research terms
+        "research": (0.2, ("research", "study", "analysis", "ecological"))
+    }
+    
     def __init__(self, memory_manager=None, name: str = "ForestAnalyzer"):
         super().__init__(memory_manager, name)
         self._description = "Forest ecosystem analysis agent providing scientific insights and conservation recommendations"
@@ -29,11 +93,7 @@ class ForestAnalyzerAgent(BaseAgent):
     @property
     def keywords(self) -> List[str]:
         """Keywords that trigger this agent"""
-        return [
-            "forest", "tree", "woodland", "ecosystem", "biodiversity",
-            "conservation", "wildlife", "nature", "jungle", "rainforest",
-            "deforestation", "species", "habitat", "flora", "fauna"
-        ]
+        return self.KEYWORDS
     
     @property
     def system_prompt(self) -> str:
@@ -63,55 +123,69 @@ class ForestAnalyzerAgent(BaseAgent):
         
         try:
             self.log_processing(query, user_id)
+            analysis_type = self._detect_analysis_type(query.lower())
             
-            # Search for similar past queries
-            search_results = self.search_similar_content(query, user_id, limit=3)
-            
-            # Get historical context for forest-related discussions
-            historical_context = self.get_historical_context(user_id, days=7)
+            # Search for similar past queries and get historical context for
+            # forest-related discussions (both lookups run concurrently)
+            search_results, historical_context = self.fetch_context(
+                query, user_id, limit=3, days=7, content_preview=self.CONTEXT_PREVIEW_CHARS
+            )
             
             # Build context from search results and historical data
+            preview = self.CONTEXT_PREVIEW_CHARS
             context_parts = []
             if search_results.get("similar_content"):
                 context_parts.append("Previous forest-related discussions:")
-                for item in search_results["similar_content"][:2]:
-                    if isinstance(item, dict) and "content" in item:
-                        context_parts.append(f"- {item['content'][:150]}...")
+                context_parts.extend(
+                    f"- {item['content'][:preview]}..."
+                    for item in search_results["similar_content"][:2]
+                    if isinstance(item, dict) and "content" in item
+                )
             
             if historical_context:
                 context_parts.append("Your forest research history:")
-                for item in historical_context[-2:]:
-                    if isinstance(item, dict) and "value" in item:
-                        context_parts.append(f"- {item['value'][:150]}...")
+                context_parts.extend(
+                    f"- {item['value'][:preview]}..."
+                    for item in historical_context[-2:]
+                    if isinstance(item, dict) and "value" in item
+                )
             
             context = "\n".join(context_parts) if context_parts else ""
             
             # Generate response using specialized forest knowledge
-            response = self.generate_response_with_context(
+            response, cache_hit = self.generate_cached_response_with_context(
                 query=query,
                 context=context,
-                temperature=0.6  # Slightly lower temperature for more factual responses
-            )
-            
-            # Store the interaction with forest-specific metadata
-            self.store_interaction(
                 user_id=user_id,
-                query=query,
-                response=response,
-                interaction_type="forest_analysis",
-                metadata={"analysis_type": self._detect_analysis_type(query)}
+                temperature=0.6,  # Slightly lower temperature for more factual responses
+                category=analysis_type
             )
             
-            # Store vector embedding for future forest research
-            self.store_vector_embedding(
-                user_id=user_id,
-                content=f"Forest Analysis Query: {query}\nAnalysis: {response}",
-                metadata={
-                    "agent": self.name, 
-                    "domain": "forest_ecology",
-                    "analysis_type": self._detect_analysis_type(query)
-                }
-            )
+            # Store the interaction with forest-specific metadata, plus its vector
+            # embedding for future forest research, in one write. A cached answer's
+            # near-duplicate exchange is already embedded, so it skips the encode.
+            if cache_hit:
+                self.store_interaction(
+                    user_id=user_id,
+                    query=query,
+                    response=response,
+                    interaction_type="forest_analysis",
+                    metadata={"analysis_type": analysis_type}
+                )
+            else:
+                self.store_interaction_with_embedding(
+                    user_id=user_id,
+                    query=query,
+                    response=response,
+                    content=f"Forest Analysis Query: {query}\nAnalysis: {response}",
+                    interaction_type="forest_analysis",
+                    metadata={"analysis_type": analysis_type},
+                    embedding_metadata={
+                        "agent": self.name, 
+                        "domain": "forest_ecology",
+                        "analysis_type": analysis_type
+                    }
+                )
             
             return self.format_state_response(
                 state=state,
@@ -120,7 +194,7 @@ class ForestAnalyzerAgent(BaseAgent):
                     "orchestration": {
                         "strategy": "forest_ecosystem_analysis",
                         "selected_agents": [self.name],
-                        "analysis_type": self._detect_analysis_type(query),
+                        "analysis_type": analysis_type,
                         "context_used": bool(context_parts)
                     }
                 }
@@ -134,41 +208,15 @@ class ForestAnalyzerAgent(BaseAgent):
         Determine if this agent can handle the query
         Enhanced logic for forest-related detection
         """
-        base_confidence = super().can_handle(query)
-        
+        # One scan for the keyword score and one for the boost buckets
         query_lower = query.lower()
-        
-        # High-confidence forest terms
-        high_confidence_terms = ["forest ecosystem", "biodiversity", "conservation", "deforestation"]
-        if any(term in query_lower for term in high_confidence_terms):
-            base_confidence = min(base_confidence + 0.4, 1.0)
-        
-        # Species and wildlife terms
-        species_terms = ["species", "wildlife", "habitat", "flora", "fauna"]
-        if any(term in query_lower for term in species_terms):
-            base_confidence = min(base_confidence + 0.3, 1.0)
-        
-        # Scientific research terms
-        research_terms = ["research", "study", "analysis", "ecological"]
-        if any(term in query_lower for term in research_terms):
-            base_confidence = min(base_confidence + 0.2, 1.0)
-        
-        return base_confidence
+        base_confidence = self._keyword_confidence(query_lower)
+        return self.score_confidence_terms(query_lower, base_confidence)
     
-    def _detect_analysis_type(self, query: str) -> str:
+    @staticmethod
+    def _detect_analysis_type(query_lower: str) -> str:
         """Detect the type of forest analysis requested"""
-        query_lower = query.lower()
-        
-        if any(term in query_lower for term in ["biodiversity", "species", "flora", "fauna"]):
-            return "biodiversity_analysis"
-        elif any(term in query_lower for term in ["conservation", "protection", "threat"]):
-            return "conservation_assessment"
-        elif any(term in query_lower for term in ["ecosystem", "ecological", "environment"]):
-            return "ecosystem_analysis"
-        elif any(term in query_lower for term in ["management", "sustainable", "forestry"]):
-            return "forest_management"
-        else:
-            return "general_forest_inquiry"
+        return _detect_analysis_type(query_lower)
     
     def analyze_forest_health(self, forest_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -180,24 +228,69 @@ class ForestAnalyzerAgent(BaseAgent):
         Returns:
             Dictionary with health assessment
         """
-        health_assessment = {
-            "overall_health": "unknown",
-            "key_indicators": [],
-            "recommendations": [],
-            "concerns": []
-        }
+        if "tree_cover" not in forest_data:
+            return self._empty_health_assessment()
+        return self.analyze_forest_health_batch({"tree_cover": [forest_data["tree_cover"]]})[0]
+    
+    def analyze_forest_health_batch(self, forest_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Vectorised analyze_forest_health over many plots
+        
+        Args:
+            forest_data: Dictionary of equal-length HEALTH_METRICS arrays, one element per plot
+                         (e.g. {"tree_cover": np.ndarray}); scalar metrics describe a single plot
+            
+        Returns:
+            List of health assessments, one per plot
+            
+        Raises:
+            ValueError: If the metric arrays differ in length
+        """
+        if not forest_data:
+            return []
         
         # This would integrate with real forest data APIs or databases
         # For now, provide a template structure
         
-        if "tree_cover" in forest_data:
-            tree_cover = forest_data["tree_cover"]
-            if tree_cover > 0.8:
-                health_assessment["key_indicators"].append("High tree cover percentage")
-            elif tree_cover < 0.3:
-                health_assessment["concerns"].append("Low tree cover indicates degradation")
+        metrics = {key: self._metric_values(forest_data[key]) for key in self.HEALTH_METRICS if key in forest_data}
+        lengths = {len(values) for values in metrics.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Forest metrics need one value per plot, got lengths {sorted(lengths)}")
+        plots = lengths.pop() if lengths else 1
+        assessments = [self._empty_health_assessment() for _ in range(plots)]
+        
+        if "tree_cover" in metrics:
+            tree_cover = metrics["tree_cover"]
+            if np is not None:
+                # Thresholds are evaluated over the whole batch; only flagged plots are touched in Python
+                high, low = np.flatnonzero(tree_cover > 0.8), np.flatnonzero(tree_cover < 0.3)
+            else:
+                high = [plot for plot, cover in enumerate(tree_cover) if cover > 0.8]
+                low = [plot for plot, cover in enumerate(tree_cover) if cover < 0.3]
+            for plot in high:
+                assessments[plot]["key_indicators"].append("High tree cover percentage")
+            for plot in low:
+                assessments[plot]["concerns"].append("Low tree cover indicates degradation")
         
-        return health_assessment
+        return assessments
+    
+    @staticmethod
+    def _metric_values(values):
+        """One metric as a 1-D float array (a list without numpy); a scalar becomes one plot"""
+        if np is not None:
+            return np.atleast_1d(np.asarray(values, dtype=np.float64))
+        if isinstance(values, (list, tuple)):
+            return [float(value) for value in values]
+        return [float(values)]
+    
+    @staticmethod
+    def _empty_health_assessment() -> Dict[str, Any]:
+        return {
+            "overall_health": "unknown",
+            "key_indicators": [],
+            "recommendations": [],
+            "concerns": []
+        }
     
     def get_conservation_recommendations(self, forest_type: str, threats: List[str]) -> List[str]:
         """
@@ -210,29 +303,21 @@ class ForestAnalyzerAgent(BaseAgent):
         Returns:
             List of conservation recommendations
         """
-        recommendations = []
-        
-        # Base recommendations by forest type
-        if forest_type.lower() == "tropical":
-            recommendations.extend([
-                "Establish protected corridors between forest fragments",
-                "Implement community-based forest management",
-                "Monitor illegal logging activities"
-            ])
-        elif forest_type.lower() == "temperate":
-            recommendations.extend([
-                "Maintain diverse age structure in forest stands",
-                "Control invasive species populations",
-                "Implement sustainable harvesting practices"
-            ])
+        # dict keys dedupe while keeping first-seen order, so the output is stable
+        recommendations = dict.fromkeys(_FOREST_TYPE_RECOMMENDATIONS.get(forest_type.lower(), ()))
         
         # Threat-specific recommendations
         for threat in threats:
-            if "logging" in threat.lower():
-                recommendations.append("Strengthen law enforcement against illegal logging")
-            elif "fire" in threat.lower():
-                recommendations.append("Develop fire management and prevention strategies")
-            elif "invasive" in threat.lower():
-                recommendations.append("Implement invasive species control programs")
+            threat_lower = threat.lower()
+            for marker, recommendation in _THREAT_RECOMMENDATIONS:
+                if marker in threat_lower:
+                    recommendations[recommendation] = None
+                    break
         
-        return list(set(recommendations))  # Remove duplicates
+        return list(recommendations)
+
+
+@lru_cache(maxsize=Config.AGENT_QUERY_CACHE_SIZE)
+def _detect_analysis_type(query_lower: str) -> str:
+    """Memoised analysis-type classification of a lowercased query"""
+    return match_category(ForestAnalyzerAgent._ANALYSIS_TYPE_RE, query_lower, "general_forest_inquiry")
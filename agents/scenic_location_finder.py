@@ -14,6 +14,27 @@ logger = logging.getLogger(__name__)
 class ScenicLocationFinderAgent(BaseAgent):
     """Agent specialized in finding and recommending scenic locations"""
     
+    # Only BaseAgent's attributes are set per instance
+    __slots__ = ()
+    
+    KEYWORDS = [
+        "scenic", "mountain", "landscape", "beautiful", "view", 
+        "tourist", "visit", "travel", "place", "location", 
+        "destination", "photography", "sight", "attraction"
+    ]
+    
+    # Characters of each past query carried into the prompt context
+    CONTEXT_PREVIEW_CHARS = 100
+    
+    confidence_terms = {
+        # High-confidence terms
+        "high_confidence": (0.3, ("scenic", "beautiful place", "tourist destination", "landscape")),
+        # Location-related terms
+        "location": (0.2, ("where to visit", "places to see", "destination", "travel to")),
+        # Photography-related terms
+        "photography": (0.1, ("photography", "photo spot", "instagram", "picture"))
+    }
+    
     def __init__(self, memory_manager=None, name: str = "ScenicLocationFinder"):
         super().__init__(memory_manager, name)
         self._description = "Scenic location finding agent for beautiful places with detailed recommendations"
@@ -28,11 +49,7 @@ class ScenicLocationFinderAgent(BaseAgent):
     @property
     def keywords(self) -> List[str]:
         """Keywords that trigger this agent"""
-        return [
-            "scenic", "mountain", "landscape", "beautiful", "view", 
-            "tourist", "visit", "travel", "place", "location", 
-            "destination", "photography", "sight", "attraction"
-        ]
+        return self.KEYWORDS
     
     @property
     def system_prompt(self) -> str:
@@ -62,49 +79,59 @@ class ScenicLocationFinderAgent(BaseAgent):
         try:
             self.log_processing(query, user_id)
             
-            # Search for similar past queries
-            search_results = self.search_similar_content(query, user_id, limit=3)
-            
-            # Get recent context
-            recent_context = self.get_recent_interactions(user_id, hours=2)
+            # Search for similar past queries and get recent context
+            # (both lookups run concurrently)
+            search_results, recent_context = self.fetch_recent_context(
+                query, user_id, limit=3, hours=2, content_preview=self.CONTEXT_PREVIEW_CHARS
+            )
             
             # Build context from search results and recent interactions
+            preview = self.CONTEXT_PREVIEW_CHARS
             context_parts = []
             if search_results.get("similar_content"):
                 context_parts.append("Previous similar queries:")
-                for item in search_results["similar_content"][:2]:
-                    if isinstance(item, dict) and "content" in item:
-                        context_parts.append(f"- {item['content'][:100]}...")
+                context_parts.extend(
+                    f"- {item['content'][:preview]}..."
+                    for item in search_results["similar_content"][:2]
+                    if isinstance(item, dict) and "content" in item
+                )
             
             if recent_context:
                 context_parts.append("Recent conversation context:")
-                for item in recent_context[-2:]:
-                    if isinstance(item, str):
-                        context_parts.append(f"- {item[:100]}...")
+                context_parts.extend(
+                    f"- {item[:preview]}..."
+                    for item in recent_context[-2:]
+                    if isinstance(item, str)
+                )
             
             context = "\n".join(context_parts) if context_parts else ""
             
             # Generate response using LLM
-            response = self.generate_response_with_context(
+            response, cache_hit = self.generate_cached_response_with_context(
                 query=query,
                 context=context,
-                temperature=0.7
-            )
-            
-            # Store the interaction
-            self.store_interaction(
                 user_id=user_id,
-                query=query,
-                response=response,
-                interaction_type="scenic_location_query"
+                temperature=0.7
             )
             
-            # Store vector embedding for future searches
-            self.store_vector_embedding(
-                user_id=user_id,
-                content=f"Query: {query}\nResponse: {response}",
-                metadata={"agent": self.name, "query_type": "scenic_location"}
-            )
+            # Store the interaction and its vector embedding for future searches in one write.
+            # A cached answer's near-duplicate exchange is already embedded, so it skips the encode.
+            if cache_hit:
+                self.store_interaction(
+                    user_id=user_id,
+                    query=query,
+                    response=response,
+                    interaction_type="scenic_location_query"
+                )
+            else:
+                self.store_interaction_with_embedding(
+                    user_id=user_id,
+                    query=query,
+                    response=response,
+                    content=f"Query: {query}\nResponse: {response}",
+                    interaction_type="scenic_location_query",
+                    embedding_metadata={"agent": self.name, "query_type": "scenic_location"}
+                )
             
             return self.format_state_response(
                 state=state,
@@ -126,27 +153,10 @@ class ScenicLocationFinderAgent(BaseAgent):
         Determine if this agent can handle the query
         Enhanced logic for scenic location detection
         """
-        base_confidence = super().can_handle(query)
-        
-        # Additional confidence boosters
+        # One scan for the keyword score and one for the boost buckets
         query_lower = query.lower()
-        
-        # High-confidence terms
-        high_confidence_terms = ["scenic", "beautiful place", "tourist destination", "landscape"]
-        if any(term in query_lower for term in high_confidence_terms):
-            base_confidence = min(base_confidence + 0.3, 1.0)
-        
-        # Location-related terms
-        location_terms = ["where to visit", "places to see", "destination", "travel to"]
-        if any(term in query_lower for term in location_terms):
-            base_confidence = min(base_confidence + 0.2, 1.0)
-        
-        # Photography-related terms
-        photo_terms = ["photography", "photo spot", "instagram", "picture"]
-        if any(term in query_lower for term in photo_terms):
-            base_confidence = min(base_confidence + 0.1, 1.0)
-        
-        return base_confidence
+        base_confidence = self._keyword_confidence(query_lower)
+        return self.score_confidence_terms(query_lower, base_confidence)
     
     def get_specialized_recommendations(self, location_type: str, region: str = "") -> Dict[str, Any]:
         """
@@ -6,8 +6,11 @@ from user history and providing pattern analysis.
 
 from typing import Dict, Any, List
 import logging
-import json
+from collections import Counter
+from datetime import datetime, timedelta
+from config import Config
 from core.base_agent import BaseAgent, GraphState
+from core.keyword_matcher import compile_category_pattern, match_category
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +18,31 @@ logger = logging.getLogger(__name__)
 class SearchAgent(BaseAgent):
     """Agent specialized in semantic search and pattern analysis"""
     
+    KEYWORDS = [
+        "search", "history", "previous", "before", "recall", "remember",
+        "similar", "past", "find", "lookup", "pattern", "trend"
+    ]
+    
+    # Window of cross-agent history considered by the comprehensive search
+    RECENT_HISTORY_DAYS = 30
+    
+    # Search types in priority order; the first type with any term present wins
+    _SEARCH_TYPE_RE = compile_category_pattern({
+        "pattern_analysis": ("pattern", "trend", "common"),
+        "recent_search": ("recent", "latest", "new"),
+        "similarity_search": ("similar", "like", "related"),
+        "comprehensive_search": ("history", "all", "everything")
+    })
+    
+    confidence_terms = {
+        # High-confidence search terms
+        "high_confidence": (0.5, ("find similar", "search history", "what did i ask", "previous conversation")),
+        # Memory-related terms
+        "memory": (0.3, ("remember", "recall", "history", "before", "previous")),
+        # Pattern analysis terms
+        "pattern": (0.2, ("pattern", "trend", "similar", "like this"))
+    }
+    
     def __init__(self, memory_manager=None, name: str = "SearchAgent"):
         super().__init__(memory_manager, name)
         self._description = "Vector-based similarity search agent for history matching and pattern analysis"
@@ -30,10 +58,7 @@ class SearchAgent(BaseAgent):
     @property
     def keywords(self) -> List[str]:
         """Keywords that trigger this agent"""
-        return [
-            "search", "history", "previous", "before", "recall", "remember",
-            "similar", "past", "find", "lookup", "pattern", "trend"
-        ]
+        return self.KEYWORDS
     
     @property
     def system_prompt(self) -> str:
@@ -60,12 +85,15 @@ class SearchAgent(BaseAgent):
         
         query = state.get("question", "")
         user_id = state.get("user_id", 0)
+        query_lower = query.lower()
         
         try:
             self.log_processing(query, user_id)
             
+            search_type = self._detect_search_type(query_lower)
+            
             # Perform comprehensive search
-            search_results = self._perform_comprehensive_search(query, user_id)
+            search_results = self._perform_comprehensive_search(query, user_id, query_lower)
             
             # Analyze patterns in the results
             pattern_analysis = self._analyze_patterns(search_results, query)
@@ -80,7 +108,7 @@ class SearchAgent(BaseAgent):
                 response=response,
                 interaction_type="search_analysis",
                 metadata={
-                    "search_type": self._detect_search_type(query),
+                    "search_type": search_type,
                     "results_count": len(search_results.get("items", []))
                 }
             )
@@ -92,7 +120,7 @@ class SearchAgent(BaseAgent):
                     "orchestration": {
                         "strategy": "semantic_search_analysis",
                         "selected_agents": [self.name],
-                        "search_type": self._detect_search_type(query),
+                        "search_type": search_type,
                         "results_found": len(search_results.get("items", []))
                     }
                 }
@@ -106,28 +134,12 @@ class SearchAgent(BaseAgent):
         Determine if this agent can handle the query
         Enhanced logic for search-related detection
         """
-        base_confidence = super().can_handle(query)
-        
+        # One scan for the keyword score and one for the boost buckets
         query_lower = query.lower()
-        
-        # High-confidence search terms
-        high_confidence_terms = ["find similar", "search history", "what did i ask", "previous conversation"]
-        if any(term in query_lower for term in high_confidence_terms):
-            base_confidence = min(base_confidence + 0.5, 1.0)
-        
-        # Memory-related terms
-        memory_terms = ["remember", "recall", "history", "before", "previous"]
-        if any(term in query_lower for term in memory_terms):
-            base_confidence = min(base_confidence + 0.3, 1.0)
-        
-        # Pattern analysis terms
-        pattern_terms = ["pattern", "trend", "similar", "like this"]
-        if any(term in query_lower for term in pattern_terms):
-            base_confidence = min(base_confidence + 0.2, 1.0)
-        
-        return base_confidence
+        base_confidence = self._keyword_confidence(query_lower)
+        return self.score_confidence_terms(query_lower, base_confidence)
     
-    def _perform_comprehensive_search(self, query: str, user_id: int) -> Dict[str, Any]:
+    def _perform_comprehensive_search(self, query: str, user_id: int, query_lower: str) -> Dict[str, Any]:
         """Perform comprehensive search across all available data"""
         search_results = {
             "query": query,
@@ -138,8 +150,20 @@ class SearchAgent(BaseAgent):
         }
         
         try:
+            # This agent's own similarity search overlaps the cross-agent history lookup below
+            current_future = self.submit_context_read(self.search_similar_content, query, user_id, 10)
+            
+            # Search recent interactions across time; STM is always scanned, LTM by
+            # vector similarity when embeddings are available
+            stm_future = self.submit_context_read(self._stm_text_matches, query_lower, user_id)
+            if getattr(self.memory, 'embedding_model', None):
+                history_matches = self._vector_history_matches(query, user_id)
+            else:
+                history_matches = self._ltm_text_matches(query_lower, user_id)
+            history_matches.extend(stm_future.result())
+            
             # Search current agent's history
-            current_results = self.search_similar_content(query, user_id, limit=10)
+            current_results = current_future.result()
             if current_results.get("similar_content"):
                 search_results["items"].extend(current_results["similar_content"])
                 search_results["agents_searched"].append(self.name)
@@ -151,30 +175,7 @@ class SearchAgent(BaseAgent):
                     search_results["items"].extend(cross_agent_results)
                     search_results["agents_searched"].append("cross_agent_search")
             
-            # Search recent interactions across time
-            recent_stm = self.memory.get_recent_stm(user_id, None, hours=48)  # All agents, 48 hours
-            recent_ltm = self.memory.get_recent_ltm(user_id, None, days=30)   # All agents, 30 days
-            
-            # Text-based similarity for recent data
-            query_lower = query.lower()
-            for item in recent_stm:
-                if isinstance(item, str) and query_lower in item.lower():
-                    search_results["items"].append({
-                        "content": item,
-                        "type": "stm",
-                        "relevance": item.lower().count(query_lower)
-                    })
-            
-            for item in recent_ltm:
-                if isinstance(item, dict) and "value" in item:
-                    content = item["value"]
-                    if query_lower in content.lower():
-                        search_results["items"].append({
-                            "content": content,
-                            "type": "ltm",
-                            "relevance": content.lower().count(query_lower),
-                            "timestamp": item.get("timestamp")
-                        })
+            search_results["items"].extend(history_matches)
             
             # Remove duplicates and sort by relevance
             unique_items = []
@@ -186,8 +187,9 @@ class SearchAgent(BaseAgent):
                     seen_content.add(content)
                     unique_items.append(item)
             
-            # Sort by relevance
-            unique_items.sort(key=lambda x: x.get("relevance", 0), reverse=True)
+            # Sort by relevance; every source reports it on a 0-1 scale, and results
+            # from the similarity searches carry cosine similarity instead
+            unique_items.sort(key=lambda x: x.get("relevance", x.get("similarity", 0)), reverse=True)
             search_results["items"] = unique_items[:20]  # Limit to top 20 results
             
         except Exception as e:
@@ -196,6 +198,72 @@ class SearchAgent(BaseAgent):
         
         return search_results
     
+    def _vector_history_matches(self, query: str, user_id: int) -> List[Dict[str, Any]]:
+        """
+        Vector similarity across every agent's stored exchanges for this user.
+        MemoryManager keeps these in a per-user index (HNSW once large), so this is
+        one k-NN lookup rather than a scan over every recent row. Exchanges below
+        Config.SEARCH_HISTORY_MIN_SIMILARITY are not relevant history.
+        """
+        cutoff = datetime.now() - timedelta(days=self.RECENT_HISTORY_DAYS)
+        matches = []
+        for item in self.memory.similarity_search(query, user_id, None, limit=20):
+            if item["similarity"] < Config.SEARCH_HISTORY_MIN_SIMILARITY:
+                continue
+            created_at = item.get("created_at")
+            if isinstance(created_at, datetime) and created_at < cutoff:
+                continue
+            matches.append({
+                "content": item["content"],
+                "type": "ltm",
+                "agent": item.get("agent_name"),
+                "relevance": item["similarity"],
+                "timestamp": created_at
+            })
+        return matches
+    
+    @staticmethod
+    def _text_relevance(content: str, query_lower: str) -> float:
+        """
+        Literal match score on the same 0-1 scale as cosine similarity:
+        0 when the query is absent, then 1/2, 2/3, 3/4... as occurrences grow
+        """
+        # count() > 0 doubles as the containment check, on one lowered copy
+        occurrences = content.lower().count(query_lower)
+        return occurrences / (occurrences + 1)
+    
+    def _stm_text_matches(self, query_lower: str, user_id: int) -> List[Dict[str, Any]]:
+        """Literal (lowercased) query matches in the last 48 hours of STM, across all agents"""
+        matches = []
+        for item in self.memory.get_recent_stm(user_id, None, hours=48):
+            content = item.get("value") if isinstance(item, dict) else item
+            if not isinstance(content, str):
+                continue
+            relevance = self._text_relevance(content, query_lower)
+            if relevance:
+                matches.append({
+                    "content": content,
+                    "type": "stm",
+                    "relevance": relevance
+                })
+        return matches
+    
+    def _ltm_text_matches(self, query_lower: str, user_id: int) -> List[Dict[str, Any]]:
+        """Literal (lowercased) query matches in recent LTM, for memory backends without embeddings"""
+        matches = []
+        for item in self.memory.get_recent_ltm(user_id, None, days=self.RECENT_HISTORY_DAYS):   # All agents
+            if isinstance(item, dict) and "value" in item:
+                content = item["value"]
+                relevance = self._text_relevance(content, query_lower)
+                if relevance:
+                    matches.append({
+                        "content": content,
+                        "type": "ltm",
+                        "relevance": relevance,
+                        "timestamp": item.get("timestamp")
+                    })
+        return matches
+    
     def _analyze_patterns(self, search_results: Dict[str, Any], query: str) -> Dict[str, Any]:
         """Analyze patterns in search results"""
         pattern_analysis = {
@@ -209,25 +277,31 @@ class SearchAgent(BaseAgent):
         if not items:
             return pattern_analysis
         
+        # One pass gathers the text for theme analysis and the per-type counts
+        contents = []
+        stm_matches = ltm_matches = 0
+        for item in items:
+            contents.append(item.get("content", ""))
+            item_type = item.get("type")
+            if item_type == "stm":
+                stm_matches += 1
+            elif item_type == "ltm":
+                ltm_matches += 1
+        
         # Theme analysis
-        all_content = " ".join([item.get("content", "") for item in items]).lower()
+        all_content = " ".join(contents).lower()
         
-        # Simple keyword frequency (could be enhanced with NLP)
-        words = all_content.split()
-        word_freq = {}
-        for word in words:
-            if len(word) > 3:  # Filter short words
-                word_freq[word] = word_freq.get(word, 0) + 1
+        # Simple keyword frequency (could be enhanced with NLP); short words are filtered
+        word_freq = Counter(word for word in all_content.split() if len(word) > 3)
         
-        # Top themes
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:10]
-        pattern_analysis["themes"] = [word for word, freq in sorted_words if freq > 1]
+        # Top themes; most_common keeps first-seen order among equal counts
+        pattern_analysis["themes"] = [word for word, freq in word_freq.most_common(10) if freq > 1]
         
         # Frequency analysis
         pattern_analysis["frequency_analysis"] = {
             "total_matches": len(items),
-            "stm_matches": len([item for item in items if item.get("type") == "stm"]),
-            "ltm_matches": len([item for item in items if item.get("type") == "ltm"])
+            "stm_matches": stm_matches,
+            "ltm_matches": ltm_matches
         }
         
         # Generate insights
@@ -277,20 +351,9 @@ class SearchAgent(BaseAgent):
         
         return "\n".join(response_parts)
     
-    def _detect_search_type(self, query: str) -> str:
+    def _detect_search_type(self, query_lower: str) -> str:
         """Detect the type of search being requested"""
-        query_lower = query.lower()
-        
-        if any(term in query_lower for term in ["pattern", "trend", "common"]):
-            return "pattern_analysis"
-        elif any(term in query_lower for term in ["recent", "latest", "new"]):
-            return "recent_search"
-        elif any(term in query_lower for term in ["similar", "like", "related"]):
-            return "similarity_search"
-        elif any(term in query_lower for term in ["history", "all", "everything"]):
-            return "comprehensive_search"
-        else:
-            return "general_search"
+        return match_category(self._SEARCH_TYPE_RE, query_lower, "general_search")
     
     def search_by_timeframe(self, user_id: int, timeframe: str, query: str = "") -> Dict[str, Any]:
         """Search within specific timeframe"""
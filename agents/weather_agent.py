@@ -4,16 +4,83 @@ Specialized agent for weather information, forecasts, and climate analysis
 Part of the LangGraph Multiagent System
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
 import logging
+import threading
+import time
 from datetime import datetime
+from config import Config
 from core.base_agent import BaseAgent, GraphState
+from core.keyword_matcher import compile_category_pattern, match_category
+from core import ollama_client as ollama_client_module
+from core.ollama_client import is_error_response
 
 logger = logging.getLogger(__name__)
 
+# Generated weather answers keyed on the prompt inputs; entries expire after WEATHER_RESPONSE_CACHE_TTL
+_weather_response_cache: "OrderedDict[Tuple[str, str, str], Tuple[float, str]]" = OrderedDict()
+_weather_response_lock = threading.Lock()
+
+
+def _cached_weather_response(key: Tuple[str, str, str]) -> Optional[str]:
+    """Unexpired cached response for key, refreshing its LRU position"""
+    with _weather_response_lock:
+        entry = _weather_response_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _weather_response_cache[key]
+            return None
+        _weather_response_cache.move_to_end(key)
+        return entry[1]
+
+
+def _cache_weather_response(key: Tuple[str, str, str], response: str):
+    """Store a response, evicting the least recently used entry when full"""
+    with _weather_response_lock:
+        _weather_response_cache[key] = (time.monotonic() + Config.WEATHER_RESPONSE_CACHE_TTL, response)
+        _weather_response_cache.move_to_end(key)
+        while len(_weather_response_cache) > Config.WEATHER_RESPONSE_CACHE_SIZE:
+            _weather_response_cache.popitem(last=False)
+
+
 class WeatherAgent(BaseAgent):
     """Agent specialized in weather information and climate analysis"""
     
+    KEYWORDS = [
+        "weather", "temperature", "rain", "sun", "climate", "forecast", 
+        "humidity", "wind", "storm", "snow", "hot", "cold", "sunny",
+        "cloudy", "precipitation", "barometric", "pressure", "degrees"
+    ]
+    
+    # Weather query types in priority order; the first type with any term present wins
+    _WEATHER_TYPE_RE = compile_category_pattern({
+        "forecast": ("forecast", "tomorrow", "next week", "future"),
+        "current_conditions": ("current", "now", "today", "right now"),
+        "climate_analysis": ("climate", "seasonal", "average", "typical"),
+        "activity_planning": ("activity", "outdoor", "travel", "plan"),
+        "weather_alerts": ("alert", "warning", "severe", "storm")
+    })
+    
+    confidence_terms = {
+        # High confidence weather terms
+        "high_confidence": (0.6, (
+            "weather forecast", "what's the weather", "temperature today", 
+            "will it rain", "is it sunny", "weather condition"
+        )),
+        # Weather activity terms
+        "activity": (0.4, (
+            "outdoor activity", "hiking weather", "beach weather", 
+            "travel weather", "weather for"
+        )),
+        # Specific weather phenomena
+        "phenomena": (0.3, (
+            "storm", "hurricane", "snow", "blizzard", "heat wave", 
+            "cold front", "precipitation"
+        ))
+    }
+    
     def __init__(self, memory_manager=None, name: str = "WeatherAgent"):
         super().__init__(memory_manager, name)
         self._description = "Weather information, forecasts, and climate analysis specialist"
@@ -31,11 +98,7 @@ class WeatherAgent(BaseAgent):
     @property
     def keywords(self) -> List[str]:
         """Keywords that trigger this agent"""
-        return [
-            "weather", "temperature", "rain", "sun", "climate", "forecast", 
-            "humidity", "wind", "storm", "snow", "hot", "cold", "sunny",
-            "cloudy", "precipitation", "barometric", "pressure", "degrees"
-        ]
+        return self.KEYWORDS
     
     @property
     def system_prompt(self) -> str:
@@ -66,15 +129,17 @@ Consider the impact of weather on user activities and provide relevant recommend
         
         try:
             self.log_processing(query, user_id)
+            query_lower = query.lower()
             
             # Extract location context if available
-            location_context = self._extract_location_context(state)
+            location_context = self._extract_location_context(state, query_lower)
             
             # Analyze weather query type
-            weather_type = self._analyze_weather_query(query)
+            weather_type = self._analyze_weather_query(query_lower)
             
             # Generate weather response
             weather_response = self._generate_weather_response(query, location_context, weather_type)
+            timestamp = datetime.now().isoformat()
             
             # Store the weather interaction
             self.store_interaction(
@@ -85,7 +150,7 @@ Consider the impact of weather on user activities and provide relevant recommend
                 metadata={
                     "weather_type": weather_type,
                     "location_context": location_context,
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": timestamp
                 }
             )
             
@@ -96,7 +161,7 @@ Consider the impact of weather on user activities and provide relevant recommend
                     "weather_data": {
                         "analysis_type": weather_type,
                         "location_context": location_context,
-                        "timestamp": datetime.now().isoformat()
+                        "timestamp": timestamp
                     }
                 }
             )
@@ -106,79 +171,42 @@ Consider the impact of weather on user activities and provide relevant recommend
     
     def can_handle(self, query: str) -> float:
         """Determine if this agent can handle the weather query"""
-        base_confidence = super().can_handle(query)
-        
+        # One scan for the keyword score and one for the boost buckets
         query_lower = query.lower()
-        
-        # High confidence weather terms
-        high_confidence_terms = [
-            "weather forecast", "what's the weather", "temperature today", 
-            "will it rain", "is it sunny", "weather condition"
-        ]
-        if any(term in query_lower for term in high_confidence_terms):
-            base_confidence = min(base_confidence + 0.6, 1.0)
-        
-        # Weather activity terms
-        activity_terms = [
-            "outdoor activity", "hiking weather", "beach weather", 
-            "travel weather", "weather for"
-        ]
-        if any(term in query_lower for term in activity_terms):
-            base_confidence = min(base_confidence + 0.4, 1.0)
-        
-        # Specific weather phenomena
-        phenomena_terms = [
-            "storm", "hurricane", "snow", "blizzard", "heat wave", 
-            "cold front", "precipitation"
-        ]
-        if any(term in query_lower for term in phenomena_terms):
-            base_confidence = min(base_confidence + 0.3, 1.0)
-        
-        return base_confidence
+        base_confidence = self._keyword_confidence(query_lower)
+        return self.score_confidence_terms(query_lower, base_confidence)
     
-    def _extract_location_context(self, state: GraphState) -> str:
-        """Extract location information from state or query"""
+    def _extract_location_context(self, state: GraphState, query_lower: str) -> str:
+        """Extract location information from state or the (lowercased) query"""
         location_data = state.get("location_data", {})
         if location_data:
             return location_data.get("location", "")
         
-        # Try to extract from query
-        query = state.get("question", "").lower()
-        
-        # Simple location extraction (can be enhanced with NLP)
+        # Simple location extraction from the query (can be enhanced with NLP)
         location_keywords = ["in ", "at ", "for ", "around ", "near "]
         for keyword in location_keywords:
-            if keyword in query:
-                parts = query.split(keyword)
+            if keyword in query_lower:
+                parts = query_lower.split(keyword)
                 if len(parts) > 1:
                     potential_location = parts[1].split()[0:3]  # Take next few words
                     return " ".join(potential_location)
         
         return "general area"
     
-    def _analyze_weather_query(self, query: str) -> str:
+    def _analyze_weather_query(self, query_lower: str) -> str:
         """Analyze the type of weather query"""
-        query_lower = query.lower()
-        
-        if any(term in query_lower for term in ["forecast", "tomorrow", "next week", "future"]):
-            return "forecast"
-        elif any(term in query_lower for term in ["current", "now", "today", "right now"]):
-            return "current_conditions"
-        elif any(term in query_lower for term in ["climate", "seasonal", "average", "typical"]):
-            return "climate_analysis"
-        elif any(term in query_lower for term in ["activity", "outdoor", "travel", "plan"]):
-            return "activity_planning"
-        elif any(term in query_lower for term in ["alert", "warning", "severe", "storm"]):
-            return "weather_alerts"
-        else:
-            return "general_weather"
+        return match_category(self._WEATHER_TYPE_RE, query_lower, "general_weather")
     
     def _generate_weather_response(self, query: str, location_context: str, weather_type: str) -> str:
         """Generate comprehensive weather response"""
+        # The prompt is built only from these, so repeats within the TTL reuse the answer
+        cache_key = (weather_type, location_context.lower(), " ".join(query.lower().split()))
+        cached_response = _cached_weather_response(cache_key)
+        if cached_response is not None:
+            logger.debug("Weather response cache hit for %s", location_context)
+            return cached_response
+        
         try:
-            # Use the LLM to generate weather response
-            from core.ollama_client import ollama_client
-            
             # Create enhanced prompt with context
             enhanced_query = f"{query}"
             if location_context and location_context != "general area":
@@ -198,11 +226,18 @@ Please provide a comprehensive weather analysis including:
 
 Be specific, practical, and helpful."""
 
-            response = ollama_client.generate_response(
+            # Generation time grows with output length, so the answer is capped well below the global default.
+            # The client is looked up on the module each call so a swapped-in client (e.g. the test mock) is used
+            response = ollama_client_module.ollama_client.generate_response(
                 prompt=context_prompt,
-                system_prompt=self.system_prompt
+                system_prompt=self.system_prompt,
+                max_tokens=Config.WEATHER_MAX_TOKENS,
+                temperature=Config.WEATHER_TEMPERATURE
             )
             
+            if not is_error_response(response):
+                _cache_weather_response(cache_key, response)
+            
             return response
             
         except Exception as e:
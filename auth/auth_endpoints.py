@@ -3,10 +3,12 @@
 🔐 Authentication API Endpoints
 FastAPI endpoints for user authentication and activity management
 """
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+from datetime import datetime
+import json
 import logging
 
 try:
@@ -14,11 +16,39 @@ try:
 except ImportError:
     auth_service = None
 
+# List endpoints serialize with orjson when installed (ORJSONResponse needs it at render time).
+# Rows are passed through with their datetime values; both classes render them as ISO 8601
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as ListResponse
+except ImportError:
+    from fastapi.responses import JSONResponse
+
+    def _json_default(value: Any) -> str:
+        if isinstance(value, datetime):
+            return value.isoformat()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    class ListResponse(JSONResponse):
+        """JSONResponse that writes datetimes the way ORJSONResponse does"""
+
+        def render(self, content: Any) -> bytes:
+            return json.dumps(
+                content,
+                ensure_ascii=False,
+                allow_nan=False,
+                separators=(",", ":"),
+                default=_json_default
+            ).encode("utf-8")
+
 logger = logging.getLogger(__name__)
 
 # Security scheme
 security = HTTPBearer(auto_error=False)
 
+# Largest page the history endpoints return; later pages are fetched with the X-Next-Cursor header
+MAX_PAGE_SIZE = 100
+
 # Request/Response models
 class RegisterRequest(BaseModel):
     username: str
@@ -60,16 +90,39 @@ class QueryResponse(BaseModel):
     created_at: str
 
 # Router
+# Handlers and dependencies that call the blocking auth_service are plain `def`, so
+# Starlette runs them in its threadpool instead of stalling the event loop
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 def get_client_ip(request: Request) -> str:
     """Extract client IP address from request"""
     forwarded = request.headers.get("X-Forwarded-For")
     if forwarded:
-        return forwarded.split(",")[0].strip()
+        # Only the first (client) hop is needed, so don't split the whole proxy chain
+        return forwarded.partition(",")[0].strip()
     return request.client.host if request.client else "unknown"
 
-async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)):
+def _encode_page_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque keyset cursor for the row after which the next page starts"""
+    return f"{created_at.isoformat()}_{row_id}"
+
+def _decode_page_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Parse a cursor from _encode_page_cursor back into (created_at, row_id)"""
+    if not cursor:
+        return None
+    try:
+        created_at, row_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _page_headers(rows: List[Dict[str, Any]], limit: int, id_column: str) -> Dict[str, str]:
+    """X-Next-Cursor header advertising the next page when this one came back full"""
+    if len(rows) == limit and rows[-1].get('created_at'):
+        return {"X-Next-Cursor": _encode_page_cursor(rows[-1]['created_at'], rows[-1][id_column])}
+    return {}
+
+def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)):
     """Dependency to get current authenticated user"""
     if not auth_service:
         raise HTTPException(status_code=503, detail="Authentication service unavailable")
@@ -83,8 +136,25 @@ async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] =
     
     return user
 
+def get_token_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)):
+    """
+    Dependency for endpoints that only need the caller's id: checks the token's signature,
+    expiry and revocation without loading the user row
+    """
+    if not auth_service:
+        raise HTTPException(status_code=503, detail="Authentication service unavailable")
+    
+    if not credentials:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    
+    payload = auth_service.verify_token(credentials.credentials)
+    if not payload:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    
+    return {'id': payload['user_id'], 'username': payload['username']}
+
 @router.post("/register", response_model=AuthResponse)
-async def register(request: RegisterRequest, req: Request):
+def register(request: RegisterRequest, req: Request):
     """Register a new user"""
     if not auth_service:
         raise HTTPException(status_code=503, detail="Authentication service unavailable")
@@ -118,7 +188,7 @@ async def register(request: RegisterRequest, req: Request):
     )
 
 @router.post("/login", response_model=AuthResponse)
-async def login(request: LoginRequest, req: Request):
+def login(request: LoginRequest, req: Request):
     """Login user"""
     if not auth_service:
         raise HTTPException(status_code=503, detail="Authentication service unavailable")
@@ -151,7 +221,7 @@ async def login(request: LoginRequest, req: Request):
     )
 
 @router.post("/logout")
-async def logout(req: Request, credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)):
+def logout(req: Request, credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)):
     """Logout user"""
     if not auth_service:
         raise HTTPException(status_code=503, detail="Authentication service unavailable")
@@ -159,6 +229,7 @@ async def logout(req: Request, credentials: Optional[HTTPAuthorizationCredential
     # Get session ID from token if available
     session_id = None
     if credentials:
+        auth_service.revoke_token(credentials.credentials)
         token_data = auth_service._verify_session_token(credentials.credentials)
         if token_data and hasattr(req, 'session'):
             session_id = getattr(req.session, 'session_id', None)
@@ -167,7 +238,7 @@ async def logout(req: Request, credentials: Optional[HTTPAuthorizationCredential
     ip_address = get_client_ip(req)
     
     # Note: In a real implementation, we'd need to track session_id in the token or request
-    # For now, we'll just return success (the JWT token becomes invalid on client side)
+    # The token itself is revoked above, so it is rejected until it expires
     
     return {"success": True, "message": "Logged out successfully"}
 
@@ -183,86 +254,81 @@ async def get_me(current_user: Dict = Depends(get_current_user)):
     )
 
 @router.get("/activity", response_model=List[ActivityResponse])
-async def get_activity(
-    limit: int = 50,
-    current_user: Dict = Depends(get_current_user)
+def get_activity(
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Dict = Depends(get_token_user)
 ):
-    """Get user activity history"""
+    """Get user activity history, one page at a time"""
     if not auth_service:
         raise HTTPException(status_code=503, detail="Authentication service unavailable")
     
-    activities = auth_service.get_user_activity(current_user['id'], limit)
+    activities = auth_service.get_user_activity(current_user['id'], limit, _decode_page_cursor(cursor))
     
-    return [
-        ActivityResponse(
-            activity_type=activity['activity_type'],
-            activity_data=activity.get('activity_data', {}),
-            created_at=activity['created_at'].isoformat() if activity['created_at'] else None,
-            ip_address=activity.get('ip_address')
-        )
-        for activity in activities
-    ]
+    # Rows are already shaped like ActivityResponse, so skip per-item model construction;
+    # response_model still documents the schema
+    return ListResponse(
+        [
+            {
+                "activity_type": activity['activity_type'],
+                "activity_data": activity.get('activity_data', {}),
+                "created_at": activity['created_at'],
+                "ip_address": activity.get('ip_address')
+            }
+            for activity in activities
+        ],
+        headers=_page_headers(activities, limit, 'activity_id')
+    )
 
 @router.get("/queries", response_model=List[QueryResponse])
-async def get_queries(
-    limit: int = 50,
-    current_user: Dict = Depends(get_current_user)
+def get_queries(
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Dict = Depends(get_token_user)
 ):
-    """Get user query history"""
+    """Get user query history, one page at a time"""
     if not auth_service:
         raise HTTPException(status_code=503, detail="Authentication service unavailable")
     
-    queries = auth_service.get_user_queries(current_user['id'], limit)
+    queries = auth_service.get_user_queries(current_user['id'], limit, _decode_page_cursor(cursor))
     
-    return [
-        QueryResponse(
-            query_id=query['query_id'],
-            question=query['question'],
-            agent_used=query['agent_used'],
-            response_preview=query.get('response_preview', query['response_text'][:200]),
-            edges_traversed=query.get('edges_traversed', []),
-            processing_time=float(query['processing_time']) if query['processing_time'] else None,
-            created_at=query['created_at'].isoformat() if query['created_at'] else None
-        )
-        for query in queries
-    ]
+    # Rows are already shaped like QueryResponse, so skip per-item model construction;
+    # response_model still documents the schema
+    return ListResponse(
+        [
+            {
+                "query_id": query['query_id'],
+                "question": query['question'],
+                "agent_used": query['agent_used'],
+                "response_preview": query['response_preview'],
+                "edges_traversed": query.get('edges_traversed') or [],
+                "processing_time": float(query['processing_time']) if query['processing_time'] else None,
+                "created_at": query['created_at']
+            }
+            for query in queries
+        ],
+        headers=_page_headers(queries, limit, 'query_id')
+    )
 
 @router.get("/stats")
-async def get_user_stats(current_user: Dict = Depends(get_current_user)):
+def get_user_stats(current_user: Dict = Depends(get_current_user)):
     """Get user statistics"""
     if not auth_service:
         raise HTTPException(status_code=503, detail="Authentication service unavailable")
     
-    # Get recent activity and queries
-    activities = auth_service.get_user_activity(current_user['id'], 1000)
-    queries = auth_service.get_user_queries(current_user['id'], 1000)
-    
-    # Calculate statistics
-    total_queries = len(queries)
-    total_activities = len(activities)
-    
-    # Count queries by agent
-    agent_usage = {}
-    for query in queries:
-        agent = query.get('agent_used', 'Unknown')
-        agent_usage[agent] = agent_usage.get(agent, 0) + 1
-    
-    # Activity types
-    activity_types = {}
-    for activity in activities:
-        activity_type = activity.get('activity_type', 'unknown')
-        activity_types[activity_type] = activity_types.get(activity_type, 0) + 1
+    # Counts are aggregated by the database in a single query
+    stats = auth_service.get_user_stats(current_user['id'])
     
     return {
         "user_id": current_user['id'],
         "username": current_user['username'],
-        "total_queries": total_queries,
-        "total_activities": total_activities,
-        "agent_usage": agent_usage,
-        "activity_types": activity_types,
-        "member_since": current_user['created_at'].isoformat() if current_user['created_at'] else None,
-        "last_login": current_user['last_login'].isoformat() if current_user['last_login'] else None
+        "total_queries": stats['total_queries'],
+        "total_activities": stats['total_activities'],
+        "agent_usage": stats['agent_usage'],
+        "activity_types": stats['activity_types'],
+        "member_since": current_user['created_at'],
+        "last_login": current_user['last_login']
     }
 
 # Export router and dependency
-__all__ = ['router', 'get_current_user']
+__all__ = ['router', 'get_current_user', 'get_token_user']
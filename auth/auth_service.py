@@ -5,40 +5,195 @@ Handles user registration, login, session management, and activity tracking
 """
 import bcrypt
 import jwt
+import atexit
 import secrets
+import threading
+import time
 import mysql.connector
+from mysql.connector import pooling
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 import logging
 import json
 
+from config import Config
+from core.background_writer import BackgroundWriter
+
+# Optional imports with fallbacks
+try:
+    import redis
+except ImportError:
+    redis = None
+
 logger = logging.getLogger(__name__)
 
+class _TTLCache:
+    """
+    Thread-safe LRU whose entries expire after a fixed number of seconds (or an explicit deadline).
+    With max_entries=None nothing is evicted early: expired entries are swept once the store
+    doubles in size, so it holds only what is still live.
+    """
+    
+    # Size at which an uncapped store first sweeps out expired entries
+    MIN_SWEEP_SIZE = 1024
+    
+    def __init__(self, max_entries: Optional[int], ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._sweep_at = self.MIN_SWEEP_SIZE
+    
+    def get(self, key) -> Optional[Any]:
+        """Unexpired value for key, refreshing its LRU position"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def set(self, key, value, expires_at: Optional[float] = None):
+        """Store value until the TTL (or an earlier expires_at) passes, evicting the least recently used entry when full"""
+        deadline = time.time() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        with self._lock:
+            self._entries[key] = (deadline, value)
+            self._entries.move_to_end(key)
+            if self.max_entries is None:
+                if len(self._entries) >= self._sweep_at:
+                    now = time.time()
+                    for expired in [k for k, (entry_deadline, _) in self._entries.items() if entry_deadline <= now]:
+                        del self._entries[expired]
+                    self._sweep_at = max(self.MIN_SWEEP_SIZE, 2 * len(self._entries))
+                return
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def pop(self, key):
+        """Drop key if cached"""
+        with self._lock:
+            self._entries.pop(key, None)
+
 class AuthService:
+    # Characters of each stored response returned by the query history list
+    RESPONSE_PREVIEW_CHARS = 200
+    
+    # Redis key marking a token id as revoked until the token would have expired anyway
+    REVOKED_TOKEN_KEY = "revoked:jti:{}"
+    
     def __init__(self, 
                  mysql_host="localhost", 
                  mysql_user="root", 
                  mysql_password="root",
                  mysql_database="langgraph_ai_system",
                  jwt_secret=None,
-                 session_expire_hours=24):
+                 session_expire_hours=24,
+                 pool_size=10,
+                 user_cache_ttl=60,
+                 user_cache_size=10000,
+                 stats_cache_ttl=10,
+                 activity_queue_size=1000,
+                 activity_batch_size=500):
         
         self.jwt_secret = jwt_secret or secrets.token_urlsafe(32)
         self.session_expire_hours = session_expire_hours
         
+        # Token -> user row for recently verified tokens, so authenticated requests skip
+        # the JWT decode and user lookup; entries never outlive the token itself
+        self._user_cache = _TTLCache(user_cache_size, user_cache_ttl)
+        
+        # User id -> /stats counts; dropped whenever that user's activity or queries change
+        self._stats_cache = _TTLCache(user_cache_size, stats_cache_ttl)
+        
+        # Revoked token ids live in Redis so every worker sees a logout; a valid token then costs
+        # one EXISTS instead of a database query. Without Redis revocations stay in-process.
+        # Uncapped: an evicted revocation would let a logged-out token authenticate again
+        self._revoked_tokens = _TTLCache(None, session_expire_hours * 3600)
+        self._redis = None
+        if redis:
+            try:
+                self._redis = redis.StrictRedis(**Config.get_redis_connection_params())
+                self._redis.ping()
+            except Exception as e:
+                logger.warning(f"⚠️ Redis unavailable, token revocations will not be shared: {e}")
+                self._redis = None
+        
+        # Activity rows are written behind the request: login/register/logout return without
+        # waiting for the insert, and rows queued together go out as one multi-row INSERT
+        self._activity_writer = BackgroundWriter(
+            activity_queue_size,
+            activity_batch_size,
+            thread_name="auth-activity-writer"
+        )
+        atexit.register(self._activity_writer.flush)
+        
+        connection_params = {
+            'host': mysql_host,
+            'user': mysql_user,
+            'password': mysql_password,
+            'database': mysql_database,
+            'autocommit': True
+        }
+        
         # Database connection
         try:
-            self.db = mysql.connector.connect(
-                host=mysql_host,
-                user=mysql_user,
-                password=mysql_password,
-                database=mysql_database,
-                autocommit=True
-            )
+            self.db = mysql.connector.connect(**connection_params)
             logger.info("✅ Authentication service connected to database")
         except Exception as e:
             logger.error(f"❌ Database connection failed: {e}")
             raise
+        
+        # Pooled connections so concurrent requests don't queue on one connection; the pool checks
+        # each connection on checkout and reconnects it if the server dropped it. The shared
+        # connection above is not thread-safe, so without a pool it is used under a lock
+        self._db_pool = None
+        self._db_lock = threading.Lock()
+        try:
+            self._db_pool = pooling.MySQLConnectionPool(
+                pool_name=f"auth_{id(self)}",
+                pool_size=pool_size,
+                **connection_params
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Auth connection pool unavailable, queries will be serialized: {e}")
+    
+    @contextmanager
+    def _cursor(self, dictionary: bool = False):
+        """
+        Cursor on a pooled connection for the duration of one operation.
+        Falls back to the shared connection under a lock when there is no pool or it is exhausted.
+        """
+        conn = None
+        if self._db_pool is not None:
+            try:
+                conn = self._db_pool.get_connection()
+            except mysql.connector.errors.PoolError:
+                logger.debug("Auth connection pool exhausted, using the shared connection")
+        
+        if conn is None:
+            with self._db_lock:
+                cursor = self.db.cursor(dictionary=dictionary)
+                try:
+                    yield cursor
+                finally:
+                    cursor.close()
+            return
+        
+        try:
+            cursor = conn.cursor(dictionary=dictionary)
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
     
     def _hash_password(self, password: str) -> str:
         """Hash password using bcrypt"""
@@ -55,7 +210,8 @@ class AuthService:
             'user_id': user_id,
             'username': username,
             'exp': datetime.utcnow() + timedelta(hours=self.session_expire_hours),
-            'iat': datetime.utcnow()
+            'iat': datetime.utcnow(),
+            'jti': secrets.token_urlsafe(16)
         }
         return jwt.encode(payload, self.jwt_secret, algorithm='HS256')
     
@@ -69,395 +225,487 @@ class AuthService:
         except jwt.InvalidTokenError:
             return None
     
+    def _is_revoked(self, jti: Optional[str]) -> bool:
+        """Whether a token id has been revoked by logout"""
+        if not jti:
+            return False
+        # Logouts seen by this worker never depend on Redis being reachable
+        if self._revoked_tokens.get(jti) is not None:
+            return True
+        if self._redis is not None:
+            try:
+                return bool(self._redis.exists(self.REVOKED_TOKEN_KEY.format(jti)))
+            except Exception as e:
+                logger.warning(f"⚠️ Revocation check failed, token accepted unless revoked by this worker: {e}")
+        return False
+    
+    def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """Claims of a correctly signed, unexpired and unrevoked token; no database access"""
+        payload = self._verify_session_token(token)
+        if not payload or self._is_revoked(payload.get('jti')):
+            return None
+        return payload
+    
+    def revoke_token(self, token: str) -> bool:
+        """Reject this token from now until it expires, e.g. on logout"""
+        self._user_cache.pop(token)
+        payload = self._verify_session_token(token)
+        if not payload or not payload.get('jti'):
+            return False
+        
+        jti = payload['jti']
+        self._revoked_tokens.set(jti, True, payload['exp'])
+        if self._redis is not None:
+            try:
+                self._redis.setex(self.REVOKED_TOKEN_KEY.format(jti), max(int(payload['exp'] - time.time()), 1), 1)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not share token revocation: {e}")
+        return True
+    
     def register_user(self, username: str, email: str, password: str, ip_address: str = None) -> Dict[str, Any]:
         """Register a new user"""
-        cursor = self.db.cursor(dictionary=True)
-        
-        try:
-            # Check if username or email already exists
-            cursor.execute(
-                "SELECT id, username, email FROM users WHERE username = %s OR email = %s",
-                (username, email)
-            )
-            existing = cursor.fetchone()
-            
-            if existing:
-                if existing['username'] == username:
-                    return {'success': False, 'error': 'Username already exists'}
-                else:
-                    return {'success': False, 'error': 'Email already exists'}
-            
-            # Hash password and create user
-            password_hash = self._hash_password(password)
-            cursor.execute(
-                """INSERT INTO users (username, email, hashed_password, is_active, created_at) 
-                   VALUES (%s, %s, %s, TRUE, NOW())""",
-                (username, email, password_hash)
-            )
-            
-            user_id = cursor.lastrowid
-            
-            # Log registration activity
-            cursor.execute(
-                """INSERT INTO user_activity (user_id, activity_type, activity_data, ip_address) 
-                   VALUES (%s, 'register', %s, %s)""",
-                (user_id, json.dumps({'username': username, 'email': email}), ip_address)
-            )
-            
-            # Generate session token
-            token = self._generate_session_token(user_id, username)
-            session_id = secrets.token_urlsafe(32)
-            expires_at = datetime.now() + timedelta(hours=self.session_expire_hours)
-            
-            # Create session record
-            cursor.execute(
-                """INSERT INTO user_sessions (session_id, user_id, expires_at, ip_address) 
-                   VALUES (%s, %s, %s, %s)""",
-                (session_id, user_id, expires_at, ip_address)
-            )
-            
-            logger.info(f"✅ User registered: {username} (ID: {user_id})")
-            
-            return {
-                'success': True,
-                'user_id': user_id,
-                'username': username,
-                'email': email,
-                'token': token,
-                'session_id': session_id,
-                'expires_at': expires_at.isoformat()
-            }
-            
-        except Exception as e:
-            logger.error(f"❌ Registration error: {e}")
-            return {'success': False, 'error': 'Registration failed'}
-        finally:
-            cursor.close()
+        with self._cursor(dictionary=True) as cursor:
+            try:
+                # Check if username or email already exists
+                cursor.execute(
+                    "SELECT id, username, email FROM users WHERE username = %s OR email = %s",
+                    (username, email)
+                )
+                existing = cursor.fetchone()
+                
+                if existing:
+                    if existing['username'] == username:
+                        return {'success': False, 'error': 'Username already exists'}
+                    else:
+                        return {'success': False, 'error': 'Email already exists'}
+                
+                # Hash password and create user
+                password_hash = self._hash_password(password)
+                cursor.execute(
+                    """INSERT INTO users (username, email, hashed_password, is_active, created_at) 
+                       VALUES (%s, %s, %s, TRUE, NOW())""",
+                    (username, email, password_hash)
+                )
+                
+                user_id = cursor.lastrowid
+                
+                # Log registration activity
+                self._log_activity(user_id, 'register', {'username': username, 'email': email}, ip_address)
+                
+                # Generate session token
+                token = self._generate_session_token(user_id, username)
+                session_id = secrets.token_urlsafe(32)
+                expires_at = datetime.now() + timedelta(hours=self.session_expire_hours)
+                
+                # Create session record
+                cursor.execute(
+                    """INSERT INTO user_sessions (session_id, user_id, expires_at, ip_address) 
+                       VALUES (%s, %s, %s, %s)""",
+                    (session_id, user_id, expires_at, ip_address)
+                )
+                
+                logger.info(f"✅ User registered: {username} (ID: {user_id})")
+                
+                return {
+                    'success': True,
+                    'user_id': user_id,
+                    'username': username,
+                    'email': email,
+                    'token': token,
+                    'session_id': session_id,
+                    'expires_at': expires_at.isoformat()
+                }
+                
+            except Exception as e:
+                logger.error(f"❌ Registration error: {e}")
+                return {'success': False, 'error': 'Registration failed'}
     
     def login_user(self, username: str, password: str, ip_address: str = None) -> Dict[str, Any]:
         """Login user and create session"""
-        cursor = self.db.cursor(dictionary=True)
-        
-        try:
-            # Get user by username
-            cursor.execute(
-                "SELECT id, username, email, hashed_password, is_active FROM users WHERE username = %s",
-                (username,)
-            )
-            user = cursor.fetchone()
-            
-            if not user:
-                return {'success': False, 'error': 'Invalid username or password'}
-            
-            if not user['is_active']:
-                return {'success': False, 'error': 'Account is disabled'}
-            
-            # Verify password
-            if not self._verify_password(password, user['hashed_password']):
-                return {'success': False, 'error': 'Invalid username or password'}
-            
-            # Update last login
-            cursor.execute(
-                "UPDATE users SET last_login = NOW() WHERE id = %s",
-                (user['id'],)
-            )
-            
-            # Log login activity
-            cursor.execute(
-                """INSERT INTO user_activity (user_id, activity_type, activity_data, ip_address) 
-                   VALUES (%s, 'login', %s, %s)""",
-                (user['id'], json.dumps({'username': username}), ip_address)
-            )
-            
-            # Generate session token and create session
-            token = self._generate_session_token(user['id'], user['username'])
-            session_id = secrets.token_urlsafe(32)
-            expires_at = datetime.now() + timedelta(hours=self.session_expire_hours)
-            
-            cursor.execute(
-                """INSERT INTO user_sessions (session_id, user_id, expires_at, ip_address) 
-                   VALUES (%s, %s, %s, %s)""",
-                (session_id, user['id'], expires_at, ip_address)
-            )
-            
-            logger.info(f"✅ User logged in: {username} (ID: {user['id']})")
-            
-            return {
-                'success': True,
-                'user_id': user['id'],
-                'username': user['username'],
-                'email': user['email'],
-                'token': token,
-                'session_id': session_id,
-                'expires_at': expires_at.isoformat()
-            }
-            
-        except Exception as e:
-            logger.error(f"❌ Login error: {e}")
-            return {'success': False, 'error': 'Login failed'}
-        finally:
-            cursor.close()
+        with self._cursor(dictionary=True) as cursor:
+            try:
+                # Get user by username
+                cursor.execute(
+                    "SELECT id, username, email, hashed_password, is_active FROM users WHERE username = %s",
+                    (username,)
+                )
+                user = cursor.fetchone()
+                
+                if not user:
+                    return {'success': False, 'error': 'Invalid username or password'}
+                
+                if not user['is_active']:
+                    return {'success': False, 'error': 'Account is disabled'}
+                
+                # Verify password
+                if not self._verify_password(password, user['hashed_password']):
+                    return {'success': False, 'error': 'Invalid username or password'}
+                
+                # Update last login
+                cursor.execute(
+                    "UPDATE users SET last_login = NOW() WHERE id = %s",
+                    (user['id'],)
+                )
+                
+                # Log login activity
+                self._log_activity(user['id'], 'login', {'username': username}, ip_address)
+                
+                # Generate session token and create session
+                token = self._generate_session_token(user['id'], user['username'])
+                session_id = secrets.token_urlsafe(32)
+                expires_at = datetime.now() + timedelta(hours=self.session_expire_hours)
+                
+                cursor.execute(
+                    """INSERT INTO user_sessions (session_id, user_id, expires_at, ip_address) 
+                       VALUES (%s, %s, %s, %s)""",
+                    (session_id, user['id'], expires_at, ip_address)
+                )
+                
+                logger.info(f"✅ User logged in: {username} (ID: {user['id']})")
+                
+                return {
+                    'success': True,
+                    'user_id': user['id'],
+                    'username': user['username'],
+                    'email': user['email'],
+                    'token': token,
+                    'session_id': session_id,
+                    'expires_at': expires_at.isoformat()
+                }
+                
+            except Exception as e:
+                logger.error(f"❌ Login error: {e}")
+                return {'success': False, 'error': 'Login failed'}
     
     def logout_user(self, session_id: str, ip_address: str = None) -> bool:
         """Logout user and invalidate session"""
-        cursor = self.db.cursor()
-        
-        try:
-            # Get user_id from session
-            cursor.execute(
-                "SELECT user_id FROM user_sessions WHERE session_id = %s AND is_active = TRUE",
-                (session_id,)
-            )
-            result = cursor.fetchone()
-            
-            if result:
-                user_id = result[0]
-                
-                # Invalidate session
+        with self._cursor() as cursor:
+            try:
+                # Get user_id from session
                 cursor.execute(
-                    "UPDATE user_sessions SET is_active = FALSE WHERE session_id = %s",
+                    "SELECT user_id FROM user_sessions WHERE session_id = %s AND is_active = TRUE",
                     (session_id,)
                 )
+                result = cursor.fetchone()
                 
-                # Log logout activity
-                cursor.execute(
-                    """INSERT INTO user_activity (user_id, session_id, activity_type, activity_data, ip_address) 
-                       VALUES (%s, %s, 'logout', %s, %s)""",
-                    (user_id, session_id, json.dumps({'logout_time': datetime.now().isoformat()}), ip_address)
-                )
+                if result:
+                    user_id = result[0]
+                    
+                    # Invalidate session
+                    cursor.execute(
+                        "UPDATE user_sessions SET is_active = FALSE WHERE session_id = %s",
+                        (session_id,)
+                    )
+                    
+                    # Log logout activity
+                    self._log_activity(
+                        user_id, 'logout', {'logout_time': datetime.now().isoformat()},
+                        ip_address, session_id
+                    )
+                    
+                    logger.info(f"✅ User logged out: session {session_id}")
+                    return True
                 
-                logger.info(f"✅ User logged out: session {session_id}")
-                return True
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"❌ Logout error: {e}")
-            return False
-        finally:
-            cursor.close()
+                return False
+                
+            except Exception as e:
+                logger.error(f"❌ Logout error: {e}")
+                return False
+    
+    def _log_activity(self, user_id: int, activity_type: str, activity_data: Dict[str, Any],
+                      ip_address: str = None, session_id: str = None):
+        """Queue an activity row for the background writer"""
+        self._activity_writer.submit_batched(
+            self._write_activities,
+            (user_id, session_id, activity_type, json.dumps(activity_data), ip_address)
+        )
+    
+    def _write_activities(self, rows: List[tuple]):
+        """Insert queued activity rows in one statement (runs on the writer thread)"""
+        with self._cursor() as cursor:
+            cursor.executemany(
+                """INSERT INTO user_activity (user_id, session_id, activity_type, activity_data, ip_address) 
+                   VALUES (%s, %s, %s, %s, %s)""",
+                rows
+            )
+        # Stats are only invalidated once the rows are visible
+        for user_id in {row[0] for row in rows}:
+            self._stats_cache.pop(user_id)
     
     def get_current_user(self, token: str) -> Optional[Dict[str, Any]]:
         """Get current user from token"""
+        cached = self._user_cache.get(token)
+        if cached is not None:
+            user, jti = cached
+            # Another worker may have revoked the token since it was cached
+            if self._is_revoked(jti):
+                self._user_cache.pop(token)
+                return None
+            return dict(user)
+        
         # Verify JWT token
-        payload = self._verify_session_token(token)
+        payload = self.verify_token(token)
         if not payload:
             return None
         
-        cursor = self.db.cursor(dictionary=True)
-        
-        try:
-            # Get user details
-            cursor.execute(
-                "SELECT id, username, email, is_active, created_at, last_login FROM users WHERE id = %s",
-                (payload['user_id'],)
-            )
-            user = cursor.fetchone()
-            
-            if user and user['is_active']:
-                return user
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"❌ Get current user error: {e}")
-            return None
-        finally:
-            cursor.close()
+        with self._cursor(dictionary=True) as cursor:
+            try:
+                # Get user details
+                cursor.execute(
+                    "SELECT id, username, email, is_active, created_at, last_login FROM users WHERE id = %s",
+                    (payload['user_id'],)
+                )
+                user = cursor.fetchone()
+                
+                if user and user['is_active']:
+                    self._user_cache.set(token, (dict(user), payload.get('jti')), payload.get('exp'))
+                    return user
+                
+                return None
+                
+            except Exception as e:
+                logger.error(f"❌ Get current user error: {e}")
+                return None
     
-    def get_user_activity(self, user_id: int, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get user activity history"""
-        cursor = self.db.cursor(dictionary=True)
-        
-        try:
-            cursor.execute(
-                """SELECT activity_type, activity_data, created_at, ip_address 
-                   FROM user_activity 
-                   WHERE user_id = %s 
-                   ORDER BY created_at DESC 
-                   LIMIT %s""",
-                (user_id, limit)
-            )
-            
-            activities = cursor.fetchall()
-            
-            # Parse JSON activity_data
-            for activity in activities:
-                if activity['activity_data']:
-                    try:
-                        activity['activity_data'] = json.loads(activity['activity_data'])
-                    except:
-                        activity['activity_data'] = {}
-            
-            return activities
-            
-        except Exception as e:
-            logger.error(f"❌ Get user activity error: {e}")
-            return []
-        finally:
-            cursor.close()
+    @staticmethod
+    def _keyset_filter(id_column: str, before: Optional[Tuple[datetime, int]]) -> Tuple[str, tuple]:
+        """SQL condition and params selecting rows older than a (created_at, id) page cursor"""
+        if before is None:
+            return "", ()
+        created_at, row_id = before
+        return (
+            f" AND (created_at < %s OR (created_at = %s AND {id_column} < %s))",
+            (created_at, created_at, row_id)
+        )
+    
+    def get_user_activity(self, user_id: int, limit: int = 50,
+                          before: Optional[Tuple[datetime, int]] = None) -> List[Dict[str, Any]]:
+        """
+        Get user activity history, newest first.
+        Pass the (created_at, activity_id) of the last row seen as `before` to fetch the next page.
+        """
+        keyset_sql, keyset_params = self._keyset_filter("activity_id", before)
+        with self._cursor(dictionary=True) as cursor:
+            try:
+                cursor.execute(
+                    f"""SELECT activity_id, activity_type, activity_data, created_at, ip_address 
+                       FROM user_activity 
+                       WHERE user_id = %s{keyset_sql} 
+                       ORDER BY created_at DESC, activity_id DESC 
+                       LIMIT %s""",
+                    (user_id, *keyset_params, limit)
+                )
+                
+                activities = cursor.fetchall()
+                
+                # Parse JSON activity_data
+                for activity in activities:
+                    if activity['activity_data']:
+                        try:
+                            activity['activity_data'] = json.loads(activity['activity_data'])
+                        except:
+                            activity['activity_data'] = {}
+                
+                return activities
+                
+            except Exception as e:
+                logger.error(f"❌ Get user activity error: {e}")
+                return []
+    
+    def get_user_queries(self, user_id: int, limit: int = 50,
+                         before: Optional[Tuple[datetime, int]] = None) -> List[Dict[str, Any]]:
+        """
+        Get user query history, newest first.
+        Pass the (created_at, query_id) of the last row seen as `before` to fetch the next page.
+        """
+        keyset_sql, keyset_params = self._keyset_filter("query_id", before)
+        with self._cursor(dictionary=True) as cursor:
+            try:
+                cursor.execute(
+                    f"""SELECT query_id, question, agent_used, LEFT(response_text, %s) AS response_preview, 
+                              edges_traversed, processing_time, created_at 
+                       FROM user_queries 
+                       WHERE user_id = %s{keyset_sql} 
+                       ORDER BY created_at DESC, query_id DESC 
+                       LIMIT %s""",
+                    (self.RESPONSE_PREVIEW_CHARS + 1, user_id, *keyset_params, limit)
+                )
+                
+                queries = cursor.fetchall()
+                
+                # Parse JSON edges_traversed
+                for query in queries:
+                    if query['edges_traversed']:
+                        try:
+                            query['edges_traversed'] = json.loads(query['edges_traversed'])
+                        except:
+                            query['edges_traversed'] = []
+                    
+                    # Truncate long responses for list view; one extra character is fetched to tell
+                    # whether the full response was longer than the preview
+                    if len(query['response_preview']) > self.RESPONSE_PREVIEW_CHARS:
+                        query['response_preview'] = query['response_preview'][:self.RESPONSE_PREVIEW_CHARS] + "..."
+                
+                return queries
+                
+            except Exception as e:
+                logger.error(f"❌ Get user queries error: {e}")
+                return []
     
-    def get_user_queries(self, user_id: int, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get user query history"""
-        cursor = self.db.cursor(dictionary=True)
+    def get_user_stats(self, user_id: int) -> Dict[str, Any]:
+        """
+        Get per-agent query counts and per-type activity counts in one round-trip.
+        Results are reused for a few seconds unless the user logs new activity meanwhile.
+        """
+        cached_stats = self._stats_cache.get(user_id)
+        if cached_stats is not None:
+            return cached_stats
         
-        try:
-            cursor.execute(
-                """SELECT query_id, question, agent_used, response_text, edges_traversed, 
-                          processing_time, created_at 
-                   FROM user_queries 
-                   WHERE user_id = %s 
-                   ORDER BY created_at DESC 
-                   LIMIT %s""",
-                (user_id, limit)
-            )
-            
-            queries = cursor.fetchall()
-            
-            # Parse JSON edges_traversed
-            for query in queries:
-                if query['edges_traversed']:
-                    try:
-                        query['edges_traversed'] = json.loads(query['edges_traversed'])
-                    except:
-                        query['edges_traversed'] = []
-                
-                # Truncate long responses for list view
-                if len(query['response_text']) > 200:
-                    query['response_preview'] = query['response_text'][:200] + "..."
-                else:
-                    query['response_preview'] = query['response_text']
-            
-            return queries
-            
-        except Exception as e:
-            logger.error(f"❌ Get user queries error: {e}")
-            return []
-        finally:
-            cursor.close()
+        stats = {
+            'total_queries': 0,
+            'total_activities': 0,
+            'agent_usage': {},
+            'activity_types': {}
+        }
+        
+        with self._cursor() as cursor:
+            try:
+                cursor.execute(
+                    """SELECT 'query' AS kind, agent_used AS name, COUNT(*) AS total
+                       FROM user_queries
+                       WHERE user_id = %s
+                       GROUP BY agent_used
+                       UNION ALL
+                       SELECT 'activity' AS kind, activity_type AS name, COUNT(*) AS total
+                       FROM user_activity
+                       WHERE user_id = %s
+                       GROUP BY activity_type""",
+                    (user_id, user_id)
+                )
+                
+                for kind, name, total in cursor.fetchall():
+                    if kind == 'query':
+                        stats['agent_usage'][name] = total
+                        stats['total_queries'] += total
+                    else:
+                        stats['activity_types'][name] = total
+                        stats['total_activities'] += total
+                
+                self._stats_cache.set(user_id, stats)
+                return stats
+                
+            except Exception as e:
+                logger.error(f"❌ Get user stats error: {e}")
+                return stats
     
     def log_user_query(self, user_id: int, session_id: str, question: str, 
                       agent_used: str, response_text: str, edges_traversed: List[str], 
                       processing_time: float = None) -> bool:
         """Log a user query for activity tracking"""
-        cursor = self.db.cursor()
-        
-        try:
-            # First check if user exists
-            cursor.execute("SELECT id FROM users WHERE id = %s", (user_id,))
-            user_exists = cursor.fetchone()
-            
-            if not user_exists:
-                # For non-existent users (like test users), create a temporary/anonymous user record
-                # or simply skip logging to avoid foreign key constraint
-                logger.debug(f"Skipping query log for non-existent user {user_id}")
-                return True  # Return True to not break the flow
-            
-            # Check if session exists, if not create a temporary one or use None
-            cursor.execute(
-                "SELECT session_id FROM user_sessions WHERE session_id = %s AND user_id = %s",
-                (session_id, user_id)
-            )
-            session_exists = cursor.fetchone()
-            
-            # If session doesn't exist, set session_id to None to avoid foreign key constraint
-            actual_session_id = session_id if session_exists else None
-            
-            cursor.execute(
-                """INSERT INTO user_queries (user_id, session_id, question, agent_used, 
-                                           response_text, edges_traversed, processing_time) 
-                   VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-                (user_id, actual_session_id, question, agent_used, response_text,
-                 json.dumps(edges_traversed), processing_time)
-            )
-            
-            # Also log as activity
-            cursor.execute(
-                """INSERT INTO user_activity (user_id, session_id, activity_type, activity_data) 
-                   VALUES (%s, %s, 'query', %s)""",
-                (user_id, actual_session_id, json.dumps({
+        with self._cursor() as cursor:
+            try:
+                # First check if user exists
+                cursor.execute("SELECT id FROM users WHERE id = %s", (user_id,))
+                user_exists = cursor.fetchone()
+                
+                if not user_exists:
+                    # For non-existent users (like test users), create a temporary/anonymous user record
+                    # or simply skip logging to avoid foreign key constraint
+                    logger.debug(f"Skipping query log for non-existent user {user_id}")
+                    return True  # Return True to not break the flow
+                
+                # Check if session exists, if not create a temporary one or use None
+                cursor.execute(
+                    "SELECT session_id FROM user_sessions WHERE session_id = %s AND user_id = %s",
+                    (session_id, user_id)
+                )
+                session_exists = cursor.fetchone()
+                
+                # If session doesn't exist, set session_id to None to avoid foreign key constraint
+                actual_session_id = session_id if session_exists else None
+                
+                cursor.execute(
+                    """INSERT INTO user_queries (user_id, session_id, question, agent_used, 
+                                               response_text, edges_traversed, processing_time) 
+                       VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                    (user_id, actual_session_id, question, agent_used, response_text,
+                     json.dumps(edges_traversed), processing_time)
+                )
+                
+                self._stats_cache.pop(user_id)
+                
+                # Also log as activity
+                self._log_activity(user_id, 'query', {
                     'question': question[:100] + "..." if len(question) > 100 else question,
                     'agent_used': agent_used,
                     'processing_time': processing_time
-                }))
-            )
-            
-            logger.info(f"✅ Query logged for user {user_id}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Log user query error: {e}")
-            return False
-        finally:
-            cursor.close()
+                }, session_id=actual_session_id)
+                
+                logger.info(f"✅ Query logged for user {user_id}")
+                return True
+                
+            except Exception as e:
+                logger.error(f"❌ Log user query error: {e}")
+                return False
     
     def create_anonymous_user(self, user_id: int, username: str = None) -> bool:
         """Create an anonymous user for testing purposes"""
-        cursor = self.db.cursor()
-        
-        try:
-            # Check if user already exists
-            cursor.execute("SELECT id FROM users WHERE id = %s", (user_id,))
-            if cursor.fetchone():
-                return True  # User already exists
-            
-            # Create anonymous user
-            username = username or f"anonymous_user_{user_id}"
-            email = f"anonymous_{user_id}@test.local"
-            
-            cursor.execute(
-                """INSERT INTO users (id, username, email, hashed_password, is_active, created_at) 
-                   VALUES (%s, %s, %s, %s, TRUE, NOW())
-                   ON DUPLICATE KEY UPDATE username = VALUES(username)""",
-                (user_id, username, email, "anonymous_hash")
-            )
-            
-            logger.info(f"✅ Created anonymous user: {username} (ID: {user_id})")
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Create anonymous user error: {e}")
-            return False
-        finally:
-            cursor.close()
+        with self._cursor() as cursor:
+            try:
+                # Check if user already exists
+                cursor.execute("SELECT id FROM users WHERE id = %s", (user_id,))
+                if cursor.fetchone():
+                    return True  # User already exists
+                
+                # Create anonymous user
+                username = username or f"anonymous_user_{user_id}"
+                email = f"anonymous_{user_id}@test.local"
+                
+                cursor.execute(
+                    """INSERT INTO users (id, username, email, hashed_password, is_active, created_at) 
+                       VALUES (%s, %s, %s, %s, TRUE, NOW())
+                       ON DUPLICATE KEY UPDATE username = VALUES(username)""",
+                    (user_id, username, email, "anonymous_hash")
+                )
+                
+                logger.info(f"✅ Created anonymous user: {username} (ID: {user_id})")
+                return True
+                
+            except Exception as e:
+                logger.error(f"❌ Create anonymous user error: {e}")
+                return False
     
     def ensure_user_exists(self, user_id: int, username: str = None) -> bool:
         """Ensure a user exists, create anonymous if needed"""
-        cursor = self.db.cursor()
+        with self._cursor() as cursor:
+            try:
+                # Check if user exists
+                cursor.execute("SELECT id FROM users WHERE id = %s", (user_id,))
+                if cursor.fetchone():
+                    return True
+                
+            except Exception as e:
+                logger.error(f"❌ Ensure user exists error: {e}")
+                return False
         
-        try:
-            # Check if user exists
-            cursor.execute("SELECT id FROM users WHERE id = %s", (user_id,))
-            if cursor.fetchone():
-                return True
-            
-            # Create anonymous user
-            return self.create_anonymous_user(user_id, username)
-            
-        except Exception as e:
-            logger.error(f"❌ Ensure user exists error: {e}")
-            return False
-        finally:
-            cursor.close()
+        # Create anonymous user once this cursor has been released
+        return self.create_anonymous_user(user_id, username)
     
     def cleanup_expired_sessions(self) -> int:
         """Clean up expired sessions"""
-        cursor = self.db.cursor()
-        
-        try:
-            cursor.execute(
-                "DELETE FROM user_sessions WHERE expires_at < NOW() OR is_active = FALSE"
-            )
-            
-            deleted_count = cursor.rowcount
-            logger.info(f"🧹 Cleaned up {deleted_count} expired sessions")
-            return deleted_count
-            
-        except Exception as e:
-            logger.error(f"❌ Cleanup sessions error: {e}")
-            return 0
-        finally:
-            cursor.close()
+        with self._cursor() as cursor:
+            try:
+                cursor.execute(
+                    "DELETE FROM user_sessions WHERE expires_at < NOW() OR is_active = FALSE"
+                )
+                
+                deleted_count = cursor.rowcount
+                logger.info(f"🧹 Cleaned up {deleted_count} expired sessions")
+                return deleted_count
+                
+            except Exception as e:
+                logger.error(f"❌ Cleanup sessions error: {e}")
+                return 0
 
 # Global auth service instance
 auth_service = AuthService()
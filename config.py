@@ -39,6 +39,7 @@ class Config:
     MYSQL_PORT: int = int(os.getenv('MYSQL_PORT', '3306'))
     MYSQL_CONNECT_TIMEOUT: int = int(os.getenv('MYSQL_CONNECT_TIMEOUT', '10'))
     MYSQL_CHARSET: str = os.getenv('MYSQL_CHARSET', 'utf8mb4')
+    MYSQL_POOL_SIZE: int = int(os.getenv('MYSQL_POOL_SIZE', '5'))
     
     # Redis Configuration
     REDIS_HOST: str = os.getenv('REDIS_HOST', 'localhost')
@@ -53,12 +54,53 @@ class Config:
     OLLAMA_TIMEOUT: int = int(os.getenv('OLLAMA_TIMEOUT', '30'))
     OLLAMA_MAX_TOKENS: int = int(os.getenv('OLLAMA_MAX_TOKENS', '1000'))
     OLLAMA_TEMPERATURE: float = float(os.getenv('OLLAMA_TEMPERATURE', '0.7'))
+    OLLAMA_KEEP_ALIVE: str = os.getenv('OLLAMA_KEEP_ALIVE', '30m')
     
     # Agent Configuration
     AGENT_MAX_RESPONSE_LENGTH: int = int(os.getenv('AGENT_MAX_RESPONSE_LENGTH', '5000'))
     AGENT_PROCESSING_TIMEOUT: int = int(os.getenv('AGENT_PROCESSING_TIMEOUT', '60'))
+    AGENT_CONTEXT_WORKERS: int = int(os.getenv('AGENT_CONTEXT_WORKERS', '4'))
+    AGENT_QUERY_CACHE_SIZE: int = int(os.getenv('AGENT_QUERY_CACHE_SIZE', '2048'))
     MULTI_AGENT_MAX_AGENTS: int = int(os.getenv('MULTI_AGENT_MAX_AGENTS', '3'))
     
+    # Background Memory Writes
+    BACKGROUND_WRITES: bool = os.getenv('BACKGROUND_WRITES', 'True').lower() == 'true'
+    BACKGROUND_WRITE_QUEUE_SIZE: int = int(os.getenv('BACKGROUND_WRITE_QUEUE_SIZE', '1000'))
+    BACKGROUND_WRITE_BATCH_SIZE: int = int(os.getenv('BACKGROUND_WRITE_BATCH_SIZE', '200'))
+    BACKGROUND_WRITE_PUT_TIMEOUT: float = float(os.getenv('BACKGROUND_WRITE_PUT_TIMEOUT', '1.0'))
+    
+    # Semantic Response Cache Configuration
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.9'))
+    SEMANTIC_CACHE_MAX_ENTRIES: int = int(os.getenv('SEMANTIC_CACHE_MAX_ENTRIES', '256'))
+    SEMANTIC_CACHE_LSH_CANDIDATES: int = int(os.getenv('SEMANTIC_CACHE_LSH_CANDIDATES', '32'))
+    SEMANTIC_CACHE_QUANTIZATION: str = os.getenv('SEMANTIC_CACHE_QUANTIZATION', 'float16')  # float32, float16 or int8
+    AGENT_SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv('AGENT_SEMANTIC_CACHE_THRESHOLD', '0.85'))
+    SEARCH_HISTORY_MIN_SIMILARITY: float = float(os.getenv('SEARCH_HISTORY_MIN_SIMILARITY', '0.35'))
+    
+    # Agent Context Cache (similar content + history reused for near-identical queries)
+    AGENT_CONTEXT_CACHE_MAX_ENTRIES: int = int(os.getenv('AGENT_CONTEXT_CACHE_MAX_ENTRIES', '512'))
+    AGENT_CONTEXT_CACHE_THRESHOLD: float = float(os.getenv('AGENT_CONTEXT_CACHE_THRESHOLD', '0.95'))
+    AGENT_CONTEXT_CACHE_TTL: int = int(os.getenv('AGENT_CONTEXT_CACHE_TTL', '600'))
+    
+    # Weather Agent Configuration (weather goes stale, so cached responses expire)
+    WEATHER_RESPONSE_CACHE_SIZE: int = int(os.getenv('WEATHER_RESPONSE_CACHE_SIZE', '1024'))
+    WEATHER_RESPONSE_CACHE_TTL: int = int(os.getenv('WEATHER_RESPONSE_CACHE_TTL', '1800'))
+    WEATHER_MAX_TOKENS: int = int(os.getenv('WEATHER_MAX_TOKENS', '400'))
+    WEATHER_TEMPERATURE: float = float(os.getenv('WEATHER_TEMPERATURE', '0.4'))
+    
+    # Embedding Cache Configuration
+    EMBEDDING_CACHE_SIZE: int = int(os.getenv('EMBEDDING_CACHE_SIZE', '4096'))
+    
+    # Vector Index (HNSW) Configuration
+    VECTOR_INDEX_DIR: str = os.getenv('VECTOR_INDEX_DIR', 'data/vector_index')
+    VECTOR_INDEX_ANN_THRESHOLD: int = int(os.getenv('VECTOR_INDEX_ANN_THRESHOLD', '2000'))
+    VECTOR_INDEX_OVERSAMPLE: int = int(os.getenv('VECTOR_INDEX_OVERSAMPLE', '4'))
+    VECTOR_INDEX_QUANTIZATION: str = os.getenv('VECTOR_INDEX_QUANTIZATION', 'float32')  # float32, float16 or int8
+    HNSW_M: int = int(os.getenv('HNSW_M', '16'))
+    HNSW_EF_CONSTRUCTION: int = int(os.getenv('HNSW_EF_CONSTRUCTION', '200'))
+    HNSW_EF_SEARCH: int = int(os.getenv('HNSW_EF_SEARCH', '64'))
+    HNSW_MAX_ELEMENTS: int = int(os.getenv('HNSW_MAX_ELEMENTS', '100000'))
+    
     # UI Configuration
     STATIC_DIR: str = os.getenv('STATIC_DIR', 'static')
     TEMPLATES_DIR: str = os.getenv('TEMPLATES_DIR', 'templates')
@@ -136,7 +178,8 @@ class Config:
             'default_model': cls.OLLAMA_DEFAULT_MODEL,
             'timeout': cls.OLLAMA_TIMEOUT,
             'max_tokens': cls.OLLAMA_MAX_TOKENS,
-            'temperature': cls.OLLAMA_TEMPERATURE
+            'temperature': cls.OLLAMA_TEMPERATURE,
+            'keep_alive': cls.OLLAMA_KEEP_ALIVE
         }
     
     @classmethod
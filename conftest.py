@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Shared pytest fixtures for the top-level system test modules
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def use_mock_responses():
+    """Swap in the mock Ollama clients and return the multiagent system built on them"""
+    from core import ollama_client
+    from core.mock_ollama_client import mock_ollama_client, mock_prompt_manager
+
+    # Replace the clients
+    ollama_client.ollama_client = mock_ollama_client
+    ollama_client.prompt_manager = mock_prompt_manager
+
+    # Re-import the multiagent system with mocks
+    from core.langgraph_multiagent_system import langgraph_multiagent_system
+    print("✅ Mock clients successfully configured")
+    return langgraph_multiagent_system
+
+
+@pytest.fixture(scope="session")
+def multiagent_system():
+    """
+    Multiagent system under test, set up once per test process
+    (once per worker under pytest-xdist). Falls back to mock responses
+    when Ollama is not available.
+    """
+    try:
+        from core.langgraph_multiagent_system import langgraph_multiagent_system
+        from core.ollama_client import ollama_client
+
+        # Check if Ollama is available
+        if not ollama_client.is_available():
+            print("⚠️ Ollama not available, switching to mock mode for testing...")
+            return use_mock_responses()
+
+        print("✅ Ollama is available, using real responses")
+        return langgraph_multiagent_system
+
+    except Exception as e:
+        print(f"❌ Error setting up test environment: {e}")
+        print("🔄 Switching to mock mode...")
+        return use_mock_responses()
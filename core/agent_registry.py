@@ -86,7 +86,7 @@ class AgentRegistry:
                     
                     # Create instance and store metadata
                     try:
-                        instance = obj(memory_manager=self.memory_manager)
+                        instance = obj.get_instance(self.memory_manager)
                         self.agent_instances[agent_name] = instance
                         
                         self.agent_metadata[agent_name] = {
@@ -110,7 +110,7 @@ class AgentRegistry:
         """Extract a clean agent name from the class"""
         # Try to get name from the class instance
         try:
-            temp_instance = agent_class(memory_manager=None)
+            temp_instance = agent_class.get_instance(self.memory_manager)
             if hasattr(temp_instance, 'name'):
                 return temp_instance.name
         except:
@@ -171,7 +171,7 @@ class AgentRegistry:
             except Exception as e:
                 logger.warning(f"Error checking if {agent_name} can handle query: {e}")
         
-        logger.info(f"Best agent for '{query[:50]}...': {best_agent} (confidence: {best_confidence:.2f})")
+        logger.info("Best agent for '%s...': %s (confidence: %.2f)", query[:50], best_agent, best_confidence)
         return best_agent if best_confidence > 0.3 else None  # Minimum confidence threshold
     
     def get_agents_by_capability(self, capability: str) -> List[str]:
@@ -212,6 +212,9 @@ class AgentRegistry:
     def add_agent_dynamically(self, agent_class: Type[BaseAgent], agent_name: str = None):
         """Add an agent class dynamically at runtime"""
         try:
+            # Without an explicit name the class's default instance is shared;
+            # an explicit name gets its own instance carrying that name
+            instance_name = agent_name
             if not agent_name:
                 agent_name = self._extract_agent_name(agent_class.__name__, agent_class)
             
@@ -219,7 +222,7 @@ class AgentRegistry:
             self.registered_agents[agent_name] = agent_class
             
             # Create instance
-            instance = agent_class(memory_manager=self.memory_manager)
+            instance = agent_class.get_instance(self.memory_manager, instance_name)
             self.agent_instances[agent_name] = instance
             
             # Store metadata
@@ -8,6 +8,7 @@ from typing import Dict, Any, List
 from ..base_agent import BaseAgent, GraphState
 from ..memory import MemoryManager
 from ..location_extractor import location_extractor
+from ..ollama_client import is_error_response
 
 logger = logging.getLogger(__name__)
 
@@ -59,8 +60,8 @@ class ForestAnalyzerAgent(BaseAgent):
             # Extract location from query for context
             detected_location = location_extractor.extract_location(query)
             
-            # Search for similar forest-related content in memory
-            search_results = self.search_similar_content(query, user_id)
+            # Search for similar forest-related content in memory; the context uses the top 3, cut to 150 characters
+            search_results = self.search_similar_content(query, user_id, limit=3, content_preview=150)
             
             # Get historical forest analysis context
             historical_context = self.get_historical_context(user_id, days=30)
@@ -70,13 +71,14 @@ class ForestAnalyzerAgent(BaseAgent):
             context = self._build_forest_context(query, detected_location, search_results, forest_history)
             
             # Generate comprehensive forest analysis response
-            if hasattr(self, 'generate_response_with_context'):
-                response = self.generate_response_with_context(
-                    query=query,
-                    context=context,
-                    temperature=0.6  # Balanced temperature for informative responses
-                )
-            else:
+            response = self.generate_response_with_context(
+                query=query,
+                context=context,
+                temperature=0.6  # Balanced temperature for informative responses
+            )
+            
+            # Fall back to the built-in forest analysis when the LLM call failed
+            if is_error_response(response):
                 response = self._generate_fallback_response(query, detected_location, context)
             
             # Enhance response with forest-specific analysis
@@ -8,6 +8,7 @@ from typing import Dict, Any, List
 from ..base_agent import BaseAgent, GraphState
 from ..memory import MemoryManager
 from ..location_extractor import location_extractor
+from ..ollama_client import is_error_response
 
 logger = logging.getLogger(__name__)
 
@@ -59,8 +60,8 @@ class ScenicLocationFinderAgent(BaseAgent):
             # Extract location from query for context
             detected_location = location_extractor.extract_location(query)
             
-            # Search for similar scenic location queries in memory
-            search_results = self.search_similar_content(query, user_id)
+            # Search for similar scenic location queries in memory; the context uses the top 3, cut to 150 characters
+            search_results = self.search_similar_content(query, user_id, limit=3, content_preview=150)
             
             # Get user's travel history and preferences
             travel_history = self.get_historical_context(user_id, days=90)
@@ -71,13 +72,14 @@ class ScenicLocationFinderAgent(BaseAgent):
             context = self._build_scenic_context(query, detected_location, search_results, scenic_history)
             
             # Generate personalized scenic location recommendations
-            if hasattr(self, 'generate_response_with_context'):
-                response = self.generate_response_with_context(
-                    query=query,
-                    context=context,
-                    temperature=0.7  # Higher temperature for creative recommendations
-                )
-            else:
+            response = self.generate_response_with_context(
+                query=query,
+                context=context,
+                temperature=0.7  # Higher temperature for creative recommendations
+            )
+            
+            # Fall back to the built-in recommendations when the LLM call failed
+            if is_error_response(response):
                 response = self._generate_fallback_response(query, detected_location, context)
             
             # Enhance response with scenic location formatting
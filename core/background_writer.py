@@ -0,0 +1,97 @@
+# background_writer.py
+"""
+Bounded write-behind queue drained by a single daemon thread.
+Used to keep database writes that the caller does not need to wait for
+(agent memory, auth activity logging) off the request path.
+"""
+
+import logging
+import queue
+import threading
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWriter:
+    """
+    Single daemon thread draining writes from a bounded queue. Writes run one
+    at a time, so they stay serialized on whatever connection they share.
+
+    Writes never run on the caller's thread. When the queue is full, submit waits up
+    to `put_timeout` seconds for room, then drops the write and logs it.
+
+    Each wakeup takes up to `batch_size` queued writes. Items queued with
+    submit_batched for the same function are handed to it as one list, so writes
+    from concurrent requests coalesce into a single multi-row insert.
+    """
+
+    def __init__(self, maxsize: int, batch_size: int = 1, thread_name: str = "background-writer",
+                 put_timeout: float = 1.0):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.batch_size = max(batch_size, 1)
+        self.put_timeout = put_timeout
+        self.thread_name = thread_name
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs) -> bool:
+        """Queue a write; returns False if it was dropped because the queue stayed full"""
+        return self._put((func, False, args, kwargs))
+
+    def submit_batched(self, batch_func, item) -> bool:
+        """Queue one item for batch_func(items); returns False if it was dropped because the queue stayed full"""
+        return self._put((batch_func, True, item, None))
+
+    def _put(self, task) -> bool:
+        self._ensure_started()
+        try:
+            self._queue.put(task, timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            logger.error(f"{self.thread_name} queue full for {self.put_timeout}s, dropping write to {task[0].__name__}")
+            return False
+
+    def flush(self):
+        """Block until every queued write has been applied"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            tasks = [self._queue.get()]
+            # Whatever piled up while the previous batch was being written goes out together
+            while len(tasks) < self.batch_size:
+                try:
+                    tasks.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            # Plain writes run in order; batched items run once per function, at its first position
+            batches: Dict[Any, List[Any]] = {}
+            calls = []
+            for func, batched, args, kwargs in tasks:
+                if not batched:
+                    calls.append((func, args, kwargs))
+                elif func in batches:
+                    batches[func].append(args)
+                else:
+                    batches[func] = [args]
+                    calls.append((func, (batches[func],), {}))
+
+            for func, args, kwargs in calls:
+                try:
+                    func(*args, **kwargs)
+                except Exception as e:
+                    logger.warning(f"Background write failed in {self.thread_name}: {e}")
+
+            for _ in tasks:
+                self._queue.task_done()
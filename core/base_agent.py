@@ -3,13 +3,62 @@ Abstract base agent class for LangGraph multi-agent system
 Constraint: All agents inherit from this base class for consistent memory management and search functionality
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional, TypedDict
+from typing import Dict, Any, List, Optional, Tuple, TypedDict
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import fields, is_dataclass
+from functools import lru_cache
+import atexit
 import logging
+import threading
+import weakref
+from config import Config
 from .memory import MemoryManager
-from .ollama_client import ollama_client, prompt_manager
+from .keyword_matcher import KeywordMatcher
+from .semantic_cache import SemanticCache
+from .background_writer import BackgroundWriter
+from .ollama_client import ollama_client, prompt_manager, is_error_response
 
 logger = logging.getLogger(__name__)
 
+# Shared pool for overlapping independent memory reads within one agent call
+_context_executor = ThreadPoolExecutor(
+    max_workers=Config.AGENT_CONTEXT_WORKERS,
+    thread_name_prefix="agent-context"
+)
+
+# Responses reused across near-duplicate queries; keys are scoped per agent and user
+_agent_response_cache = SemanticCache(
+    max_entries=Config.SEMANTIC_CACHE_MAX_ENTRIES,
+    threshold=Config.AGENT_SEMANTIC_CACHE_THRESHOLD,
+    lsh_candidates=Config.SEMANTIC_CACHE_LSH_CANDIDATES,
+    quantization=Config.SEMANTIC_CACHE_QUANTIZATION
+)
+
+# Memory lookups reused across near-identical queries; keys are scoped per agent, user and
+# lookup shape, and a user's entries are dropped whenever that agent writes to their memory
+_agent_context_cache = SemanticCache(
+    max_entries=Config.AGENT_CONTEXT_CACHE_MAX_ENTRIES,
+    threshold=Config.AGENT_CONTEXT_CACHE_THRESHOLD,
+    lsh_candidates=Config.SEMANTIC_CACHE_LSH_CANDIDATES,
+    ttl=Config.AGENT_CONTEXT_CACHE_TTL,
+    quantization=Config.SEMANTIC_CACHE_QUANTIZATION
+)
+
+# Memory writes run off the request thread; each write takes its own connection from MemoryManager._connection
+_background_writer = BackgroundWriter(
+    Config.BACKGROUND_WRITE_QUEUE_SIZE,
+    Config.BACKGROUND_WRITE_BATCH_SIZE,
+    thread_name="memory-writer",
+    put_timeout=Config.BACKGROUND_WRITE_PUT_TIMEOUT
+)
+atexit.register(_background_writer.flush)
+
+# One agent per (class, name, memory manager), shared by every user and request (see BaseAgent.get_instance).
+# Held weakly: an entry lasts as long as some registry uses the agent, and each agent holds its memory manager
+_shared_agents: "weakref.WeakValueDictionary[Tuple[type, Optional[str], Any], BaseAgent]" = weakref.WeakValueDictionary()
+_shared_agents_lock = threading.Lock()
+
 # Define GraphState for type hinting
 class GraphState(TypedDict, total=False):
     user: str
@@ -25,6 +74,25 @@ class BaseAgent(ABC):
     Provides standardized memory management, search capabilities, and interface methods.
     """
     
+    # Per-instance state set in __init__. Subclasses declaring `__slots__ = ()` carry
+    # no instance __dict__; subclasses without __slots__ keep one as usual.
+    __slots__ = (
+        "memory",
+        "name",
+        "_search_agent",
+        "_capabilities",
+        "_description",
+        "_keyword_matcher",
+        "_keyword_counts",
+        "_keyword_key",
+        "_keyword_source",
+        "__weakref__"
+    )
+    
+    # Phrase buckets that raise can_handle confidence: {bucket: (boost, terms)}
+    # Matched in a single pass by score_confidence_terms; override in subclasses
+    confidence_terms: Dict[str, Tuple[float, Tuple[str, ...]]] = {}
+    
     def __init__(self, memory_manager: MemoryManager, name: str = None):
         """
         Initialize base agent with memory management and search capabilities
@@ -45,8 +113,38 @@ class BaseAgent(ABC):
         # Agent description - should be overridden by subclasses
         self._description = "Base agent with memory management and search capabilities"
         
+        # Keyword automaton for can_handle, rebuilt only if the keyword list changes
+        self._keyword_matcher: Optional[KeywordMatcher] = None
+        self._keyword_counts: Counter = Counter()
+        self._keyword_key: Optional[Tuple[str, ...]] = None
+        self._keyword_source = None
+        self._get_confidence_matcher()
+        
         logger.info(f"Initialized {self.__class__.__name__} with memory management and search")
     
+    @classmethod
+    def get_instance(cls, memory_manager: Optional[MemoryManager] = None, name: str = None) -> "BaseAgent":
+        """
+        Shared instance of this agent class for the given memory manager and name, created on first use.
+        Per-user data travels in the GraphState passed to process, so one instance serves every user.
+        
+        Args:
+            memory_manager: MemoryManager instance for STM and LTM operations
+            name: Agent name passed to the constructor; None keeps the class default
+            
+        Returns:
+            The shared agent instance
+        """
+        key = (cls, name, memory_manager)
+        agent = _shared_agents.get(key)
+        if agent is None:
+            with _shared_agents_lock:
+                agent = _shared_agents.get(key)
+                if agent is None:
+                    agent = cls(memory_manager) if name is None else cls(memory_manager, name=name)
+                    _shared_agents[key] = agent
+        return agent
+    
     @abstractmethod
     def process(self, state: GraphState) -> GraphState:
         """
@@ -81,20 +179,74 @@ class BaseAgent(ABC):
         Returns:
             Float between 0 and 1 indicating confidence level
         """
+        return self._keyword_confidence(query.lower())
+    
+    def _keyword_confidence(self, query_lower: str) -> float:
+        """Keyword-match confidence for an already lowercased query"""
         if not hasattr(self, 'keywords'):
             return 0.0
             
-        query_lower = query.lower()
         keywords = getattr(self, 'keywords', [])
         
         if not keywords:
             return 0.0
             
-        keyword_matches = sum(1 for keyword in keywords if keyword.lower() in query_lower)
+        # Agents exposing a shared keyword list skip the tuple comparison entirely
+        if keywords is not self._keyword_source:
+            keyword_key = tuple(keywords)
+            if keyword_key != self._keyword_key:
+                self._keyword_counts = Counter(keyword.lower() for keyword in keywords)
+                self._keyword_matcher = KeywordMatcher({keyword: (keyword,) for keyword in self._keyword_counts})
+                self._keyword_key = keyword_key
+            self._keyword_source = keywords
+        
+        keyword_matches = sum(self._keyword_counts[keyword] for keyword in self._keyword_matcher.matches(query_lower))
         confidence = min(keyword_matches / len(keywords), 1.0) if keywords else 0.0
         
         return confidence
     
+    @classmethod
+    def _get_confidence_matcher(cls) -> KeywordMatcher:
+        """Matcher over cls.confidence_terms, built once per agent class"""
+        matcher = cls.__dict__.get("_confidence_matcher")
+        if matcher is None:
+            matcher = KeywordMatcher({bucket: terms for bucket, (_, terms) in cls.confidence_terms.items()})
+            cls._confidence_matcher = matcher
+        return matcher
+    
+    @classmethod
+    def _get_confidence_boost(cls):
+        """Memoised query_lower -> summed confidence_terms boost, built once per agent class"""
+        boost = cls.__dict__.get("_confidence_boost")
+        if boost is None:
+            matcher = cls._get_confidence_matcher()
+            confidence_terms = cls.confidence_terms
+            
+            # The router scores every agent for each query, and repeated prompts are common
+            @lru_cache(maxsize=Config.AGENT_QUERY_CACHE_SIZE)
+            def boost(query_lower: str) -> float:
+                return sum(confidence_terms[bucket][0] for bucket in matcher.matches(query_lower))
+            
+            cls._confidence_boost = boost
+        return boost
+    
+    def score_confidence_terms(self, query_lower: str, confidence: float) -> float:
+        """
+        Add the boost of every confidence_terms bucket present in the query
+        
+        Args:
+            query_lower: The input query, already lowercased
+            confidence: Confidence before boosts
+            
+        Returns:
+            Boosted confidence, capped at 1.0
+        """
+        # Boosts only ever add, so a saturated score needs no scan
+        if confidence >= 1.0:
+            return 1.0
+        
+        return min(confidence + self._get_confidence_boost()(query_lower), 1.0)
+    
     def get_description(self) -> str:
         """
         Return agent description.
@@ -121,15 +273,47 @@ class BaseAgent(ABC):
     def store_interaction(self, user_id: int, query: str, response: str, 
                          interaction_type: str = 'single', metadata: Dict = None):
         """
-        Store interaction in agent's memory (both STM and LTM)
+        Store interaction in agent's memory (both STM and LTM).
+        Queued to the background writer unless Config.BACKGROUND_WRITES is disabled.
         
         Args:
             user_id: User identifier
             query: User's query/input
             response: Agent's response
             interaction_type: Type of interaction ('single', 'orchestrated', etc.)
-            metadata: Additional metadata to store
+            metadata: Additional metadata to store, as a dict or a dataclass instance
         """
+        if Config.BACKGROUND_WRITES:
+            _background_writer.submit(self._store_interaction_impl, user_id, query, response, interaction_type, metadata)
+        else:
+            self._store_interaction_impl(user_id, query, response, interaction_type, metadata)
+    
+    def store_interaction_with_embedding(self, user_id: int, query: str, response: str, content: str,
+                                         interaction_type: str = 'single', metadata: Dict = None,
+                                         embedding_metadata: Dict = None):
+        """
+        store_interaction plus store_vector_embedding in one write: the LTM rows and the
+        embedding rows share a single MySQL transaction. Queued to the background writer
+        unless Config.BACKGROUND_WRITES is disabled, where calls from concurrent requests
+        are coalesced into multi-row inserts.
+        
+        Args:
+            user_id: User identifier
+            query: User's query/input
+            response: Agent's response
+            content: Content to store as embedding
+            interaction_type: Type of interaction ('single', 'orchestrated', etc.)
+            metadata: Interaction metadata, as a dict or a dataclass instance
+            embedding_metadata: Metadata stored with the embedding
+        """
+        item = (user_id, query, response, interaction_type, metadata, content, embedding_metadata)
+        if Config.BACKGROUND_WRITES:
+            _background_writer.submit_batched(self._store_interactions_with_embeddings, item)
+        else:
+            self._store_interactions_with_embeddings([item])
+    
+    def _store_interaction_impl(self, user_id: int, query: str, response: str,
+                                interaction_type: str, metadata: Optional[Any]):
         try:
             # Store in short-term memory (Redis)
             self.memory.set_stm(user_id, self.name, query)
@@ -137,21 +321,60 @@ class BaseAgent(ABC):
             # Store in long-term memory (MySQL)
             self.memory.store_ltm(user_id, self.name, query, response)
             
-            # Store interaction with metadata if memory supports it
-            if hasattr(self.memory, 'store_interaction'):
-                self.memory.store_interaction(
-                    user_id=user_id,
-                    agent_name=self.name,
-                    query=query,
-                    response=response,
-                    interaction_type=interaction_type,
-                    metadata=metadata
-                )
+            self._record_interaction(user_id, query, response, interaction_type, metadata)
             
-            logger.debug(f"{self.name} stored interaction for user {user_id}")
+            logger.debug("%s stored interaction for user %s", self.name, user_id)
             
         except Exception as e:
             logger.warning(f"Failed to store interaction for {self.name}: {e}")
+        finally:
+            self._invalidate_context_cache(user_id)
+    
+    def _store_interactions_with_embeddings(self, items: List[Tuple]):
+        try:
+            rows = []
+            for user_id, query, response, _, _, content, embedding_metadata in items:
+                # Store in short-term memory (Redis)
+                self.memory.set_stm(user_id, self.name, query)
+                rows.append((user_id, self.name, query, response, content, embedding_metadata or {}))
+            
+            # Store in long-term memory and the vector store (MySQL) in one transaction
+            if hasattr(self.memory, 'store_ltm_with_embeddings'):
+                self.memory.store_ltm_with_embeddings(rows)
+            else:
+                for user_id, _, query, response, content, embedding_metadata in rows:
+                    self.memory.store_ltm(user_id, self.name, query, response)
+                    self._store_vector_embedding_impl(user_id, content, embedding_metadata)
+            
+            for user_id, query, response, interaction_type, metadata, _, _ in items:
+                self._record_interaction(user_id, query, response, interaction_type, metadata)
+            
+            logger.debug("%s stored %d interaction(s) with embeddings", self.name, len(items))
+            
+        except Exception as e:
+            logger.warning(f"Failed to store interactions for {self.name}: {e}")
+        finally:
+            for user_id in {item[0] for item in items}:
+                self._invalidate_context_cache(user_id)
+    
+    def _record_interaction(self, user_id: int, query: str, response: str,
+                            interaction_type: str, metadata: Optional[Any]):
+        """Store interaction with metadata if memory supports it"""
+        if not hasattr(self.memory, 'store_interaction'):
+            return
+        
+        # Dataclass metadata is only turned into a dict here, off the request path
+        if is_dataclass(metadata):
+            metadata = {field.name: getattr(metadata, field.name) for field in fields(metadata)}
+        
+        self.memory.store_interaction(
+            user_id=user_id,
+            agent_name=self.name,
+            query=query,
+            response=response,
+            interaction_type=interaction_type,
+            metadata=metadata
+        )
     
     def get_recent_interactions(self, user_id: int, hours: int = 2) -> List[Dict]:
         """
@@ -189,13 +412,20 @@ class BaseAgent(ABC):
     
     def store_vector_embedding(self, user_id: int, content: str, metadata: Dict = None):
         """
-        Store content as vector embedding for similarity search
+        Store content as vector embedding for similarity search.
+        Queued to the background writer unless Config.BACKGROUND_WRITES is disabled.
         
         Args:
             user_id: User identifier
             content: Content to store as embedding
             metadata: Additional metadata
         """
+        if Config.BACKGROUND_WRITES:
+            _background_writer.submit(self._store_vector_embedding_impl, user_id, content, metadata)
+        else:
+            self._store_vector_embedding_impl(user_id, content, metadata)
+    
+    def _store_vector_embedding_impl(self, user_id: int, content: str, metadata: Optional[Dict]):
         try:
             if hasattr(self.memory, 'store_vector_embedding'):
                 self.memory.store_vector_embedding(
@@ -204,15 +434,18 @@ class BaseAgent(ABC):
                     content=content,
                     metadata=metadata or {}
                 )
-                logger.debug(f"{self.name} stored vector embedding for user {user_id}")
+                logger.debug("%s stored vector embedding for user %s", self.name, user_id)
         except Exception as e:
             logger.warning(f"Failed to store vector embedding for {self.name}: {e}")
+        finally:
+            self._invalidate_context_cache(user_id)
     
     # ----------------------
     # SEARCH CAPABILITIES
     # ----------------------
     
-    def search_similar_content(self, query: str, user_id: int, limit: int = 5) -> Dict[str, Any]:
+    def search_similar_content(self, query: str, user_id: int, limit: int = 5,
+                               content_preview: Optional[int] = None) -> Dict[str, Any]:
         """
         Search for similar content in memory using vector similarity
         
@@ -220,6 +453,7 @@ class BaseAgent(ABC):
             query: Search query
             user_id: User identifier
             limit: Maximum number of results
+            content_preview: If set, truncate returned text to this many characters
             
         Returns:
             Dictionary containing search results
@@ -229,7 +463,9 @@ class BaseAgent(ABC):
                 return self.memory.get_search_history_json(
                     query=query,
                     user_id=user_id,
-                    agent_name=self.name
+                    agent_name=self.name,
+                    limit=limit,
+                    content_preview=content_preview
                 )
             else:
                 # Fallback to basic search
@@ -274,6 +510,73 @@ class BaseAgent(ABC):
             logger.warning(f"Cross-agent search failed for {self.name}: {e}")
             return {"search_results": "{}", "query": query, "error": str(e)}
     
+    def fetch_context(self, query: str, user_id: int, limit: int = 5, days: int = 7,
+                      content_preview: Optional[int] = None) -> Tuple[Dict[str, Any], List[Dict]]:
+        """
+        Run similarity search and historical context lookup concurrently.
+        The similarity search runs on a pool thread while history is read on the caller's thread.
+        
+        Returns:
+            Tuple of (search results, historical context)
+        """
+        search_future = _context_executor.submit(self.search_similar_content, query, user_id, limit, content_preview)
+        historical_context = self.get_historical_context(user_id, days)
+        return search_future.result(), historical_context
+    
+    def fetch_context_cached(self, query: str, user_id: int, limit: int = 5, days: int = 7,
+                             content_preview: Optional[int] = None) -> Tuple[Dict[str, Any], List[Dict]]:
+        """
+        fetch_context behind a semantic cache: a query whose embedding is close enough to
+        one this agent already looked up for the same user reuses that lookup's results.
+        Entries expire after Config.AGENT_CONTEXT_CACHE_TTL and are dropped when the agent
+        stores new memory for the user.
+        
+        Returns:
+            Tuple of (search results, historical context)
+        """
+        cache_key = f"{self.name}:{user_id}:{limit}:{days}:{content_preview}"
+        query_embedding = None
+        try:
+            # The similarity search and the response cache embed the same text, so this is computed once
+            query_embedding = self.memory.embed(query)
+        except Exception as e:
+            logger.warning(f"Failed to embed query for {self.name} context cache: {e}")
+        
+        if query_embedding is not None:
+            cached_context = _agent_context_cache.lookup(cache_key, query_embedding)
+            if cached_context is not None:
+                logger.debug("Context cache hit for %s", self.name)
+                return cached_context
+        
+        context = self.fetch_context(query, user_id, limit, days, content_preview)
+        if query_embedding is not None:
+            _agent_context_cache.insert(cache_key, query_embedding, context)
+        return context
+    
+    def _invalidate_context_cache(self, user_id: int):
+        """Drop this agent's cached memory lookups for a user after writing to their memory"""
+        _agent_context_cache.invalidate(f"{self.name}:{user_id}:")
+    
+    def fetch_recent_context(self, query: str, user_id: int, limit: int = 5, hours: int = 2,
+                             content_preview: Optional[int] = None) -> Tuple[Dict[str, Any], List[Dict]]:
+        """
+        Like fetch_context, but pairs the similarity search with short-term (recent) interactions
+        
+        Returns:
+            Tuple of (search results, recent interactions)
+        """
+        search_future = _context_executor.submit(self.search_similar_content, query, user_id, limit, content_preview)
+        recent_context = self.get_recent_interactions(user_id, hours)
+        return search_future.result(), recent_context
+    
+    def submit_context_read(self, func, *args, **kwargs) -> Future:
+        """
+        Start an independent memory read on the shared context pool so the caller can
+        overlap it with its own lookups. Each MemoryManager query takes its own connection,
+        so reads on both threads are safe.
+        """
+        return _context_executor.submit(func, *args, **kwargs)
+    
     # ----------------------
     # LLM INTEGRATION METHODS
     # ----------------------
@@ -313,6 +616,46 @@ class BaseAgent(ABC):
             logger.error(f"LLM response generation failed for {self.name}: {e}")
             return f"Error generating response: {str(e)}"
     
+    def generate_cached_response_with_context(self, query: str, context: str, user_id: int,
+                                              temperature: float = 0.7, category: str = "") -> Tuple[str, bool]:
+        """
+        generate_response_with_context behind a semantic cache.
+        A query close enough to one this agent already answered for the same user
+        (and category) returns the stored response without calling the LLM.
+        
+        Args:
+            query: User query
+            context: Context information
+            user_id: User identifier; cached answers may draw on that user's history
+            temperature: LLM temperature setting
+            category: Optional finer scope, e.g. the detected query type
+            
+        Returns:
+            Tuple of (response, whether it came from the cache)
+        """
+        cache_key = f"{self.name}:{user_id}:{category}"
+        query_embedding = None
+        try:
+            # Usually an embedding-cache hit: the similarity search already encoded this query
+            query_embedding = self.memory.embed(query)
+        except Exception as e:
+            logger.warning(f"Failed to embed query for {self.name} response cache: {e}")
+        
+        if query_embedding is not None:
+            cached_response = _agent_response_cache.lookup(cache_key, query_embedding)
+            if cached_response is not None:
+                logger.debug("Semantic cache hit for %s", self.name)
+                return cached_response, True
+        
+        response = self.generate_response_with_context(query, context, temperature)
+        
+        # Offline placeholders and error messages are not worth replaying
+        if (query_embedding is not None and not is_error_response(response)
+                and not response.startswith(f"{self.name} response: ")):
+            _agent_response_cache.insert(cache_key, query_embedding, response)
+        
+        return response, False
+    
     # ----------------------
     # UTILITY METHODS
     # ----------------------
@@ -347,8 +690,13 @@ class BaseAgent(ABC):
             query: Query being processed
             user_id: User identifier
         """
-        logger.info(f"{self.name} processing query: {query[:100]}..." + 
-                   (f" for user {user_id}" if user_id else ""))
+        # Lazy %-formatting, and no slicing either when INFO is disabled
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        if user_id:
+            logger.info("%s processing query: %s... for user %s", self.name, query[:100], user_id)
+        else:
+            logger.info("%s processing query: %s...", self.name, query[:100])
     
     def validate_state(self, state: GraphState) -> bool:
         """
@@ -0,0 +1,96 @@
+"""
+Multi-pattern keyword matching for agent routing and query classification.
+Replaces repeated `any(term in query_lower for term in terms)` scans with a single
+pass over the query (Aho-Corasick when pyahocorasick is installed, compiled regex otherwise).
+"""
+import re
+from typing import Dict, Iterable, Set, Optional
+
+# Optional imports with fallbacks
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """
+    Substring matcher over named buckets of terms.
+    Terms are lowercased once at build time; callers pass already lowercased text.
+    Bucket order is priority order: earlier buckets win in `first`.
+    """
+
+    def __init__(self, buckets: Dict[str, Iterable[str]]):
+        self.buckets = {name: tuple(term.lower() for term in terms) for name, terms in buckets.items()}
+        self._priority = {name: rank for rank, name in enumerate(self.buckets)}
+
+        term_buckets: Dict[str, Set[str]] = {}
+        for name, terms in self.buckets.items():
+            for term in terms:
+                if term:
+                    term_buckets.setdefault(term, set()).add(name)
+
+        self._automaton = None
+        self._pattern = None
+        if not term_buckets:
+            return
+
+        if ahocorasick:
+            self._automaton = ahocorasick.Automaton()
+            for term, names in term_buckets.items():
+                self._automaton.add_word(term, frozenset(names))
+            self._automaton.make_automaton()
+        else:
+            # One lookahead alternation, longest terms first, finds the longest term
+            # starting at each position. Any shorter term starting there is a prefix
+            # of it, so each term maps to the buckets of all its prefix terms too.
+            ordered = sorted(term_buckets, key=len, reverse=True)
+            self._pattern = re.compile("(?=(" + "|".join(re.escape(term) for term in ordered) + "))")
+            self._term_buckets = {
+                term: frozenset().union(*(names for prefix, names in term_buckets.items() if term.startswith(prefix)))
+                for term in ordered
+            }
+
+    def matches(self, text: str) -> Set[str]:
+        """Names of every bucket with at least one term occurring in (lowercased) text"""
+        found: Set[str] = set()
+        if self._automaton is not None:
+            for _, names in self._automaton.iter(text):
+                found |= names
+        elif self._pattern is not None:
+            term_buckets = self._term_buckets
+            for term in set(self._pattern.findall(text)):
+                found |= term_buckets[term]
+        return found
+
+    def first(self, text: str, default: Optional[str] = None) -> Optional[str]:
+        """Highest-priority bucket occurring in text, or default"""
+        found = self.matches(text)
+        if not found:
+            return default
+        return min(found, key=self._priority.__getitem__)
+
+
+def compile_category_pattern(categories: Dict[str, Iterable[str]]) -> "re.Pattern":
+    """
+    Compile an ordered {category: terms} mapping into one regex over lowercased text.
+    Each category becomes a named group; earlier categories take priority in match_category.
+    """
+    alternatives = "|".join(
+        f"(?P<{name}>{'|'.join(re.escape(term.lower()) for term in terms)})"
+        for name, terms in categories.items()
+    )
+    # Zero-width lookahead so overlapping terms from different categories are all seen
+    return re.compile(f"(?=(?:{alternatives}))")
+
+
+def match_category(pattern: "re.Pattern", text: str, default: str) -> str:
+    """Highest-priority category of a compile_category_pattern regex found in (lowercased) text, or default"""
+    best_name, best_rank = None, None
+    for match in pattern.finditer(text):
+        rank = pattern.groupindex[match.lastgroup]
+        if best_rank is None or rank < best_rank:
+            best_name, best_rank = match.lastgroup, rank
+            if rank == 1:
+                break
+    return best_name or default
@@ -14,9 +14,21 @@ import operator
 from langgraph.graph import StateGraph, END
 from core.memory import MemoryManager
 from core.ollama_client import ollama_client, prompt_manager
+from core.keyword_matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
+# Initial routing keywords, in priority order: the first category with a match wins
+_ROUTING_MATCHER = KeywordMatcher({
+    "weather": ["weather", "temperature", "rain", "sun", "climate", "forecast", "humidity", "wind", "storm", "snow"],
+    "dining": ["restaurant", "food", "cuisine", "dining", "eat", "meal", "chef", "menu", "cooking", "recipe"],
+    "location": ["scenic", "beautiful", "location", "tourist", "destination", "view", "landscape", "mountain"],
+    "forest": ["forest", "tree", "wildlife", "ecosystem", "conservation", "nature", "biodiversity"],
+    "search": ["search", "history", "remember", "previous", "similar", "past", "recall"],
+    # Complex travel queries that need multiple agents start with location, routing to others as needed
+    "travel": ["travel", "trip", "vacation", "visit", "plan"]
+})
+
 # Enhanced GraphState for multiagent communication
 class MultiAgentState(TypedDict, total=False):
     """Enhanced state for multiagent LangGraph system"""
@@ -812,40 +824,11 @@ class LangGraphMultiAgentSystem:
     
     def _analyze_query_for_routing(self, question: str) -> str:
         """Analyze query and determine initial routing decision"""
-        question_lower = question.lower()
-        
-        # Weather-related queries
-        weather_keywords = ["weather", "temperature", "rain", "sun", "climate", "forecast", "humidity", "wind", "storm", "snow"]
-        if any(keyword in question_lower for keyword in weather_keywords):
-            return "weather"
-        
-        # Dining-related queries  
-        dining_keywords = ["restaurant", "food", "cuisine", "dining", "eat", "meal", "chef", "menu", "cooking", "recipe"]
-        if any(keyword in question_lower for keyword in dining_keywords):
-            return "dining"
-        
-        # Location-related queries
-        location_keywords = ["scenic", "beautiful", "location", "tourist", "destination", "view", "landscape", "mountain"]
-        if any(keyword in question_lower for keyword in location_keywords):
-            return "location"
-        
-        # Forest-related queries
-        forest_keywords = ["forest", "tree", "wildlife", "ecosystem", "conservation", "nature", "biodiversity"]
-        if any(keyword in question_lower for keyword in forest_keywords):
-            return "forest"
-        
-        # Search-related queries
-        search_keywords = ["search", "history", "remember", "previous", "similar", "past", "recall"]
-        if any(keyword in question_lower for keyword in search_keywords):
-            return "search"
-        
-        # Complex travel queries that need multiple agents
-        travel_keywords = ["travel", "trip", "vacation", "visit", "plan"]
-        if any(keyword in question_lower for keyword in travel_keywords):
-            return "location"  # Start with location, will route to others as needed
+        # One pass over the query finds every category's keywords at once
+        category = _ROUTING_MATCHER.first(question.lower(), default="location")
         
-        # Default to synthesize if no specific routing
-        return "location"
+        # Travel queries and queries without a specific match start with location
+        return "location" if category == "travel" else category
     
     def _route_from_router(self, state: MultiAgentState) -> str:
         """Route from RouterAgent to appropriate agent"""
@@ -1,12 +1,22 @@
 # memory.py
 import redis
 import mysql.connector
+from mysql.connector import pooling
 from datetime import datetime, timedelta
 import json
 import time
+import os
+import atexit
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import Future
 from typing import List, Dict, Optional, Any
 from config import Config
+from core.vector_index import VectorIndex
+from core import numba_kernels
 
 # Optional imports with fallbacks
 try:
@@ -15,12 +25,38 @@ except ImportError:
     np = None
 
 try:
-    from sentence_transformers import SentenceTransformer
+    import orjson
 except ImportError:
-    SentenceTransformer = None
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+
+def _load_sentence_transformer():
+    """SentenceTransformer class, imported on first use since it pulls in torch; None when not installed"""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None
+    return SentenceTransformer
+
+
+def _json_dumps(obj) -> str:
+    """Serialize to a JSON string; uses orjson (numpy-aware) when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    if np is not None and isinstance(obj, np.ndarray):
+        obj = obj.tolist()
+    return json.dumps(obj)
+
+
+def _json_loads(data):
+    """Parse a JSON column value; uses orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 class MemoryManager:
     def __init__(self):
         # Get connection parameters from config
@@ -43,16 +79,77 @@ class MemoryManager:
             logger.error(f"❌ MySQL connection failed: {e}")
             self.mysql_conn = None
         
+        # Pooled connections for queries that request threads, agent context workers and the
+        # background writer run concurrently; the shared connection above is not thread-safe
+        self._mysql_pool = None
+        self._mysql_lock = threading.Lock()
+        try:
+            self._mysql_pool = pooling.MySQLConnectionPool(
+                pool_name=f"memory_{id(self)}",
+                pool_size=Config.MYSQL_POOL_SIZE,
+                **mysql_params
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ MySQL connection pool unavailable, queries will be serialized: {e}")
+        
         # Initialize sentence transformer for embeddings
         self.embedding_model = None
+        SentenceTransformer = _load_sentence_transformer()
         if SentenceTransformer:
             try:
                 self.embedding_model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
                 logger.info("✅ Embedding model loaded")
+                numba_kernels.warmup(self.embedding_model.get_sentence_embedding_dimension())
             except Exception as e:
                 logger.warning(f"⚠️ Could not load embedding model: {e}")
         else:
             logger.info("📝 SentenceTransformer not available, vector search disabled")
+        
+        # LRU of text -> embedding, plus in-flight encodes so concurrent misses share one forward pass
+        self._embedding_cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._embedding_inflight: Dict[str, Future] = {}
+        self._embedding_lock = threading.Lock()
+        
+        # Per-user embedding matrices, loaded from vector_embeddings on first search. The lock
+        # only guards these dicts: loads run outside it, and each index locks its own rows
+        self._vector_indexes: Dict[int, VectorIndex] = {}
+        self._vector_index_loading: Dict[int, Future] = {}
+        self._vector_index_pending: Dict[int, List[tuple]] = {}
+        self._vector_index_lock = threading.Lock()
+        atexit.register(self.save_vector_indexes)
+
+    @contextmanager
+    def _connection(self):
+        """
+        Connection for the duration of one operation, reads and writes alike: a pooled one,
+        or the shared connection under a lock when there is no pool or it is exhausted
+        """
+        conn = None
+        if self._mysql_pool is not None:
+            try:
+                conn = self._mysql_pool.get_connection()
+            except mysql.connector.errors.PoolError:
+                logger.debug("MySQL connection pool exhausted, using the shared connection")
+        
+        if conn is None:
+            with self._mysql_lock:
+                yield self.mysql_conn
+            return
+        
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _cursor(self, dictionary: bool = False):
+        """Cursor on a connection from _connection, closed when the block exits"""
+        with self._connection() as conn:
+            cursor = conn.cursor(dictionary=dictionary)
+            try:
+                yield cursor
+            finally:
+                cursor.close()
 
     # ----------------------
     # SHORT-TERM MEMORY (Redis)
@@ -84,42 +181,36 @@ class MemoryManager:
     # LONG-TERM MEMORY (MySQL)
     # ----------------------
     def store_ltm(self, user_id, agent_id, input_text, output_text):
-        cursor = self.mysql_conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO agent_history (user_id, agent_id, input_text, output_text)
-            VALUES (%s, %s, %s, %s)
-            """,
-            (user_id, agent_id, input_text, output_text)
-        )
-        self.mysql_conn.commit()
-        cursor.close()
+        with self._cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO agent_history (user_id, agent_id, input_text, output_text)
+                VALUES (%s, %s, %s, %s)
+                """,
+                (user_id, agent_id, input_text, output_text)
+            )
 
     def get_ltm_by_user(self, user_id):
-        cursor = self.mysql_conn.cursor(dictionary=True)
-        cursor.execute(
-            "SELECT * FROM ltm WHERE user_id = %s ORDER BY created_at DESC",
-            (user_id,)
-        )
-        results = cursor.fetchall()
-        cursor.close()
-        return results
+        with self._cursor(dictionary=True) as cursor:
+            cursor.execute(
+                "SELECT * FROM ltm WHERE user_id = %s ORDER BY created_at DESC",
+                (user_id,)
+            )
+            return cursor.fetchall()
 
 
 
     def get_ltm_by_agent(self, user_id, agent_id):
-        cursor = self.mysql_conn.cursor(dictionary=True)
-        cursor.execute(
-            """
-            SELECT * FROM agent_history
-            WHERE user_id = %s AND agent_id = %s
-            ORDER BY timestamp DESC
-            """,
-            (user_id, agent_id)
-        )
-        results = cursor.fetchall()
-        cursor.close()
-        return results
+        with self._cursor(dictionary=True) as cursor:
+            cursor.execute(
+                """
+                SELECT * FROM agent_history
+                WHERE user_id = %s AND agent_id = %s
+                ORDER BY timestamp DESC
+                """,
+                (user_id, agent_id)
+            )
+            return cursor.fetchall()
     
     # def get_all_stm_for_user(self, user_id):
     #     pattern = f"stm:{user_id}:*"
@@ -132,12 +223,11 @@ class MemoryManager:
     #     return result
     
     def set_ltm(self, user_id: str, agent_id: str, value: str):
-        cursor = self.mysql_conn.cursor()
-        cursor.execute(
-            "REPLACE INTO ltm (user_id, agent_id, value) VALUES (%s, %s, %s)",
-            (user_id, agent_id, value)
-        )
-        self.mysql_conn.commit()
+        with self._cursor() as cursor:
+            cursor.execute(
+                "REPLACE INTO ltm (user_id, agent_id, value) VALUES (%s, %s, %s)",
+                (user_id, agent_id, value)
+            )
     
     def get_recent_stm(self, user_id, agent_id=None, hours=1):
         pattern = f"stm:{user_id}:*"
@@ -158,29 +248,27 @@ class MemoryManager:
 
     
     def get_recent_ltm(self, user_id, agent_id=None, days=1):
-        cursor = self.mysql_conn.cursor(dictionary=True)
         cutoff_query = """
             SELECT * FROM ltm
             WHERE user_id = %s AND created_at >= NOW() - INTERVAL %s DAY
         """
-        cursor.execute(cutoff_query, (user_id, days))
-        return cursor.fetchall()
+        with self._cursor(dictionary=True) as cursor:
+            cursor.execute(cutoff_query, (user_id, days))
+            return cursor.fetchall()
 
 
     
     def get_ltm_by_agent(self, user_id, agent_id):
-        cursor = self.mysql_conn.cursor(dictionary=True)
-        cursor.execute(
-            """
-            SELECT * FROM ltm
-            WHERE user_id = %s AND agent_id = %s
-            ORDER BY created_at DESC
-            """,
-            (user_id, agent_id)
-        )
-        results = cursor.fetchall()
-        cursor.close()
-        return results
+        with self._cursor(dictionary=True) as cursor:
+            cursor.execute(
+                """
+                SELECT * FROM ltm
+                WHERE user_id = %s AND agent_id = %s
+                ORDER BY created_at DESC
+                """,
+                (user_id, agent_id)
+            )
+            return cursor.fetchall()
 
     
     # ----------------------
@@ -189,19 +277,18 @@ class MemoryManager:
     def store_agent_memory(self, agent_name: str, user_id: int, memory_key: str, memory_value: str, metadata: Dict = None):
         """Store LTM grouped by agent name rather than user_id"""
         try:
-            cursor = self.mysql_conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO ltm_by_agent (agent_name, user_id, memory_key, memory_value, context_metadata)
-                VALUES (%s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE 
-                memory_value = VALUES(memory_value),
-                context_metadata = VALUES(context_metadata),
-                updated_at = CURRENT_TIMESTAMP
-                """,
-                (agent_name, user_id, memory_key, memory_value, json.dumps(metadata or {}))
-            )
-            cursor.close()
+            with self._cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO ltm_by_agent (agent_name, user_id, memory_key, memory_value, context_metadata)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE 
+                    memory_value = VALUES(memory_value),
+                    context_metadata = VALUES(context_metadata),
+                    updated_at = CURRENT_TIMESTAMP
+                    """,
+                    (agent_name, user_id, memory_key, memory_value, _json_dumps(metadata or {}))
+                )
             logger.info(f"Stored memory for agent {agent_name}: {memory_key}")
         except Exception as e:
             logger.error(f"Error storing agent memory: {e}")
@@ -209,50 +296,89 @@ class MemoryManager:
     def get_agent_memories(self, agent_name: str, user_id: Optional[int] = None, limit: int = 50) -> List[Dict]:
         """Get memories for a specific agent, optionally filtered by user"""
         try:
-            cursor = self.mysql_conn.cursor(dictionary=True)
-            if user_id:
-                cursor.execute(
-                    """
-                    SELECT * FROM ltm_by_agent 
-                    WHERE agent_name = %s AND user_id = %s 
-                    ORDER BY updated_at DESC LIMIT %s
-                    """,
-                    (agent_name, user_id, limit)
-                )
-            else:
-                cursor.execute(
-                    """
-                    SELECT * FROM ltm_by_agent 
-                    WHERE agent_name = %s 
-                    ORDER BY updated_at DESC LIMIT %s
-                    """,
-                    (agent_name, limit)
-                )
-            results = cursor.fetchall()
-            cursor.close()
-            return results
+            with self._cursor(dictionary=True) as cursor:
+                if user_id:
+                    cursor.execute(
+                        """
+                        SELECT * FROM ltm_by_agent 
+                        WHERE agent_name = %s AND user_id = %s 
+                        ORDER BY updated_at DESC LIMIT %s
+                        """,
+                        (agent_name, user_id, limit)
+                    )
+                else:
+                    cursor.execute(
+                        """
+                        SELECT * FROM ltm_by_agent 
+                        WHERE agent_name = %s 
+                        ORDER BY updated_at DESC LIMIT %s
+                        """,
+                        (agent_name, limit)
+                    )
+                return cursor.fetchall()
         except Exception as e:
             logger.error(f"Error getting agent memories: {e}")
             return []
     
-    def store_interaction(self, user_id: int, agent_name: str, query: str, response: str, interaction_type: str = 'single'):
-        """Store agent interaction with user"""
+    def store_interaction(self, user_id: int, agent_name: str, query: str, response: str, interaction_type: str = 'single',
+                          metadata: Dict = None):
+        """Store agent interaction with user, plus the agent's metadata as JSON"""
         try:
-            cursor = self.mysql_conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO agent_interactions (user_id, agent_name, query, response, interaction_type)
-                VALUES (%s, %s, %s, %s, %s)
-                """,
-                (user_id, agent_name, query, response, interaction_type)
-            )
-            cursor.close()
+            with self._cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO agent_interactions (user_id, agent_name, query, response, interaction_type, metadata)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    """,
+                    (user_id, agent_name, query, response, interaction_type, _json_dumps(metadata or {}))
+                )
         except Exception as e:
             logger.error(f"Error storing interaction: {e}")
     
     # ----------------------
     # VECTOR SIMILARITY SEARCH METHODS
     # ----------------------
+    def embed(self, text: str):
+        """
+        Encode text with the embedding model, reusing cached results for identical text.
+        Returns a read-only array, or None when no embedding model is loaded.
+        """
+        if not self.embedding_model:
+            return None
+        
+        key = hashlib.sha1(" ".join(text.split()).encode('utf-8')).hexdigest()
+        with self._embedding_lock:
+            embedding = self._embedding_cache.get(key)
+            if embedding is not None:
+                self._embedding_cache.move_to_end(key)
+                return embedding
+            
+            future = self._embedding_inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._embedding_inflight[key] = future
+        
+        if not owner:
+            return future.result()
+        
+        try:
+            embedding = np.asarray(self.embedding_model.encode(text), dtype=np.float32)
+            embedding.setflags(write=False)
+        except Exception as e:
+            with self._embedding_lock:
+                del self._embedding_inflight[key]
+            future.set_exception(e)
+            raise
+        
+        with self._embedding_lock:
+            self._embedding_cache[key] = embedding
+            if len(self._embedding_cache) > Config.EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+            del self._embedding_inflight[key]
+        future.set_result(embedding)
+        return embedding
+    
     def store_vector_embedding(self, user_id: int, agent_name: str, content: str, metadata: Dict = None):
         """Store content with its vector embedding"""
         if not self.embedding_model:
@@ -261,22 +387,91 @@ class MemoryManager:
         
         try:
             # Generate embedding
-            embedding = self.embedding_model.encode(content)
-            embedding_json = json.dumps(embedding.tolist())
+            embedding = self.embed(content)
+            embedding_json = _json_dumps(embedding)
             
-            cursor = self.mysql_conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO vector_embeddings (user_id, agent_name, content, embedding, metadata)
-                VALUES (%s, %s, %s, %s, %s)
-                """,
-                (user_id, agent_name, content, embedding_json, json.dumps(metadata or {}))
-            )
-            cursor.close()
-            logger.info(f"Stored vector embedding for {agent_name}")
+            with self._cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO vector_embeddings (user_id, agent_name, content, embedding, metadata)
+                    VALUES (%s, %s, %s, %s, %s)
+                    """,
+                    (user_id, agent_name, content, embedding_json, _json_dumps(metadata or {}))
+                )
+            
+            self._index_embedding(user_id, agent_name, content, metadata, embedding)
+            logger.info("Stored vector embedding for %s", agent_name)
         except Exception as e:
             logger.error(f"Error storing vector embedding: {e}")
     
+    def store_ltm_with_embeddings(self, rows: List[tuple]):
+        """
+        Store LTM rows and their vector embeddings in one transaction, as two
+        multi-row inserts. Each row is (user_id, agent_name, input_text, output_text,
+        content, metadata).
+        """
+        if not rows:
+            return
+        if not self.embedding_model:
+            for user_id, agent_name, input_text, output_text, _, _ in rows:
+                self.store_ltm(user_id, agent_name, input_text, output_text)
+            return
+        
+        # Encode before opening the transaction so it is held only for the inserts
+        embeddings = [self.embed(content) for _, _, _, _, content, _ in rows]
+        
+        with self._connection() as conn:
+            try:
+                conn.start_transaction()
+                cursor = conn.cursor()
+                try:
+                    cursor.executemany(
+                        """
+                        INSERT INTO agent_history (user_id, agent_id, input_text, output_text)
+                        VALUES (%s, %s, %s, %s)
+                        """,
+                        [row[:4] for row in rows]
+                    )
+                    cursor.executemany(
+                        """
+                        INSERT INTO vector_embeddings (user_id, agent_name, content, embedding, metadata)
+                        VALUES (%s, %s, %s, %s, %s)
+                        """,
+                        [
+                            (user_id, agent_name, content, _json_dumps(embedding), _json_dumps(metadata or {}))
+                            for (user_id, agent_name, _, _, content, metadata), embedding in zip(rows, embeddings)
+                        ]
+                    )
+                finally:
+                    cursor.close()
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        
+        for (user_id, agent_name, _, _, content, metadata), embedding in zip(rows, embeddings):
+            self._index_embedding(user_id, agent_name, content, metadata, embedding)
+        logger.info("Stored %d LTM row(s) with vector embeddings", len(rows))
+    
+    def _index_embedding(self, user_id: int, agent_name: str, content: str, metadata: Optional[Dict], embedding):
+        """
+        Keep an already-loaded index in sync; unloaded users pick the row up on first search.
+        Rows written while the user's index is loading are applied once the load finishes.
+        """
+        item = {
+            'content': content,
+            'agent_name': agent_name,
+            'metadata': metadata or {},
+            'created_at': datetime.now()
+        }
+        with self._vector_index_lock:
+            index = self._vector_indexes.get(user_id)
+            if index is None:
+                if user_id in self._vector_index_loading:
+                    self._vector_index_pending.setdefault(user_id, []).append((embedding, item))
+                return
+        index.add(embedding, item)
+    
     def similarity_search(self, query: str, user_id: int, agent_name: Optional[str] = None, limit: int = 5) -> List[Dict]:
         """Perform similarity search on stored content"""
         if not self.embedding_model:
@@ -285,89 +480,148 @@ class MemoryManager:
         
         try:
             # Generate query embedding
-            query_embedding = self.embedding_model.encode(query)
-            
-            # Get stored embeddings
-            cursor = self.mysql_conn.cursor(dictionary=True)
-            if agent_name:
-                cursor.execute(
-                    """
-                    SELECT id, content, embedding, metadata, agent_name, created_at
-                    FROM vector_embeddings 
-                    WHERE user_id = %s AND agent_name = %s
-                    """,
-                    (user_id, agent_name)
-                )
-            else:
-                cursor.execute(
-                    """
-                    SELECT id, content, embedding, metadata, agent_name, created_at
-                    FROM vector_embeddings 
-                    WHERE user_id = %s
-                    """,
-                    (user_id,)
-                )
-            
-            stored_embeddings = cursor.fetchall()
-            cursor.close()
+            query_embedding = self.embed(query)
             
-            # Calculate similarities
-            results = []
-            for item in stored_embeddings:
-                try:
-                    stored_embedding = np.array(json.loads(item['embedding']))
-                    similarity = np.dot(query_embedding, stored_embedding) / (
-                        np.linalg.norm(query_embedding) * np.linalg.norm(stored_embedding)
-                    )
-                    
-                    results.append({
-                        'content': item['content'],
-                        'agent_name': item['agent_name'],
-                        'similarity': float(similarity),
-                        'metadata': json.loads(item['metadata']),
-                        'created_at': item['created_at']
-                    })
-                except Exception as e:
-                    logger.warning(f"Error calculating similarity for item {item['id']}: {e}")
-                    continue
-            
-            # Sort by similarity and return top results
-            results.sort(key=lambda x: x['similarity'], reverse=True)
-            return results[:limit]
+            index = self._get_vector_index(user_id)
+            return index.search(query_embedding, agent_name, limit)
             
         except Exception as e:
             logger.error(f"Error in similarity search: {e}")
             return []
     
-    def get_search_history_json(self, query: str, user_id: int, agent_name: Optional[str] = None) -> Dict:
-        """Get similarity search results as JSON response (constraint requirement)"""
-        similar_content = self.similarity_search(query, user_id, agent_name)
+    def _get_vector_index(self, user_id: int) -> VectorIndex:
+        """
+        Return the user's embedding index, loading it from MySQL on first use.
+        Concurrent first searches for the same user share one load; other users are not blocked.
+        """
+        with self._vector_index_lock:
+            index = self._vector_indexes.get(user_id)
+            if index is not None:
+                return index
+            future = self._vector_index_loading.get(user_id)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._vector_index_loading[user_id] = future
         
-        # Also get recent interactions for context
-        cursor = self.mysql_conn.cursor(dictionary=True)
-        if agent_name:
-            cursor.execute(
-                """
-                SELECT agent_name, query, response, timestamp 
-                FROM agent_interactions 
-                WHERE user_id = %s AND agent_name = %s 
-                ORDER BY timestamp DESC LIMIT 10
-                """,
-                (user_id, agent_name)
-            )
-        else:
+        if not owner:
+            return future.result()
+        
+        try:
+            index = self._load_vector_index(user_id)
+        except BaseException as e:
+            with self._vector_index_lock:
+                del self._vector_index_loading[user_id]
+                self._vector_index_pending.pop(user_id, None)
+            future.set_exception(e)
+            raise
+        
+        with self._vector_index_lock:
+            pending = self._vector_index_pending.pop(user_id, [])
+            # A row committed before the load's SELECT is already in the index
+            loaded = {(item['agent_name'], item['content']) for item in index._items} if pending else set()
+            pending = [(embedding, item) for embedding, item in pending
+                       if (item['agent_name'], item['content']) not in loaded]
+            if pending:
+                index.add_batch([embedding for embedding, _ in pending], [item for _, item in pending])
+            self._vector_indexes[user_id] = index
+            del self._vector_index_loading[user_id]
+        future.set_result(index)
+        return index
+    
+    def _load_vector_index(self, user_id: int) -> VectorIndex:
+        """Build a user's embedding index from vector_embeddings, attaching the saved graph if current"""
+        with self._cursor(dictionary=True) as cursor:
             cursor.execute(
                 """
-                SELECT agent_name, query, response, timestamp 
-                FROM agent_interactions 
-                WHERE user_id = %s 
-                ORDER BY timestamp DESC LIMIT 10
+                SELECT id, content, embedding, metadata, agent_name, created_at
+                FROM vector_embeddings 
+                WHERE user_id = %s
+                ORDER BY id
                 """,
                 (user_id,)
             )
+            stored_embeddings = cursor.fetchall()
+        
+        embeddings = []
+        items = []
+        for item in stored_embeddings:
+            try:
+                embeddings.append(_json_loads(item['embedding']))
+                items.append({
+                    'content': item['content'],
+                    'agent_name': item['agent_name'],
+                    'metadata': _json_loads(item['metadata']) if item['metadata'] else {},
+                    'created_at': item['created_at']
+                })
+            except Exception as e:
+                logger.warning(f"Error loading embedding for item {item['id']}: {e}")
+                continue
         
-        recent_interactions = cursor.fetchall()
-        cursor.close()
+        index = VectorIndex()
+        index.add_batch(embeddings, items, build_graph=False)
+        if not index.load_graph(self._vector_index_path(user_id)):
+            index.ensure_graph()
+        return index
+    
+    @staticmethod
+    def _vector_index_path(user_id: int) -> str:
+        return os.path.join(Config.VECTOR_INDEX_DIR, f"user_{user_id}.hnsw")
+    
+    def save_vector_indexes(self):
+        """Persist HNSW graphs for every loaded user so restarts skip the rebuild"""
+        with self._vector_index_lock:
+            indexes = list(self._vector_indexes.items())
+        for user_id, index in indexes:
+            try:
+                if index.save(self._vector_index_path(user_id)):
+                    logger.info(f"Saved vector index for user {user_id}")
+            except Exception as e:
+                logger.warning(f"Could not save vector index for user {user_id}: {e}")
+    
+    def get_search_history_json(self, query: str, user_id: int, agent_name: Optional[str] = None, limit: int = 5,
+                                content_preview: Optional[int] = None) -> Dict:
+        """
+        Get similarity search results as JSON response (constraint requirement).
+        With content_preview, text fields are cut to that many characters, in SQL for
+        the recent interactions so full rows are never sent over the wire.
+        """
+        similar_content = self.similarity_search(query, user_id, agent_name, limit)
+        if content_preview is not None:
+            for item in similar_content:
+                item['content'] = item['content'][:content_preview]
+        
+        if content_preview is not None:
+            columns = "agent_name, LEFT(query, %s) AS query, LEFT(response, %s) AS response, timestamp"
+            column_params = (content_preview, content_preview)
+        else:
+            columns = "agent_name, query, response, timestamp"
+            column_params = ()
+        
+        # Also get recent interactions for context
+        with self._cursor(dictionary=True) as cursor:
+            if agent_name:
+                cursor.execute(
+                    f"""
+                    SELECT {columns} 
+                    FROM agent_interactions 
+                    WHERE user_id = %s AND agent_name = %s 
+                    ORDER BY timestamp DESC LIMIT 10
+                    """,
+                    column_params + (user_id, agent_name)
+                )
+            else:
+                cursor.execute(
+                    f"""
+                    SELECT {columns} 
+                    FROM agent_interactions 
+                    WHERE user_id = %s 
+                    ORDER BY timestamp DESC LIMIT 10
+                    """,
+                    column_params + (user_id,)
+                )
+            
+            recent_interactions = cursor.fetchall()
         
         return {
             "query": query,
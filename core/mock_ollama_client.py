@@ -4,6 +4,7 @@ Provides realistic responses for each agent type
 """
 
 import logging
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
@@ -17,6 +18,9 @@ class MockOllamaClient:
         self.default_model = "llama3:latest"
         self.timeout = 30
         self.response_templates = self._load_response_templates()
+        
+        # Responses depend only on (system_prompt, prompt), so repeated test queries skip template selection
+        self._cached_response = lru_cache(maxsize=256)(self._select_response)
     
     def _load_response_templates(self) -> Dict[str, Dict[str, str]]:
         """Load response templates for different agents"""
@@ -314,24 +318,28 @@ Your current question aligns perfectly with your established interests in compre
     ) -> str:
         """Generate mock response based on agent type and query"""
         try:
-            # Determine agent type from system prompt
-            agent_type = self._identify_agent_type(system_prompt or "", prompt)
-            
-            # Get appropriate template
-            templates = self.response_templates.get(agent_type, {})
-            
-            # Choose specific template based on query content
-            template_key = self._choose_template_key(prompt, templates)
-            
-            response = templates.get(template_key, templates.get("default", "Mock response generated successfully."))
-            
-            logger.info(f"Mock response generated for {agent_type}")
-            return response
+            return self._cached_response(system_prompt or "", prompt)
             
         except Exception as e:
             logger.error(f"Mock response generation error: {e}")
             return f"Mock response for query: {prompt[:100]}..."
     
+    def _select_response(self, system_prompt: str, prompt: str) -> str:
+        """Pick the template response for a prompt (memoized per client in _cached_response)"""
+        # Determine agent type from system prompt
+        agent_type = self._identify_agent_type(system_prompt, prompt)
+        
+        # Get appropriate template
+        templates = self.response_templates.get(agent_type, {})
+        
+        # Choose specific template based on query content
+        template_key = self._choose_template_key(prompt, templates)
+        
+        response = templates.get(template_key, templates.get("default", "Mock response generated successfully."))
+        
+        logger.info(f"Mock response generated for {agent_type}")
+        return response
+    
     def _identify_agent_type(self, system_prompt: str, prompt: str) -> str:
         """Identify agent type from system prompt and query content"""
         system_lower = system_prompt.lower()
@@ -0,0 +1,70 @@
+"""
+JIT-compiled similarity kernels for VectorIndex exact search and SemanticCache lookups.
+Falls back to equivalent NumPy implementations when numba is not installed.
+"""
+import logging
+
+# Optional imports with fallbacks
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def top_k(scores: "np.ndarray", k: int) -> "np.ndarray":
+    """Positions of the k highest scores, best first"""
+    if k < scores.size:
+        top = np.argpartition(-scores, k)[:k]
+    else:
+        top = np.arange(scores.size)
+    return top[np.argsort(-scores[top])]
+
+
+if NUMBA_AVAILABLE:
+    # cache=True writes the compiled kernel to __pycache__ so only the
+    # very first process pays the compile cost
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _dot_scores_rows(M, q, rows):
+        n = rows.shape[0]
+        d = M.shape[1]
+        scores = np.empty(n, np.float32)
+        for i in prange(n):
+            r = rows[i]
+            s = np.float32(0.0)
+            for j in range(d):
+                s += M[r, j] * q[j]
+            scores[i] = s
+        return scores
+
+
+def cosine_scores(M: "np.ndarray", q: "np.ndarray", rows: "np.ndarray" = None) -> "np.ndarray":
+    """
+    Dot product of each (optionally selected) row of M with q.
+    With L2-normalised inputs this is cosine similarity.
+    
+    The full-matrix case stays on BLAS GEMV, which already beats the JIT loop;
+    the row-subset case uses the kernel to skip materialising M[rows].
+    """
+    if rows is None:
+        return M @ q
+    if NUMBA_AVAILABLE:
+        return _dot_scores_rows(M, q, rows.astype(np.int64, copy=False))
+    return M[rows] @ q
+
+
+def warmup(dim: int = 384):
+    """Trigger JIT compilation ahead of the first real query"""
+    if not NUMBA_AVAILABLE:
+        return
+    M = np.zeros((2, dim), dtype=np.float32)
+    q = np.zeros(dim, dtype=np.float32)
+    cosine_scores(M, q, np.arange(1))
+    logger.info("Numba similarity kernels compiled")
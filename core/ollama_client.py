@@ -6,6 +6,7 @@ import json
 import logging
 import os
 from typing import Dict, List, Optional, Any
+from config import Config
 
 # Try to import decouple, fallback to os.getenv
 try:
@@ -19,6 +20,18 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Fallback messages returned by OllamaClient.generate_response instead of raising
+ERROR_RESPONSE_PREFIXES = (
+    "Request timed out",
+    "Error generating response",
+    "An unexpected error occurred",
+    "No response generated"
+)
+
+def is_error_response(response: Optional[str]) -> bool:
+    """Check whether a generated response is one of the client's fallback error messages"""
+    return not response or response.startswith(ERROR_RESPONSE_PREFIXES)
+
 class OllamaClient:
     """Client for interacting with local Ollama server"""
     
@@ -28,6 +41,11 @@ class OllamaClient:
         # Force higher timeout for agent processing
         self.timeout = config('OLLAMA_TIMEOUT', default=120, cast=int)
     
+    @property
+    def keep_alive(self) -> str:
+        """How long Ollama keeps the model (and its cached prompt prefix) loaded between requests"""
+        return Config.OLLAMA_KEEP_ALIVE
+    
     def is_available(self) -> bool:
         """Check if Ollama server is available"""
         try:
@@ -72,6 +90,7 @@ class OllamaClient:
                 "model": model,
                 "prompt": full_prompt,
                 "stream": False,
+                "keep_alive": self.keep_alive,
                 "options": {
                     "temperature": temperature,
                     "num_predict": max_tokens
@@ -116,6 +135,7 @@ class OllamaClient:
                 "model": model,
                 "messages": messages,
                 "stream": False,
+                "keep_alive": self.keep_alive,
                 "options": {
                     "temperature": temperature,
                     "num_predict": max_tokens
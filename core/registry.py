@@ -215,8 +215,8 @@ class AgentRegistry:
             return None
         
         try:
-            # Create instance passing memory_manager
-            agent_instance = agent_class(memory_manager)
+            # Reuse the instance shared for this memory manager
+            agent_instance = agent_class.get_instance(memory_manager)
             self.agent_instances[agent_id] = agent_instance
             logger.info(f"Created agent instance: {agent_id}")
             return agent_instance
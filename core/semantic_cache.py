@@ -0,0 +1,187 @@
+# semantic_cache.py
+"""
+Embedding-keyed response cache shared by agents.
+Near-duplicate questions (cosine similarity above a threshold) reuse a previously
+generated LLM response instead of paying for another generation. The same structure
+caches memory lookups (similar content plus history) keyed on the query embedding.
+"""
+
+import threading
+import time
+from typing import Any, List, Optional
+
+# Optional imports with fallbacks
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from core.numba_kernels import cosine_scores
+
+_STORAGE_DTYPES = ("float32", "float16", "int8")
+
+
+def _popcount64(values: "np.ndarray") -> "np.ndarray":
+    """Set-bit count of each uint64"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+class SemanticCache:
+    """
+    Bounded LRU cache of generated responses.
+    Entries are keyed on (namespace key, query embedding); a lookup hits when the
+    cosine similarity to a cached query under the same key reaches the threshold.
+    
+    Each entry also carries a 64-bit random-hyperplane (SimHash) signature. When a
+    key holds more than `lsh_candidates` entries, only the entries closest
+    in Hamming distance are scored exactly.
+    
+    With a `ttl`, entries older than that many seconds no longer match and are
+    evicted first.
+    
+    Query embeddings are stored as float32, float16 or per-row-scaled int8
+    (`quantization`); lookups score against a float32 copy of the candidate rows.
+    """
+    
+    SIGNATURE_BITS = 64
+    
+    def __init__(self, max_entries: int = 256, threshold: float = 0.9, lsh_candidates: int = 32,
+                 ttl: Optional[float] = None, quantization: str = "float32") -> None:
+        if quantization not in _STORAGE_DTYPES:
+            raise ValueError(f"Unsupported cache quantization: {quantization}")
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.lsh_candidates = lsh_candidates
+        self.ttl = ttl
+        self.quantization = quantization
+        self._matrix = None          # (n, d) storage dtype, rows L2-normalised
+        self._scales = None          # (n,) float32 per-row scale, int8 storage only
+        self._keys = None            # (n,) namespace key per row
+        self._last_used = None       # (n,) access tick per row, for LRU eviction
+        self._signatures = None      # (n,) uint64 SimHash per row
+        self._inserted_at = None     # (n,) monotonic insert time per row, for ttl
+        self._projection = None      # (d, 64) fixed Gaussian hyperplanes
+        self._responses: List[Any] = []
+        self._tick = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._responses)
+    
+    @staticmethod
+    def _normalize(embedding) -> "np.ndarray":
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def _signature(self, vector: "np.ndarray") -> "np.uint64":
+        if self._projection is None:
+            rng = np.random.default_rng(0)
+            self._projection = rng.standard_normal((vector.shape[0], self.SIGNATURE_BITS)).astype(np.float32)
+        bits = np.packbits(vector @ self._projection > 0)
+        return bits.view(np.uint64)[0]
+    
+    def _quantize(self, vector: "np.ndarray"):
+        """Convert a normalised float32 vector to the storage dtype; returns (row, scale)"""
+        if self.quantization == "int8":
+            abs_max = float(np.abs(vector).max()) or 1.0
+            return np.round(vector / abs_max * 127).astype(np.int8), np.float32(abs_max / 127)
+        return vector.astype(self.quantization), np.float32(1.0)
+    
+    def _scores(self, rows: "np.ndarray", vector: "np.ndarray") -> "np.ndarray":
+        """Cosine similarity of the query against the selected stored rows"""
+        if self.quantization == "float32":
+            if rows.size == len(self._responses):
+                return cosine_scores(self._matrix, vector)
+            return cosine_scores(self._matrix, vector, rows)
+        
+        scores = self._matrix[rows].astype(np.float32) @ vector
+        if self.quantization == "int8":
+            scores *= self._scales[rows]
+        return scores
+    
+    def _candidates(self, rows: "np.ndarray", vector: "np.ndarray") -> "np.ndarray":
+        """Narrow rows to those nearest the query in Hamming distance"""
+        if rows.size <= self.lsh_candidates:
+            return rows
+        distances = _popcount64(self._signatures[rows] ^ self._signature(vector))
+        nearest = np.argpartition(distances, self.lsh_candidates)[:self.lsh_candidates]
+        return rows[nearest]
+    
+    def lookup(self, key: str, embedding) -> Optional[Any]:
+        """Return the cached response for the closest matching query, if similar enough"""
+        with self._lock:
+            if self._matrix is None:
+                return None
+            
+            live = self._keys == key
+            if self.ttl is not None:
+                live &= self._inserted_at > time.monotonic() - self.ttl
+            rows = np.flatnonzero(live)
+            if rows.size == 0:
+                return None
+            
+            vector = self._normalize(embedding)
+            rows = self._candidates(rows, vector)
+            scores = self._scores(rows, vector)
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            
+            row = int(rows[best])
+            self._tick += 1
+            self._last_used[row] = self._tick
+            return self._responses[row]
+    
+    def insert(self, key: str, embedding, response: Any) -> None:
+        """Add a response to the cache, evicting the least recently used entry when full"""
+        vector = self._normalize(embedding)
+        with self._lock:
+            self._tick += 1
+            now = time.monotonic()
+            signature = self._signature(vector)
+            stored, scale = self._quantize(vector)
+            if self._matrix is None:
+                self._matrix = stored[None, :]
+                self._scales = np.array([scale], dtype=np.float32)
+                self._keys = np.array([key], dtype=object)
+                self._last_used = np.array([self._tick], dtype=np.int64)
+                self._signatures = np.array([signature], dtype=np.uint64)
+                self._inserted_at = np.array([now], dtype=np.float64)
+                self._responses = [response]
+                return
+            
+            if len(self._responses) >= self.max_entries:
+                expired = self.ttl is not None and self._inserted_at.min() <= now - self.ttl
+                stale = int(np.argmin(self._inserted_at if expired else self._last_used))
+                self._drop(np.array([stale]))
+            
+            self._matrix = np.vstack([self._matrix, stored[None, :]])
+            self._scales = np.append(self._scales, scale)
+            self._keys = np.append(self._keys, np.array([key], dtype=object))
+            self._last_used = np.append(self._last_used, self._tick)
+            self._signatures = np.append(self._signatures, signature)
+            self._inserted_at = np.append(self._inserted_at, now)
+            self._responses.append(response)
+    
+    def invalidate(self, key_prefix: str) -> None:
+        """Drop every entry whose key starts with key_prefix"""
+        with self._lock:
+            if self._matrix is None:
+                return
+            rows = np.flatnonzero([key.startswith(key_prefix) for key in self._keys])
+            if rows.size:
+                self._drop(rows)
+    
+    def _drop(self, rows: "np.ndarray") -> None:
+        """Remove rows from every parallel array; caller holds the lock"""
+        self._matrix = np.delete(self._matrix, rows, axis=0)
+        self._scales = np.delete(self._scales, rows)
+        self._keys = np.delete(self._keys, rows)
+        self._last_used = np.delete(self._last_used, rows)
+        self._signatures = np.delete(self._signatures, rows)
+        self._inserted_at = np.delete(self._inserted_at, rows)
+        for row in sorted(rows.tolist(), reverse=True):
+            del self._responses[row]
@@ -0,0 +1,297 @@
+# vector_index.py
+"""
+Per-user embedding index used by MemoryManager.similarity_search.
+
+Small collections are searched exactly with a single matrix-vector product.
+Once a user's collection grows past Config.VECTOR_INDEX_ANN_THRESHOLD an HNSW
+graph (hnswlib, or FAISS-HNSW when hnswlib is not installed) is built so that
+lookups stay logarithmic in the number of stored vectors.
+"""
+
+import os
+import logging
+import threading
+from typing import List, Dict, Optional, Any
+from config import Config
+from core.numba_kernels import cosine_scores, top_k
+
+# Optional imports with fallbacks
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+logger = logging.getLogger(__name__)
+
+
+class _HNSWGraph:
+    """Thin wrapper over hnswlib / FAISS-HNSW; labels are row positions in the owning VectorIndex"""
+
+    def __init__(self, dim: int, max_elements: int):
+        self.dim = dim
+        self.backend = "hnswlib" if hnswlib else "faiss"
+        if hnswlib:
+            self._index = hnswlib.Index(space='cosine', dim=dim)
+            self._index.init_index(
+                max_elements=max_elements,
+                ef_construction=Config.HNSW_EF_CONSTRUCTION,
+                M=Config.HNSW_M
+            )
+            self._index.set_ef(Config.HNSW_EF_SEARCH)
+        else:
+            # Vectors are pre-normalised, so inner product == cosine similarity
+            self._index = faiss.IndexHNSWFlat(dim, Config.HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            self._index.hnsw.efConstruction = Config.HNSW_EF_CONSTRUCTION
+            self._index.hnsw.efSearch = Config.HNSW_EF_SEARCH
+
+    @staticmethod
+    def available() -> bool:
+        return hnswlib is not None or faiss is not None
+
+    def __len__(self) -> int:
+        if self.backend == "hnswlib":
+            return self._index.get_current_count()
+        return self._index.ntotal
+
+    def add(self, vectors: "np.ndarray", start: int):
+        """Add normalised vectors whose row positions start at ``start``"""
+        if self.backend == "hnswlib":
+            needed = start + len(vectors)
+            if needed > self._index.get_max_elements():
+                self._index.resize_index(max(needed, 2 * self._index.get_max_elements()))
+            self._index.add_items(vectors, np.arange(start, needed))
+        else:
+            self._index.add(vectors)
+
+    def query(self, query: "np.ndarray", k: int):
+        """Return (rows, similarities) for the ``k`` nearest neighbours"""
+        k = min(k, len(self))
+        if self.backend == "hnswlib":
+            self._index.set_ef(max(Config.HNSW_EF_SEARCH, k))
+            labels, distances = self._index.knn_query(query, k=k)
+            return labels[0].astype(np.int64), 1.0 - distances[0]
+        self._index.hnsw.efSearch = max(Config.HNSW_EF_SEARCH, k)
+        scores, labels = self._index.search(query[None, :], k)
+        keep = labels[0] >= 0
+        return labels[0][keep], scores[0][keep]
+
+    def save(self, path: str):
+        if self.backend == "hnswlib":
+            self._index.save_index(path)
+        else:
+            faiss.write_index(self._index, path)
+
+    @classmethod
+    def load(cls, path: str, dim: int, max_elements: int) -> "_HNSWGraph":
+        graph = cls.__new__(cls)
+        graph.dim = dim
+        if hnswlib:
+            graph.backend = "hnswlib"
+            graph._index = hnswlib.Index(space='cosine', dim=dim)
+            graph._index.load_index(path, max_elements=max_elements)
+            graph._index.set_ef(Config.HNSW_EF_SEARCH)
+        else:
+            graph.backend = "faiss"
+            graph._index = faiss.read_index(path)
+        return graph
+
+
+# Rows dequantised per block when scoring float16/int8 storage; sized to stay cache-resident
+_SCORE_TILE_ROWS = 4096
+
+_STORAGE_DTYPES = ("float32", "float16", "int8")
+
+
+class VectorIndex:
+    """
+    L2-normalised embedding matrix plus result payloads for one user,
+    with an HNSW graph layered on top once the collection is large enough.
+    Rows are stored as float32, float16 or per-row-scaled int8 (Config.VECTOR_INDEX_QUANTIZATION).
+    
+    Searches, appends and graph persistence hold the index's own lock, so a query
+    never sees a half-appended row or a graph being resized.
+    """
+
+    def __init__(self, dim: Optional[int] = None, quantization: Optional[str] = None):
+        self.dim = dim
+        self.quantization = quantization or Config.VECTOR_INDEX_QUANTIZATION
+        if self.quantization not in _STORAGE_DTYPES:
+            raise ValueError(f"Unsupported vector quantization: {self.quantization}")
+        self._matrix = np.empty((0, dim or 0), dtype=self.quantization)
+        self._scales = np.empty(0, dtype=np.float32)
+        self._items: List[Dict[str, Any]] = []
+        self._agent_names = np.empty(0, dtype=object)
+        self._graph: Optional[_HNSWGraph] = None
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @staticmethod
+    def _normalize(vectors) -> "np.ndarray":
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _quantize(self, vectors: "np.ndarray"):
+        """Convert normalised float32 rows to the storage dtype; returns (rows, per-row scales)"""
+        if self.quantization == "int8":
+            abs_max = np.abs(vectors).max(axis=1)
+            abs_max[abs_max == 0] = 1.0
+            quantized = np.round(vectors / abs_max[:, None] * 127).astype(np.int8)
+            return quantized, (abs_max / 127).astype(np.float32)
+        return vectors.astype(self.quantization), np.empty(0, dtype=np.float32)
+
+    def _dequantize(self, rows) -> "np.ndarray":
+        """float32 copy of the selected stored rows (a slice or an index array)"""
+        block = self._matrix[rows].astype(np.float32)
+        if self.quantization == "int8":
+            block *= self._scales[rows][:, None]
+        return block
+
+    def _scores(self, query: "np.ndarray", rows: Optional["np.ndarray"]) -> "np.ndarray":
+        """Cosine similarity of the query against all (or the selected) stored rows"""
+        if self.quantization == "float32":
+            return cosine_scores(self._matrix, query, rows)
+
+        n = len(self._items) if rows is None else rows.size
+        scores = np.empty(n, dtype=np.float32)
+        for start in range(0, n, _SCORE_TILE_ROWS):
+            stop = min(start + _SCORE_TILE_ROWS, n)
+            selection = slice(start, stop) if rows is None else rows[start:stop]
+            block = self._matrix[selection].astype(np.float32)
+            scores[start:stop] = block @ query
+            if self.quantization == "int8":
+                scores[start:stop] *= self._scales[selection]
+        return scores
+
+    def add(self, embedding, item: Dict[str, Any]):
+        """Append one embedding with its result payload"""
+        self.add_batch([embedding], [item])
+
+    def add_batch(self, embeddings, items: List[Dict[str, Any]], build_graph: bool = True):
+        """Append several embeddings with their result payloads"""
+        if not items:
+            return
+        vectors = self._normalize(np.vstack([np.asarray(e, dtype=np.float32).ravel() for e in embeddings]))
+        stored, scales = self._quantize(vectors)
+        with self._lock:
+            if self.dim is None or not len(self._items):
+                self.dim = vectors.shape[1]
+                self._matrix = np.empty((0, self.dim), dtype=self.quantization)
+            start = len(self._items)
+            self._matrix = np.ascontiguousarray(np.vstack([self._matrix, stored]))
+            self._scales = np.concatenate([self._scales, scales])
+            self._agent_names = np.append(self._agent_names, np.array([i['agent_name'] for i in items], dtype=object))
+            self._items.extend(items)
+
+            if self._graph is not None:
+                self._graph.add(vectors, start)
+                self._dirty = True
+            elif build_graph:
+                self.ensure_graph()
+
+    def ensure_graph(self):
+        """Build the HNSW graph over every stored row once the collection is large enough"""
+        with self._lock:
+            if self._graph is not None or len(self._items) < Config.VECTOR_INDEX_ANN_THRESHOLD:
+                return
+            if not _HNSWGraph.available():
+                return
+            graph = _HNSWGraph(self.dim, max(Config.HNSW_MAX_ELEMENTS, len(self._items)))
+            for start in range(0, len(self._items), _SCORE_TILE_ROWS):
+                graph.add(self._dequantize(slice(start, start + _SCORE_TILE_ROWS)), start)
+            self._graph = graph
+            self._dirty = True
+            logger.info(f"Built {graph.backend} HNSW index over {len(self._items)} embeddings")
+
+    def search(self, query_embedding, agent_name: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
+        """Return the top ``limit`` items by cosine similarity, most similar first"""
+        if limit <= 0:
+            return []
+
+        query = self._normalize(np.asarray(query_embedding, dtype=np.float32).ravel())
+        with self._lock:
+            if not self._items:
+                return []
+            if self._graph is not None:
+                results = self._search_graph(query, agent_name, limit)
+                if results is not None:
+                    return results
+            return self._search_exact(query, agent_name, limit)
+
+    def _search_graph(self, query: "np.ndarray", agent_name: Optional[str], limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Approximate search; returns None when an agent filter leaves too few candidates"""
+        k = limit * Config.VECTOR_INDEX_OVERSAMPLE if agent_name else limit
+        rows, scores = self._graph.query(query, k)
+        if agent_name:
+            keep = self._agent_names[rows] == agent_name
+            rows, scores = rows[keep], scores[keep]
+            if len(rows) < limit and len(rows) < np.count_nonzero(self._agent_names == agent_name):
+                return None
+        return [self._result(int(row), float(score)) for row, score in zip(rows[:limit], scores[:limit])]
+
+    def _search_exact(self, query: "np.ndarray", agent_name: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        if agent_name:
+            rows = np.flatnonzero(self._agent_names == agent_name)
+            if rows.size == 0:
+                return []
+        else:
+            rows = None
+
+        scores = self._scores(query, rows)
+        return [
+            self._result(int(rows[position]) if rows is not None else int(position), float(scores[position]))
+            for position in top_k(scores, limit)
+        ]
+
+    def _result(self, row: int, similarity: float) -> Dict[str, Any]:
+        result = dict(self._items[row])
+        result['similarity'] = similarity
+        return result
+
+    # ----------------------
+    # PERSISTENCE
+    # ----------------------
+
+    def save(self, path: str) -> bool:
+        """Persist the HNSW graph so it does not have to be rebuilt on restart"""
+        with self._lock:
+            if self._graph is None or not self._dirty:
+                return False
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._graph.save(path)
+            self._dirty = False
+            return True
+
+    def load_graph(self, path: str) -> bool:
+        """
+        Attach a previously saved graph if it covers exactly the rows currently held.
+        Rows must have been added in the same order as when the graph was saved.
+        """
+        if not os.path.exists(path) or not _HNSWGraph.available() or self.dim is None:
+            return False
+        try:
+            graph = _HNSWGraph.load(path, self.dim, max(Config.HNSW_MAX_ELEMENTS, len(self._items)))
+        except Exception as e:
+            logger.warning(f"Could not load HNSW index from {path}: {e}")
+            return False
+        with self._lock:
+            if len(graph) != len(self._items):
+                logger.info(f"Discarding stale HNSW index at {path} ({len(graph)} != {len(self._items)} rows)")
+                return False
+            self._graph = graph
+            self._dirty = False
+            return True
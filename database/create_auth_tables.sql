@@ -44,7 +44,8 @@ CREATE TABLE IF NOT EXISTS user_activity (
     FOREIGN KEY (session_id) REFERENCES user_sessions(session_id) ON DELETE SET NULL,
     INDEX idx_user_id (user_id),
     INDEX idx_created_at (created_at),
-    INDEX idx_activity_type (activity_type)
+    INDEX idx_activity_type (activity_type),
+    INDEX idx_user_created (user_id, created_at)
 );
 
 -- User query history - detailed query tracking
@@ -63,6 +64,7 @@ CREATE TABLE IF NOT EXISTS user_queries (
     INDEX idx_user_id (user_id),
     INDEX idx_created_at (created_at),
     INDEX idx_agent_used (agent_used),
+    INDEX idx_user_created (user_id, created_at),
     FULLTEXT INDEX idx_question_response (question, response_text)
 );
 
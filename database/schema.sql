@@ -37,6 +37,7 @@ CREATE TABLE IF NOT EXISTS `agent_interactions` (
     `query` TEXT NOT NULL,
     `response` TEXT NOT NULL,
     `interaction_type` ENUM('single', 'orchestrated') DEFAULT 'single',
+    `metadata` JSON,
     `timestamp` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     INDEX idx_user_agent (user_id, agent_name),
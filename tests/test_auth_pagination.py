@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+pytest.importorskip("mysql.connector")
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+# auth_service builds its module-level instance on import, which needs a database
+with mock.patch("mysql.connector.connect"), mock.patch("mysql.connector.pooling.MySQLConnectionPool"):
+    from auth import auth_endpoints
+from auth.auth_endpoints import MAX_PAGE_SIZE, _decode_page_cursor, _encode_page_cursor
+
+START = datetime(2024, 5, 1, 12, 0, 0, 123456)
+
+
+def _activity_rows(count):
+    """Newest first, as AuthService returns them; pairs of rows share a timestamp"""
+    rows = [
+        {
+            "activity_id": i + 1,
+            "activity_type": f"activity {i + 1}",
+            "activity_data": {},
+            "created_at": START + timedelta(seconds=i // 2),
+            "ip_address": None
+        }
+        for i in range(count)
+    ]
+    return sorted(rows, key=lambda row: (row["created_at"], row["activity_id"]), reverse=True)
+
+
+class FakeAuthService:
+    """Keyset pagination over an in-memory list, like AuthService's SQL"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def get_user_activity(self, user_id, limit=50, before=None):
+        rows = self.rows
+        if before is not None:
+            rows = [row for row in rows if (row["created_at"], row["activity_id"]) < before]
+        return rows[:limit]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    def serve(rows):
+        monkeypatch.setattr(auth_endpoints, "auth_service", FakeAuthService(rows))
+        app = FastAPI()
+        app.include_router(auth_endpoints.router)
+        app.dependency_overrides[auth_endpoints.get_token_user] = lambda: {"id": 1, "username": "tester"}
+        return TestClient(app)
+    return serve
+
+
+def test_cursor_round_trip():
+    cursor = _encode_page_cursor(START, 42)
+    assert _decode_page_cursor(cursor) == (START, 42)
+    assert _decode_page_cursor(None) is None
+    assert _decode_page_cursor("") is None
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "2024-05-01T12:00:00_notanid", "notadate_42"])
+def test_malformed_cursor_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        _decode_page_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+def test_malformed_cursor_returns_400(client):
+    response = client(_activity_rows(3)).get("/auth/activity", params={"cursor": "garbage"})
+    assert response.status_code == 400
+
+
+def test_page_size_is_clamped(client):
+    api = client(_activity_rows(3))
+    assert api.get("/auth/activity", params={"limit": MAX_PAGE_SIZE}).status_code == 200
+    assert api.get("/auth/activity", params={"limit": MAX_PAGE_SIZE + 1}).status_code == 422
+    assert api.get("/auth/activity", params={"limit": 0}).status_code == 422
+
+
+def test_pages_cover_every_row_once(client):
+    rows = _activity_rows(7)
+    api = client(rows)
+    seen = []
+    cursor = None
+    for _ in range(10):
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = api.get("/auth/activity", params=params)
+        assert response.status_code == 200
+        seen.extend(item["activity_type"] for item in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert seen == [row["activity_type"] for row in rows]
+
+
+def test_no_next_cursor_on_last_page(client):
+    api = client(_activity_rows(2))
+    response = api.get("/auth/activity", params={"limit": 3})
+    assert len(response.json()) == 2
+    assert "X-Next-Cursor" not in response.headers
+
+    full_page = api.get("/auth/activity", params={"limit": 2})
+    assert "X-Next-Cursor" in full_page.headers
@@ -0,0 +1,143 @@
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("jwt")
+pytest.importorskip("bcrypt")
+pytest.importorskip("mysql.connector")
+
+# auth_service builds its module-level instance on import, which needs a database
+with mock.patch("mysql.connector.connect"), mock.patch("mysql.connector.pooling.MySQLConnectionPool"):
+    from auth import auth_service as auth_module
+from auth.auth_service import AuthService
+
+USER = {
+    "id": 1,
+    "username": "tester",
+    "email": "tester@example.com",
+    "is_active": True,
+    "created_at": datetime(2024, 5, 1),
+    "last_login": None
+}
+
+
+class FakeCursor:
+    def __init__(self, service):
+        self.service = service
+
+    def execute(self, query, params=None):
+        self.service.user_queries += 1
+
+    def fetchone(self):
+        return dict(USER)
+
+
+class FakeRedis:
+    """Shared revocation store, like one Redis server seen by several workers"""
+
+    def __init__(self, keys=None):
+        self.keys = keys if keys is not None else set()
+        self.failing = False
+
+    def exists(self, key):
+        if self.failing:
+            raise ConnectionError("redis is down")
+        return int(key in self.keys)
+
+    def setex(self, key, ttl, value):
+        if self.failing:
+            raise ConnectionError("redis is down")
+        self.keys.add(key)
+
+
+def _service(fake_redis=None):
+    """AuthService whose database returns USER and whose Redis is fake_redis (or absent)"""
+    service = object.__new__(AuthService)
+    service.jwt_secret = "revocation-test-secret-0123456789abcdef"
+    service.session_expire_hours = 1
+    service._user_cache = auth_module._TTLCache(100, 60)
+    service._revoked_tokens = auth_module._TTLCache(None, 3600)
+    service._redis = fake_redis
+    service.user_queries = 0
+
+    @contextmanager
+    def cursor(dictionary=False):
+        yield FakeCursor(service)
+
+    service._cursor = cursor
+    return service
+
+
+def _warm_token(service):
+    token = service._generate_session_token(USER["id"], USER["username"])
+    assert service.get_current_user(token)["username"] == "tester"
+    assert service.get_current_user(token)["username"] == "tester"
+    assert service.user_queries == 1  # the second call was served from the user cache
+    return token
+
+
+@pytest.mark.parametrize("fake_redis", [None, FakeRedis()], ids=["no-redis", "redis"])
+def test_revoked_token_rejected_despite_warm_cache(fake_redis):
+    service = _service(fake_redis)
+    token = _warm_token(service)
+
+    assert service.revoke_token(token)
+    assert service.get_current_user(token) is None
+    assert service.verify_token(token) is None
+
+
+def test_revocation_on_another_worker_rejects_cached_token():
+    shared = FakeRedis()
+    worker, other_worker = _service(shared), _service(shared)
+    other_worker.jwt_secret = worker.jwt_secret
+    token = _warm_token(worker)
+
+    assert other_worker.revoke_token(token)
+    assert worker._user_cache.get(token) is not None
+    assert worker.get_current_user(token) is None
+    assert worker._user_cache.get(token) is None
+
+
+def test_redis_failure_keeps_local_revocations_and_warns(caplog):
+    fake_redis = FakeRedis()
+    service = _service(fake_redis)
+    revoked = _warm_token(service)
+    assert service.revoke_token(revoked)
+
+    fake_redis.failing = True
+    with caplog.at_level(logging.WARNING, logger=auth_module.__name__):
+        assert service.get_current_user(revoked) is None
+        still_valid = service._generate_session_token(USER["id"], USER["username"])
+        assert service.get_current_user(still_valid) is not None
+
+    assert any("Revocation check failed" in record.getMessage() for record in caplog.records)
+
+
+def test_revocations_outnumbering_the_user_cache_are_kept():
+    with mock.patch("mysql.connector.connect"), mock.patch("mysql.connector.pooling.MySQLConnectionPool"):
+        service = AuthService(jwt_secret="revocation-test-secret-0123456789abcdef", user_cache_size=100)
+    service._redis = None
+    tokens = [service._generate_session_token(USER["id"], USER["username"]) for _ in range(250)]
+    for token in tokens:
+        assert service.revoke_token(token)
+    assert all(service.verify_token(token) is None for token in tokens)
+
+
+def test_uncapped_store_sweeps_only_expired_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(auth_module.time, "time", lambda: now[0])
+    store = auth_module._TTLCache(None, 60)
+    for i in range(store.MIN_SWEEP_SIZE - 1):
+        store.set(("old", i), True)
+    now[0] += 30
+    store.set("live", True, expires_at=now[0] + 3600)
+    now[0] += 31  # the first batch has expired
+    for i in range(store.MIN_SWEEP_SIZE):
+        store.set(("new", i), True)
+
+    assert len(store._entries) < 2 * store.MIN_SWEEP_SIZE
+    assert store.get("live") is True
+    assert all(store.get(("new", i)) is True for i in range(store.MIN_SWEEP_SIZE))
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+dining_agent = pytest.importorskip("agents.dining_agent")
+ollama_client_module = pytest.importorskip("core.ollama_client")
+
+from core.semantic_cache import SemanticCache
+
+
+class ConcreteDiningAgent(dining_agent.DiningAgent):
+    """DiningAgent does not implement get_capabilities itself"""
+
+    def get_capabilities(self):
+        return list(self._capabilities)
+
+
+class SameEmbeddingMemory:
+    """Embeds every text to one vector, the worst case for the semantic cache"""
+
+    def embed(self, text):
+        return np.ones(8, dtype=np.float32)
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setattr(dining_agent, "_response_cache", SemanticCache(max_entries=10, threshold=0.9))
+    prompts = []
+
+    def generate_response(prompt, system_prompt=None, **kwargs):
+        prompts.append(prompt)
+        return f"answer {len(prompts)}"
+
+    monkeypatch.setattr(ollama_client_module.ollama_client, "generate_response", generate_response)
+    agent = ConcreteDiningAgent(SameEmbeddingMemory())
+    agent.prompts = prompts
+    return agent
+
+
+def _respond(agent, query, state=None):
+    query_lower = query.lower()
+    context_data = agent._extract_multi_agent_context(state or {}, query, query_lower)
+    return agent._generate_dining_response(query, context_data, agent._analyze_dining_query(query_lower))
+
+
+def test_different_cities_do_not_share_answers(agent):
+    tokyo = _respond(agent, "Best sushi in Tokyo")
+    osaka = _respond(agent, "Best sushi in Osaka")
+    assert tokyo != osaka
+    assert len(agent.prompts) == 2
+
+    assert _respond(agent, "Best sushi in tokyo") == tokyo
+    assert len(agent.prompts) == 2
+
+
+def test_answers_built_on_user_context_are_not_cached(agent):
+    state = {"weather_data": {"forecast": "Heavy rain all evening"}}
+    first = _respond(agent, "Best sushi in Tokyo", state)
+    second = _respond(agent, "Best sushi in Tokyo", state)
+    assert first != second
+    assert len(agent.prompts) == 2
+    assert len(dining_agent._response_cache) == 0
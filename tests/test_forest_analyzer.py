@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+forest_analyzer = pytest.importorskip("agents.forest_analyzer")
+
+
+@pytest.fixture
+def analyzer():
+    return object.__new__(forest_analyzer.ForestAnalyzerAgent)
+
+
+def test_batch_flags_each_plot(analyzer):
+    assessments = analyzer.analyze_forest_health_batch({"tree_cover": np.array([0.9, 0.5, 0.1])})
+    assert len(assessments) == 3
+    assert assessments[0]["key_indicators"] == ["High tree cover percentage"]
+    assert assessments[1]["key_indicators"] == [] and assessments[1]["concerns"] == []
+    assert assessments[2]["concerns"] == ["Low tree cover indicates degradation"]
+
+
+@pytest.mark.parametrize("forest_data", [
+    {"forest_type": "tropical"},
+    {"area_hectares": 120.0},
+    {"tree_cover": 0.9},
+    {"forest_type": "boreal", "tree_cover": 0.9}
+])
+def test_scalar_metrics_are_one_record(analyzer, forest_data):
+    assessments = analyzer.analyze_forest_health_batch(forest_data)
+    assert len(assessments) == 1
+    assert assessments[0] == analyzer.analyze_forest_health(forest_data)
+
+
+def test_plot_count_comes_from_metrics(analyzer):
+    assessments = analyzer.analyze_forest_health_batch({"region": "north", "tree_cover": [0.9, 0.1]})
+    assert len(assessments) == 2
+    assert assessments[0]["key_indicators"] == ["High tree cover percentage"]
+    assert assessments[1]["concerns"] == ["Low tree cover indicates degradation"]
+
+
+def test_metric_lengths_must_agree(analyzer, monkeypatch):
+    monkeypatch.setattr(forest_analyzer.ForestAnalyzerAgent, "HEALTH_METRICS", ("tree_cover", "canopy_height"))
+    with pytest.raises(ValueError):
+        analyzer.analyze_forest_health_batch({"tree_cover": [0.9, 0.1], "canopy_height": [20.0]})
+
+
+def test_batch_without_numpy_matches(analyzer, monkeypatch):
+    forest_data = {"region": "north", "tree_cover": [0.9, 0.5, 0.1]}
+    expected = analyzer.analyze_forest_health_batch(forest_data)
+    monkeypatch.setattr(forest_analyzer, "np", None)
+    assert analyzer.analyze_forest_health_batch(forest_data) == expected
+    assert analyzer.analyze_forest_health({"tree_cover": 0.2})["concerns"] == ["Low tree cover indicates degradation"]
+
+
+def test_empty_batch(analyzer):
+    assert analyzer.analyze_forest_health_batch({}) == []
@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+from core import keyword_matcher
+from core.keyword_matcher import KeywordMatcher, compile_category_pattern, match_category
+
+BUCKETS = {
+    "weather": ["weather", "rain", "sun", "sunset"],
+    "dining": ["food", "eat", "seafood", "sea"],
+    "location": ["scenic", "view", "sunset"],
+    "travel": ["trip", "travel", "plan"]
+}
+
+TEXTS = [
+    "",
+    "nothing relevant here",
+    "plan a trip to see the sunset and eat seafood",
+    "is it sunny? will it rain on our scenic drive",
+    "seafood by the sea with a view",
+    "travel travel travel",
+    "eatfoodrainsun"
+]
+
+
+def _random_texts(count=200, seed=0):
+    rng = random.Random(seed)
+    words = [term for terms in BUCKETS.values() for term in terms] + ["the", "a", "xyz", "s", "un"]
+    return ["".join(rng.choice(words) + rng.choice(["", " "]) for _ in range(rng.randint(0, 8))) for _ in range(count)]
+
+
+@pytest.fixture
+def regex_matcher(monkeypatch):
+    with monkeypatch.context() as patch:
+        patch.setattr(keyword_matcher, "ahocorasick", None)
+        matcher = KeywordMatcher(BUCKETS)
+    assert matcher._pattern is not None
+    return matcher
+
+
+@pytest.mark.skipif(keyword_matcher.ahocorasick is None, reason="needs pyahocorasick")
+def test_ahocorasick_and_regex_agree(regex_matcher):
+    automaton_matcher = KeywordMatcher(BUCKETS)
+    assert automaton_matcher._automaton is not None
+    for text in TEXTS + _random_texts():
+        assert automaton_matcher.matches(text) == regex_matcher.matches(text), text
+        assert automaton_matcher.first(text, "none") == regex_matcher.first(text, "none"), text
+
+
+def test_regex_fallback_finds_overlapping_terms(regex_matcher):
+    # "seafood" and "sunset" contain shorter terms from other buckets
+    assert regex_matcher.matches("seafood") == {"dining"}
+    assert regex_matcher.matches("sunset") == {"weather", "location"}
+    assert regex_matcher.matches("nothing") == set()
+
+
+def test_first_follows_bucket_order():
+    matcher = KeywordMatcher(BUCKETS)
+    assert matcher.first("plan a trip with good food and rain") == "weather"
+    assert matcher.first("plan a trip with good food") == "dining"
+    assert matcher.first("a scenic trip") == "location"
+    assert matcher.first("a long trip") == "travel"
+    assert matcher.first("nothing here", default="location") == "location"
+    assert matcher.first("nothing here") is None
+
+
+def test_empty_matcher():
+    matcher = KeywordMatcher({"empty": []})
+    assert matcher.matches("anything") == set()
+    assert matcher.first("anything", "default") == "default"
+
+
+def test_match_category_priority():
+    pattern = compile_category_pattern({"short_term": ("today", "now"), "long_term": ("week", "month")})
+    assert match_category(pattern, "this week and today", "general") == "short_term"
+    assert match_category(pattern, "next month", "general") == "long_term"
+    assert match_category(pattern, "whenever", "general") == "general"
+
+
+@pytest.mark.parametrize("question,expected", [
+    ("What's the weather like for my trip?", "weather"),
+    ("Find a restaurant near the forest", "dining"),
+    ("Plan a vacation", "location"),
+    ("Tell me about forest biodiversity", "forest"),
+    ("Search my previous questions", "search"),
+    ("asdfghjkl", "location")
+])
+def test_routing_priority(question, expected):
+    langgraph_system = pytest.importorskip("core.langgraph_multiagent_system")
+    system = object.__new__(langgraph_system.LangGraphMultiAgentSystem)
+    assert system._analyze_query_for_routing(question) == expected
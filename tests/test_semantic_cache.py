@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+
+from core.semantic_cache import SemanticCache
+
+
+def _vectors(n, dim=64, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def _at_cosine(v, cosine, seed=1):
+    """A vector whose cosine similarity to v is exactly `cosine`"""
+    v = v / np.linalg.norm(v)
+    noise = np.random.default_rng(seed).standard_normal(v.shape[0]).astype(np.float32)
+    noise -= noise.dot(v) * v
+    noise /= np.linalg.norm(noise)
+    return cosine * v + np.sqrt(1 - cosine ** 2) * noise
+
+
+def test_hit_and_miss_at_threshold():
+    cache = SemanticCache(threshold=0.9)
+    v = _vectors(1)[0]
+    cache.insert("k", v, "answer")
+    assert cache.lookup("k", v) == "answer"
+    assert cache.lookup("k", _at_cosine(v, 0.92)) == "answer"
+    assert cache.lookup("k", _at_cosine(v, 0.88)) is None
+
+
+def test_keys_are_isolated():
+    cache = SemanticCache(threshold=0.9)
+    v = _vectors(1)[0]
+    cache.insert("agent:1", v, "user one")
+    assert cache.lookup("agent:2", v) is None
+    cache.insert("agent:2", v, "user two")
+    assert cache.lookup("agent:1", v) == "user one"
+    assert cache.lookup("agent:2", v) == "user two"
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("core.semantic_cache.time.monotonic", lambda: now[0])
+    cache = SemanticCache(threshold=0.9, ttl=60)
+    v = _vectors(1)[0]
+    cache.insert("k", v, "fresh")
+    now[0] += 59
+    assert cache.lookup("k", v) == "fresh"
+    now[0] += 2
+    assert cache.lookup("k", v) is None
+
+
+def test_lru_eviction():
+    cache = SemanticCache(max_entries=2, threshold=0.9)
+    a, b, c = _vectors(3)
+    cache.insert("k", a, "a")
+    cache.insert("k", b, "b")
+    assert cache.lookup("k", a) == "a"  # b is now least recently used
+    cache.insert("k", c, "c")
+    assert len(cache) == 2
+    assert cache.lookup("k", b) is None
+    assert cache.lookup("k", a) == "a"
+    assert cache.lookup("k", c) == "c"
+
+
+def test_expired_entries_evicted_before_lru(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("core.semantic_cache.time.monotonic", lambda: now[0])
+    cache = SemanticCache(max_entries=2, threshold=0.9, ttl=60)
+    a, b, c = _vectors(3)
+    cache.insert("k", a, "a")
+    now[0] += 30
+    cache.insert("k", b, "b")
+    now[0] += 40  # a has expired, b has not
+    cache.lookup("k", b)
+    cache.insert("k", c, "c")
+    assert cache.lookup("k", b) == "b"
+    assert cache.lookup("k", c) == "c"
+
+
+def test_invalidate_by_prefix():
+    cache = SemanticCache(threshold=0.9)
+    vectors = _vectors(3)
+    cache.insert("Dining:1:2", vectors[0], "one")
+    cache.insert("Dining:1:5", vectors[1], "two")
+    cache.insert("Dining:12:2", vectors[2], "other user")
+    cache.invalidate("Dining:1:")
+    assert len(cache) == 1
+    assert cache.lookup("Dining:1:2", vectors[0]) is None
+    assert cache.lookup("Dining:12:2", vectors[2]) == "other user"
+
+
+def test_lsh_prefilter_finds_near_duplicates():
+    cache = SemanticCache(max_entries=500, threshold=0.9, lsh_candidates=8)
+    vectors = _vectors(200)
+    for i, v in enumerate(vectors):
+        cache.insert("k", v, i)
+    for i in range(0, 200, 7):
+        assert cache.lookup("k", _at_cosine(vectors[i], 0.97, seed=i)) == i
+
+
+@pytest.mark.parametrize("quantization", ["float16", "int8"])
+def test_quantized_storage_ranks_like_float32(quantization):
+    vectors = _vectors(100)
+    reference = SemanticCache(max_entries=100, threshold=-1.0, lsh_candidates=100)
+    quantized = SemanticCache(max_entries=100, threshold=-1.0, lsh_candidates=100, quantization=quantization)
+    for i, v in enumerate(vectors):
+        reference.insert("k", v, i)
+        quantized.insert("k", v, i)
+
+    for i in range(100):
+        query = _at_cosine(vectors[i], 0.8, seed=i)
+        assert quantized.lookup("k", query) == reference.lookup("k", query) == i
+
+    # Scores stay within quantization error of float32, so only near-ties can swap
+    rows = np.arange(100)
+    query = reference._normalize(_vectors(1, seed=42)[0])
+    np.testing.assert_allclose(quantized._scores(rows, query), reference._scores(rows, query), atol=1e-2)
+
+
+def test_unknown_quantization_rejected():
+    with pytest.raises(ValueError):
+        SemanticCache(quantization="int4")
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from config import Config
+from core.vector_index import VectorIndex, _HNSWGraph
+
+
+def _vectors(n, dim=32, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def _items(n, agent=lambda i: "a" if i % 2 else "b"):
+    return [{"content": f"item {i}", "agent_name": agent(i)} for i in range(n)]
+
+
+def _brute_force(vectors, items, query, limit, agent_name=None):
+    """Reference top-k by cosine similarity, as content strings"""
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normed @ (query / np.linalg.norm(query))
+    rows = [i for i in np.argsort(-scores) if agent_name is None or items[i]["agent_name"] == agent_name]
+    return [items[i]["content"] for i in rows[:limit]]
+
+
+@pytest.fixture
+def small_ann_threshold(monkeypatch):
+    monkeypatch.setattr(Config, "VECTOR_INDEX_ANN_THRESHOLD", 100)
+
+
+@pytest.mark.parametrize("agent_name", [None, "a"])
+def test_exact_search_matches_brute_force(agent_name):
+    vectors, items = _vectors(300), _items(300)
+    index = VectorIndex(quantization="float32")
+    index.add_batch(vectors, items, build_graph=False)
+
+    for query in _vectors(10, seed=1):
+        results = index.search(query, agent_name, limit=5)
+        assert [r["content"] for r in results] == _brute_force(vectors, items, query, 5, agent_name)
+        assert all(r["agent_name"] == agent_name for r in results if agent_name)
+        similarities = [r["similarity"] for r in results]
+        assert similarities == sorted(similarities, reverse=True)
+
+
+def test_unknown_agent_returns_nothing():
+    index = VectorIndex(quantization="float32")
+    index.add_batch(_vectors(10), _items(10))
+    assert index.search(_vectors(1)[0], "missing", limit=5) == []
+
+
+@pytest.mark.skipif(not _HNSWGraph.available(), reason="needs hnswlib or faiss")
+def test_graph_search_recalls_exact_neighbours(small_ann_threshold):
+    vectors, items = _vectors(500), _items(500)
+    index = VectorIndex(quantization="float32")
+    index.add_batch(vectors, items)
+    assert index._graph is not None
+
+    for i in range(0, 500, 50):
+        query = vectors[i] + 0.01 * _vectors(1, seed=i)[0]
+        assert index.search(query, limit=1)[0]["content"] == f"item {i}"
+
+
+@pytest.mark.skipif(not _HNSWGraph.available(), reason="needs hnswlib or faiss")
+def test_agent_filter_falls_back_to_exact_when_graph_starves(small_ann_threshold):
+    # A handful of "rare" rows sit far from the query, so the graph's oversampled
+    # neighbours are all "common" rows and the filter alone would return too few
+    vectors = _vectors(400)
+    vectors[:5] = -vectors[400 - 1] + 0.1 * _vectors(5, seed=4)
+    items = _items(400, agent=lambda i: "rare" if i < 5 else "common")
+    index = VectorIndex(quantization="float32")
+    index.add_batch(vectors, items)
+    assert index._graph is not None
+
+    query = vectors[400 - 1]
+    assert index._search_graph(index._normalize(query), "rare", 3) is None
+    results = index.search(query, "rare", limit=3)
+    assert [r["content"] for r in results] == _brute_force(vectors, items, query, 3, "rare")
+
+
+@pytest.mark.skipif(not _HNSWGraph.available(), reason="needs hnswlib or faiss")
+def test_save_and_load_graph_round_trip(small_ann_threshold, tmp_path):
+    vectors, items = _vectors(300), _items(300)
+    path = str(tmp_path / "user_1.hnsw")
+    index = VectorIndex(quantization="float32")
+    index.add_batch(vectors, items)
+    assert index.save(path)
+    assert not index.save(path)  # nothing changed since the last save
+
+    restored = VectorIndex(quantization="float32")
+    restored.add_batch(vectors, items, build_graph=False)
+    assert restored.load_graph(path)
+    for query in _vectors(5, seed=2):
+        assert restored.search(query, limit=5) == index.search(query, limit=5)
+
+    # A graph saved over fewer rows than the index now holds is discarded
+    grown = VectorIndex(quantization="float32")
+    grown.add_batch(np.vstack([vectors, _vectors(1, seed=3)]), _items(301), build_graph=False)
+    assert not grown.load_graph(path)
@@ -43,6 +43,20 @@ def upgrade_database_schema():
             if "doesn't exist" not in str(e):
                 print(f"⚠️ Response column upgrade: {e}")
         
+        # Add the metadata column agents record with each interaction
+        try:
+            print(f"\n🔄 Adding metadata column to agent_interactions...")
+            cursor.execute("""
+                ALTER TABLE agent_interactions 
+                ADD COLUMN metadata JSON NULL AFTER interaction_type
+            """)
+            print(f"✅ agent_interactions.metadata added")
+        except mysql.connector.Error as e:
+            if "Duplicate column name" in str(e):
+                print(f"ℹ️ agent_interactions.metadata already exists")
+            elif "doesn't exist" not in str(e):
+                print(f"⚠️ Metadata column upgrade: {e}")
+        
         # Check multi_agent_orchestration table
         cursor.execute("DESCRIBE multi_agent_orchestration")
         columns = cursor.fetchall()
@@ -68,7 +82,10 @@ def upgrade_database_schema():
         # Create indexes for better performance if they don't exist
         indexes_to_create = [
             ("agent_interactions", "idx_response_length", "((LENGTH(response)))"),
-            ("multi_agent_orchestration", "idx_responses_length", "((LENGTH(agent_responses)))")
+            ("multi_agent_orchestration", "idx_responses_length", "((LENGTH(agent_responses)))"),
+            # Newest-first, keyset-paginated history reads per user
+            ("user_activity", "idx_user_created", "(user_id, created_at)"),
+            ("user_queries", "idx_user_created", "(user_id, created_at)")
         ]
         
         for table, index_name, index_column in indexes_to_create: